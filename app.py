@@ -1,15 +1,39 @@
+# Imported first so that the "imports" phase below covers everything else.
+from utils import startup
+from utils.db import load_environment
+
+# Development settings may come from a .env file; load it before the
+# modules below read their configuration from the environment.
+load_environment()
+
 import os
 from datetime import datetime, date, timezone, timedelta
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for
-import re
-from rapidfuzz import fuzz
-from better_profanity import profanity
-from supabase import create_client, Client
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Flask, Response, render_template, jsonify, request, session, redirect, url_for
+import click
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-import pytz
+import hmac
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from utils.assets import AssetPipeline, template_assets
+from utils.event_cache import ARCHIVE_CACHE_SIZE, ArchiveCache, EventCache
+from utils.event_import import IMPORT_BATCH_SIZE, import_events, read_events, validate_events
+from utils.game_clock import GameClock, previous_game_date
+from utils.guess_log import GuessLog
+from utils.http_cache import CachedJSON, ResponseCache, conditional
+from utils.shared_cache import SharedCache
+from utils.leaderboard import MAX_CLUES, LeaderboardStore, decode_cursor, encode_cursor, keyset_key
+from utils.passwords import HasherBusy, PasswordHasher
+from utils.profile_cache import ProfileCache
+from utils.score_queue import ScoreQueue
+from utils.streak_board import StreakBoard
+from utils.streaks import STAT_COLUMNS, apply_result, recompute_streaks
+from utils.validators import is_valid_name, is_valid_x_username, profanity_filter
+from utils.db import db, warm_backend
+from utils import metrics
+
+startup.mark("imports")
 
 # Initialize Flask app and set a permanent session lifetime (30 days)
 app = Flask(__name__)
@@ -22,70 +46,199 @@ CORS(app, supports_credentials=True)
 
 limiter = Limiter(get_remote_address, app=app, default_limits=[])
 
-# Load Supabase credentials from environment variables
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise Exception("Supabase credentials not set in environment variables")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Per-route and per-backend-call timings, Server-Timing headers and /metrics.
+metrics.init_app(app)
 
-profanity.load_censor_words()
+# url_for('static', ...) points at content-hashed, precompressed copies that
+# are cached for a year (see utils/assets.py; ASSET_PIPELINE=0 turns it off).
+assets = AssetPipeline(app.static_folder)
+assets.init_app(app)
 
-FUZZ_THRESHOLD = 79
+# All storage goes through utils.db; HISTORLE_BACKEND picks Supabase (the
+# default, using SUPABASE_URL/SUPABASE_KEY) or a local SQLite database.
 
-def is_valid_name(name: str) -> bool:
-    """Name shown on leaderboard. Must be safe, short, and clean."""
-    return (
-        1 <= len(name) <= 20 and
-        re.match(r"^[a-zA-Z0-9 _.\-]+$", name) and
-        not profanity.contains_profanity(name)
-    )
+# Names and X handles are checked by utils.validators (compiled profanity list).
 
-def is_valid_x_username(x_username: str) -> bool:
-    """Username (for X) is optional; allows only Twitter-safe handles."""
-    return (
-        len(x_username) <= 30 and
-        (x_username == "" or re.match(r"^[a-zA-Z0-9_]+$", x_username))
-    )
+# Parsed events are kept in-process until the end of their game day.
+event_cache = EventCache(db.get_event)
+
+# Sorted per-day leaderboards maintained in memory as scores land.
+leaderboard_store = LeaderboardStore(db.iter_leaderboard)
+
+# Leaderboard usernames -> x_id, one key per name, shared by all workers
+# for a few seconds.
+X_ID_CACHE_TTL = 10
+x_id_cache = SharedCache(ttl=X_ID_CACHE_TTL)
+
+# Users' stats columns, read by the stats endpoints and kept current by
+# every write to them; hit/miss counts are exported on /metrics.
+profile_cache = ProfileCache(db.get_user)
+
+# Password KDF runs on a small per-worker process pool (PASSWORD_HASH_*).
+password_hasher = PasswordHasher()
+
+# Top-5 streak list, rebuilt only when a change could affect it.
+streak_board = StreakBoard(db.top_streaks)
 
 def get_event_for_today():
     """
-    Query the Supabase daily_events table for the event matching today's date.
-    Converts 'alt_answers' and 'clues' from semicolon-separated strings into lists.
+    Return today's parsed event from the event cache.
+    'alt_answers' and 'clues' are lists and 'matcher' is the compiled
+    AnswerMatcher for the accepted answers.
     """
-    today_str = get_current_game_date()
-    try:
-        result = supabase.table("daily_events") \
-                         .select("*") \
-                         .eq("date", today_str) \
-                         .single() \
-                         .execute()
-        event = result.data
-        if not event:
-            return None
-        # Process semicolon-separated fields into lists
-        if "alt_answers" in event and isinstance(event["alt_answers"], str):
-            event["alt_answers"] = [a.strip() for a in event["alt_answers"].split(";") if a.strip()]
-        if "clues" in event and isinstance(event["clues"], str):
-            event["clues"] = [c.strip() for c in event["clues"].split(";") if c.strip()]
-        return event
-    except Exception as e:
-        print("Error fetching event from Supabase:", e)
-        return None
+    return event_cache.get(get_current_game_date())
+
+# Every scored guess, for tuning the matcher offline (`flask evaluate-guesses`).
+guess_log = GuessLog()
+
+# Game days start at GAME_CUTOFF_HOUR Eastern (midnight unless set).
+game_clock = GameClock()
 
 # Date for current game
 def get_current_game_date():
-    # Use 'America/New_York' to properly account for Eastern Time and DST.
-    tz = pytz.timezone("America/New_York")
-    now = datetime.now(tz)
-    # Define the 8pm cutoff
-    cutoff = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    if now < cutoff:
-        # If before 8pm, the game day is still yesterday's event.
-        game_date = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-    else:
-        game_date = now.strftime("%Y-%m-%d")
-    return game_date
+    return game_clock.today()
+
+# Past events for archive play, kept parsed per process (LRU) with the
+# neighbouring dates prefetched; archive games never touch streaks or the
+# leaderboard.
+archive_cache = ArchiveCache(db.get_event, get_current_game_date)
+
+def swap_event(previous_date, game_date):
+    """Have the new day's event parsed before the first request asks for it."""
+    event_cache.prewarm(game_date)
+
+def freeze_leaderboard(previous_date, game_date):
+    """Late scores for the finished day no longer move its board."""
+    leaderboard_store.freeze(previous_date)
+
+def prewarm_new_board(previous_date, game_date):
+    leaderboard_store.prewarm(game_date)
+
+game_clock.on_rollover(swap_event)
+game_clock.on_rollover(freeze_leaderboard)
+game_clock.on_rollover(prewarm_new_board)
+
+def run_streak_recompute(game_date):
+    """Zero the streaks broken as of game_date and refresh what shows them."""
+    result = recompute_streaks(
+        db.iter_streaks(), db.reset_streaks, game_date,
+        on_reset=lambda names: profile_cache.update_many(names, {"streak": 0})
+    )
+    if result["reset"]:
+        streak_board.invalidate()
+    return result
+
+def recompute_streaks_at_rollover(previous_date, game_date):
+    result = run_streak_recompute(game_date)
+    print(f"Streaks recomputed for {game_date}: {result['reset']} of {result['checked']} reset")
+
+game_clock.on_rollover(recompute_streaks_at_rollover, once=True)
+
+@app.cli.command("recompute-streaks")
+@click.option("--date", "game_date", default=None, help="Game date to evaluate (default: today's).")
+def recompute_streaks_command(game_date):
+    """Reset every streak that is broken as of the given game date."""
+    result = run_streak_recompute(game_date or get_current_game_date())
+    click.echo(f"checked {result['checked']} streaks, reset {result['reset']}")
+
+@app.cli.command("import-events")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["auto", "csv", "json"]), default="auto",
+              help="File format (default: from the extension).")
+@click.option("--dry-run", is_flag=True, help="Only validate; write nothing.")
+@click.option("--no-replace", is_flag=True, help="Fail if any date already has an event.")
+@click.option("--batch-size", default=IMPORT_BATCH_SIZE, show_default=True, help="Rows per upsert.")
+def import_events_command(path, fmt, dry_run, no_replace, batch_size):
+    """Validate a season of events from CSV or JSON and upsert them into daily_events."""
+    rows, errors, warnings = validate_events(read_events(path, fmt))
+    if no_replace and not errors:
+        taken = []
+        for start in range(0, len(rows), batch_size):
+            taken += db.event_dates([row["date"] for row in rows[start:start + batch_size]])
+        errors += [f"{game_date}: already has an event (--no-replace)" for game_date in sorted(taken)]
+    for message in warnings:
+        click.echo(f"warning: {message}")
+    for message in errors:
+        click.echo(f"error: {message}", err=True)
+    if errors:
+        raise click.ClickException(f"{len(errors)} error(s) in {len(rows)} events; nothing was imported.")
+    if dry_run:
+        click.echo(f"{len(rows)} events are valid (dry run, nothing written)")
+        return
+    result = import_events(rows, db, batch_size)
+    # Workers drop cached events (including a cached "no event" for a date just added).
+    event_cache.refresh()
+    click.echo(f"imported {result['imported']} events ({result['new']} new, {result['replaced']} replaced)")
+
+@app.cli.command("evaluate-guesses")
+@click.option("--labels", "labels_path", type=click.Path(exists=True, dir_okay=False),
+              help="CSV of date,guess,correct hand labels for precision/recall.")
+@click.option("--from", "first_date", default=None, help="First game date to include.")
+@click.option("--to", "last_date", default=None, help="Last game date to include.")
+@click.option("--scorer", "scorers", multiple=True, type=click.Choice(["ratio", "token_sort_ratio", "WRatio"]),
+              help="Scorer to compare (repeatable; default: all).")
+@click.option("--thresholds", default="60,65,70,75,79,80,85,90,95", show_default=True,
+              help="Comma list and/or ranges like 70-90:2.")
+@click.option("--workers", default=-1, show_default=True, help="Threads for cdist (-1: one per core).")
+def evaluate_guesses_command(labels_path, first_date, last_date, scorers, thresholds, workers):
+    """Replay logged guesses against fuzzy thresholds and scorers; report precision/recall."""
+    import time
+    from utils.answer_matcher import FUZZ_THRESHOLD
+    from utils.event_cache import parse_event
+    from utils.guess_eval import distinct_guesses, evaluate, parse_thresholds, read_labels
+
+    labels = read_labels(labels_path) if labels_path else {}
+    logged = set(guess_log.dates())
+    dates = [d for d in sorted(logged | set(labels))
+             if (not first_date or d >= first_date) and (not last_date or d <= last_date)]
+    corpus = guess_log.corpus([d for d in dates if d in logged])
+    answers = {}
+    for game_date in dates:
+        raw = db.get_event(game_date)
+        if raw:
+            answers[game_date] = parse_event(raw)["matcher"].choices
+        else:
+            click.echo(f"warning: no event for {game_date}; its guesses are skipped")
+    made, distinct = distinct_guesses(corpus)
+    click.echo(f"{made:,} logged guesses ({distinct:,} distinct) over {len(dates)} dates; "
+               f"{sum(len(day) for day in labels.values()):,} labelled")
+
+    started = time.perf_counter()
+    try:
+        results = evaluate(corpus, answers, labels, scorers or ("ratio", "token_sort_ratio", "WRatio"),
+                           parse_thresholds(thresholds), workers)
+    except (RuntimeError, ValueError) as e:
+        raise click.ClickException(str(e))
+    elapsed = time.perf_counter() - started
+
+    def pct(value):
+        return "-" if value is None else f"{100 * value:.1f}%"
+
+    click.echo(f"{'scorer':<17} {'thr':>4} {'accepted':>9} {'precision':>10} {'recall':>8} {'f1':>7} "
+               f"{'tp':>7} {'fp':>6} {'fn':>6}")
+    for row in results:
+        current = "*" if (row["scorer"], row["threshold"]) == ("ratio", FUZZ_THRESHOLD) else " "
+        click.echo(f"{row['scorer']:<17} {row['threshold']:>4} {pct(row['accept_rate']):>9} "
+                   f"{pct(row['precision']):>10} {pct(row['recall']):>8} {pct(row['f1']):>7} "
+                   f"{row['tp']:>7} {row['fp']:>6} {row['fn']:>6}{current}")
+    click.echo(f"* current setting. Scored in {elapsed:.2f}s "
+               f"({len(results)} settings, {len(results) * made / elapsed if elapsed else 0:,.0f} guess-settings/s)")
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Hash and precompress static/ and report the bytes saved on a first visit."""
+    files = assets.build()
+    click.echo(assets.summary(files))
+    for name, entry in files.items():
+        if entry["gzip"] or entry["br"]:
+            gz, br = (f"{entry[key]:,}" if entry[key] else "-" for key in ("gzip", "br"))
+            click.echo(f"  {name:<28} {entry['size']:>9,} B  gzip {gz:>8}  br {br:>8}")
+    for page, template in [("/", "index.html"), ("/articles", "articles.html")]:
+        report = assets.report(template_assets(os.path.join(app.root_path, app.template_folder, template)))
+        percent = 100 * report["saved"] / report["plain"] if report["plain"] else 0
+        click.echo(f"First visit to {page}: {report['plain']:,} B -> {report['compressed']:,} B "
+                   f"over {report['files']} files (saves {report['saved']:,} B, {percent:.0f}%); "
+                   "repeat visits re-download none of them")
 
 @app.route("/")
 def index():
@@ -100,14 +253,9 @@ def articles():
     # In future, you can query a ‘posts’ table and pass posts=list_of_posts
     return render_template("articles.html")
 
-@app.route("/api/event", methods=["GET"])
-def api_event():
-    """API endpoint to retrieve today's historical event without sensitive answer data."""
-    event = get_event_for_today()
-    if not event:
-        return jsonify({"error": "No event found for today"}), 404
-    # Only return clues and non-sensitive data
-    response = {
+def public_event_payload(event):
+    """Only the clues and non-sensitive data of an event."""
+    return {
         "year": event.get("year"),
         "difficulty": event.get("difficulty"),
         "clues": event.get("clues"),
@@ -115,7 +263,110 @@ def api_event():
         "date": event.get("date"),
         "category": event.get("category")
     }
-    return jsonify(response)
+
+# The event and the boards are the same for every visitor, so their JSON is
+# serialised once per version of the data and sent with an ETag; clients
+# that already have it get a 304. Board bodies also embed x_ids, which have
+# no version, so they are rebuilt at least as often as the x_id cache.
+event_responses = ResponseCache(app.json.dumps, maxsize=8)
+board_responses = ResponseCache(app.json.dumps, ttl=X_ID_CACHE_TTL)
+
+# Browsers revalidate the boards on every poll (a 304 when nothing landed);
+# shared caches such as a CDN may serve them for this many seconds.
+BOARD_SHARED_MAX_AGE = int(os.environ.get("BOARD_SHARED_MAX_AGE", "5"))
+
+def event_response_body(event) -> CachedJSON:
+    return event_responses.get(event.get("date"), event, lambda: public_event_payload(event))
+
+def event_cache_control() -> str:
+    """Today's event can be cached until the cutoff, when the next one takes over."""
+    return f"public, max-age={int(game_clock.seconds_until_rollover())}"
+
+def board_cache_control() -> str:
+    return f"public, max-age=0, s-maxage={BOARD_SHARED_MAX_AGE}"
+
+def cached_json_response(cached: CachedJSON, cache_control: str):
+    status, body, headers = conditional(request.headers.get("If-None-Match"), cached, cache_control)
+    return Response(body, status=status, headers=headers, mimetype="application/json")
+
+@app.route("/api/event", methods=["GET"])
+def api_event():
+    """API endpoint to retrieve today's historical event without sensitive answer data."""
+    event = get_event_for_today()
+    if not event:
+        return jsonify({"error": "No event found for today"}), 404
+    return cached_json_response(event_response_body(event), event_cache_control())
+
+@app.route("/api/admin/refresh_event", methods=["POST"])
+def refresh_event():
+    """
+    Drop the cached event so an edited daily_events row is picked up mid-day.
+    Requires the X-Admin-Token header to match the ADMIN_TOKEN env variable.
+    """
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    if not admin_token:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), admin_token):
+        return jsonify({"error": "Unauthorized"}), 401
+    data = request.get_json(silent=True) or {}
+    event_cache.refresh(data.get("event_date"))
+    return jsonify({"success": True})
+
+# A past event never changes, so browsers and CDNs may keep it for a day.
+ARCHIVE_CACHE_CONTROL = "public, max-age=86400"
+archive_responses = ResponseCache(app.json.dumps, maxsize=ARCHIVE_CACHE_SIZE)
+
+def archive_event(event_date):
+    """
+    (parsed event, None) for an archived game date, or (None, error
+    response) if the date is malformed, not before yesterday (still
+    scored, see is_scored_date) or has no event.
+    """
+    try:
+        datetime.strptime(event_date or "", "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "Invalid date"}), 400)
+    if not archive_cache.is_archived(event_date):
+        error = "Only events from before yesterday can be played in the archive"
+        return None, (jsonify({"error": error}), 403)
+    event = archive_cache.get(event_date)
+    if not event:
+        return None, (jsonify({"error": "No event found for that date"}), 404)
+    return event, None
+
+@app.route("/api/archive/event", methods=["GET"])
+def api_archive_event():
+    """A past day's event (?date=YYYY-MM-DD) without the answer, like /api/event."""
+    event, error = archive_event(request.args.get("date"))
+    if error:
+        return error
+    cached = archive_responses.get(event["date"], event, lambda: public_event_payload(event))
+    return cached_json_response(cached, ARCHIVE_CACHE_CONTROL)
+
+@app.route("/api/archive/guess", methods=["POST"])
+def archive_guess():
+    data = request.get_json()
+    guess = data.get("guess", "").strip().lower()
+    if not guess:
+        return jsonify({"error": "Invalid guess data"}), 400
+    event, error = archive_event(data.get("event_date"))
+    if error:
+        return error
+    normalized, score = event["matcher"].judge(guess)
+    guess_log.record(event["date"], normalized, score is not None)
+    return jsonify({"correct": score is not None})
+
+@app.route("/api/archive/reveal_answer", methods=["POST"])
+def archive_reveal_answer():
+    """The answer, alt_answers and summary of a past day's event."""
+    event, error = archive_event((request.get_json() or {}).get("event_date"))
+    if error:
+        return error
+    return jsonify({
+        "answer": event.get("answer"),
+        "alt_answers": event.get("alt_answers", []),
+        "summary": event.get("summary")
+    })
 
 @app.route("/api/me", methods=["GET"])
 def me():
@@ -127,8 +378,7 @@ def me():
 @app.route("/api/user_stats", methods=["GET"])
 def user_stats():
     if "username" in session:
-        result = supabase.table("users").select("*").eq("username", session.get("username")).single().execute()
-        user_data = result.data
+        user_data = profile_cache.get(session.get("username"), "streak")
         if user_data:
             return jsonify({
                 "streak": user_data.get("streak", 0)
@@ -169,53 +419,262 @@ def check_guess():
     if not event or event.get("date") != event_date:
         return jsonify({"error": "Event mismatch"}), 403
 
-    correct = event.get("answer", "").strip().lower()
-    alt_answers = [a.strip().lower() for a in event.get("alt_answers", [])]
-
-    # 1) Exact match
-    if guess == correct or guess in alt_answers:
-        return jsonify({"correct": True})
+    # Exact hit on the normalised answers, else one fuzzy pass over all of them.
+    normalized, score = event["matcher"].judge(guess)
+    guess_log.record(event_date, normalized, score is not None)
+    return jsonify({"correct": score is not None})
+
+def cached_x_ids(names):
+    """(x_ids known from the shared cache, names still to look up)."""
+    x_ids, missing = {}, []
+    for name in set(names):
+        # Wrapped, so a user without an x_id is still a cache hit.
+        cached = x_id_cache.get(f"x_id:{name}")
+        if cached is None:
+            missing.append(name)
+        else:
+            x_ids[name] = cached["x_id"]
+    return x_ids, missing
 
-    # 2) Fuzzy match against the official answer (character‑based)
-    if fuzz.ratio(guess, correct) >= FUZZ_THRESHOLD:
-        return jsonify({"correct": True})
+def remember_x_ids(x_ids, missing, found):
+    for name in missing:
+        x_ids[name] = found.get(name) or None
+        x_id_cache.set(f"x_id:{name}", {"x_id": x_ids[name]})
+    return x_ids
 
-    # 3) Fuzzy match against each alt answer (character‑based)
-    for alt in alt_answers:
-        if fuzz.ratio(guess, alt) >= FUZZ_THRESHOLD:
-            return jsonify({"correct": True})
+def lookup_x_ids(names):
+    """
+    Map usernames to x_id for the given leaderboard names. Known names come
+    from the shared cache; the rest are fetched with one batched query.
+    """
+    x_ids, missing = cached_x_ids(names)
+    if missing:
+        remember_x_ids(x_ids, missing, db.get_x_ids(missing))
+    return x_ids
 
-    # 4) Otherwise wrong
-    return jsonify({"correct": False})
+def leaderboard_params(args):
+    """limit (1-100, default 10) and max_clues (default 5) from the query string."""
+    limit = min(max(args.get("limit", 10, type=int), 1), 100)
+    return limit, args.get("max_clues", MAX_CLUES, type=int)
 
 @app.route("/api/leaderboard", methods=["GET"])
 def api_leaderboard():
-    """API endpoint to retrieve the top 10 leaderboard entries for today."""
+    """
+    API endpoint to retrieve today's top leaderboard entries.
+    Optional query parameters: limit (default 10, at most 100) and
+    max_clues (default 5; entries that used more clues are left out).
+    """
     today_str = get_current_game_date()
+    limit, max_clues = leaderboard_params(request.args)
     try:
-        result = supabase.table("leaderboard") \
-                         .select("*") \
-                         .eq("date", today_str) \
-                         .lte("clues_used", 5) \
-                         .order("solve_time", desc=False) \
-                         .order("clues_used", desc=False) \
-                         .limit(10) \
-                         .execute()
-        leaderboard_data = result.data or []
-        # For each leaderboard entry, lookup the user's x_id from the users table.
-        for entry in leaderboard_data:
-            user_result = supabase.table("users") \
-                                  .select("x_id") \
-                                  .eq("username", entry["name"]) \
-                                  .single() \
-                                  .execute()
-            user_info = user_result.data
-            entry["x_id"] = user_info.get("x_id") if (user_info and user_info.get("x_id")) else None
-        return jsonify(leaderboard_data)
+        board = leaderboard_store.board(today_str)
+        key = ("leaderboard", today_str, limit, max_clues)
+        cached = board_responses.lookup(key, board.version)
+        if cached is None:
+            version = board.version
+            leaderboard_data = board.top(limit, max_clues)
+            x_ids = lookup_x_ids([entry["name"] for entry in leaderboard_data])
+            for entry in leaderboard_data:
+                entry["x_id"] = x_ids.get(entry["name"])
+            cached = board_responses.store(key, version, leaderboard_data)
+        return cached_json_response(cached, board_cache_control())
     except Exception as e:
         print("Leaderboard fetch error:", e)
         return jsonify({"error": "Failed to fetch leaderboard data"}), 500
 
+@app.before_request
+def prewarm_leaderboard():
+    """
+    Each worker reads today's rows once, in the background, as soon as it
+    serves its first request; the board and /api/event_stats are then kept
+    current by the submissions themselves.
+    """
+    leaderboard_store.prewarm(get_current_game_date())
+
+@app.route("/api/event_stats", methods=["GET"])
+def event_stats():
+    """
+    How today's event is going: players, solve rate, a histogram of clues
+    used and the solve-time distribution with percentiles. Served from
+    running aggregates that every submission updates; no table reads.
+    """
+    today_str = get_current_game_date()
+    try:
+        board = leaderboard_store.board(today_str)
+        cached = board_responses.get(("event_stats", today_str), board.version, board.stats)
+        return cached_json_response(cached, board_cache_control())
+    except Exception as e:
+        print("Event stats error:", e)
+        return jsonify({"error": "Failed to fetch event stats"}), 500
+
+def leaderboard_page(game_date, snapshot_id, limit, max_clues, after=None, before=None):
+    """
+    One page of the full board as of snapshot_id (the largest leaderboard
+    id included, see Backend.leaderboard_snapshot_id), so rows that land
+    later never shift the pages. Rows are ordered by solve_seconds, as on
+    /api/leaderboard, whatever format solve_time was sent in. after /
+    before are cursors from a previous page; each page carries its own
+    prev and next cursors (None at either end) and 1-based ranks.
+    """
+    after_key, after_rank = decode_cursor(after) if after else (None, 0)
+    before_key, before_rank = decode_cursor(before) if before else (None, 0)
+    # One extra row tells whether there is another page in that direction.
+    rows = db.fetch_leaderboard(game_date, limit + 1, after=after_key, before=before_key,
+                                max_clues=max_clues, snapshot_id=snapshot_id)
+    more = len(rows) > limit
+    if before_key is not None and after_key is None:
+        rows = rows[1:] if more else rows
+        first_rank = before_rank - len(rows)
+        has_prev, has_next = more, True
+    else:
+        rows = rows[:limit]
+        first_rank = after_rank + 1
+        has_prev, has_next = first_rank > 1, more
+    return page_payload(game_date, snapshot_id, rows, first_rank, has_prev, has_next)
+
+def page_payload(game_date, snapshot_id, rows, first_rank, has_prev, has_next):
+    x_ids = lookup_x_ids([row["name"] for row in rows])
+    entries = [dict(row, rank=first_rank + i, x_id=x_ids.get(row["name"])) for i, row in enumerate(rows)]
+    return {
+        "date": game_date,
+        "snapshot": snapshot_id,
+        "entries": entries,
+        "prev": encode_cursor(rows[0], first_rank) if rows and has_prev else None,
+        "next": encode_cursor(rows[-1], first_rank + len(rows) - 1) if rows and has_next else None
+    }
+
+@app.route("/api/leaderboard/page", methods=["GET"])
+def api_leaderboard_page():
+    """
+    Today's full leaderboard, a page at a time. Query parameters: limit
+    and max_clues as for /api/leaderboard, `after` or `before` (a cursor
+    from a previous page) and `snapshot` (from the first page; pass it on
+    so every page sees the same rows).
+    """
+    today_str = get_current_game_date()
+    limit, max_clues = leaderboard_params(request.args)
+    snapshot_id = request.args.get("snapshot", type=int)
+    after, before = request.args.get("after"), request.args.get("before")
+    try:
+        # A pinned snapshot's pages never change; the first page follows the board.
+        version = snapshot_id if snapshot_id is not None else leaderboard_store.board(today_str).version
+        key = ("leaderboard-page", today_str, snapshot_id, limit, max_clues, after, before)
+        cached = board_responses.lookup(key, version)
+        if cached is None:
+            snapshot = snapshot_id if snapshot_id is not None else db.leaderboard_snapshot_id(today_str)
+            payload = leaderboard_page(today_str, snapshot, limit, max_clues, after, before)
+            cached = board_responses.store(key, version, payload)
+        return cached_json_response(cached, board_cache_control())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Leaderboard page error:", e)
+        return jsonify({"error": "Failed to fetch leaderboard data"}), 500
+
+@app.route("/api/leaderboard/me", methods=["GET"])
+def api_leaderboard_me():
+    """
+    Jump to my rank: the page of the full board around the session user's
+    best entry today, with its rank. Takes limit, max_clues and snapshot
+    like /api/leaderboard/page; the cursors page on from there.
+    """
+    username = session.get("username")
+    if not username:
+        return jsonify({"error": "Not authenticated"}), 401
+    today_str = get_current_game_date()
+    limit, max_clues = leaderboard_params(request.args)
+    try:
+        snapshot_id = request.args.get("snapshot", type=int)
+        if snapshot_id is None:
+            snapshot_id = db.leaderboard_snapshot_id(today_str)
+        position = db.leaderboard_position(today_str, username, max_clues, snapshot_id)
+        if position is None:
+            return jsonify({"error": "No leaderboard entry today"}), 404
+        row, rank = position
+        key = keyset_key(row)
+        above = db.fetch_leaderboard(today_str, limit // 2 + 1, before=key,
+                                     max_clues=max_clues, snapshot_id=snapshot_id)
+        has_prev = len(above) > limit // 2
+        above = above[1:] if has_prev else above
+        below = db.fetch_leaderboard(today_str, limit - len(above), after=key,
+                                     max_clues=max_clues, snapshot_id=snapshot_id)
+        has_next = len(below) > limit - len(above) - 1
+        rows = above + [row] + below[:limit - len(above) - 1]
+        payload = page_payload(today_str, snapshot_id, rows, rank - len(above), has_prev, has_next)
+        return jsonify(dict(payload, rank=rank))
+    except Exception as e:
+        print("Leaderboard rank lookup error:", e)
+        return jsonify({"error": "Failed to fetch leaderboard data"}), 500
+
+# SCORE_INGEST_MODE=queue accepts scores into a local queue (see
+# sql/score_queue.sql); the default "sync" writes them before responding.
+SCORE_INGEST_MODE = os.environ.get("SCORE_INGEST_MODE", "sync")
+
+def flush_queued_scores(entries, stats):
+    """Write a queued batch, then drop the streak snapshot if the new streaks change it."""
+    db.flush_scores(entries, stats)
+    # Not before: a snapshot rebuilt until now would still read the old streaks.
+    for username, user_stats in stats.items():
+        streak_board.note_change(username, user_stats.get("streak"))
+
+score_queue = ScoreQueue(flush_queued_scores) if SCORE_INGEST_MODE == "queue" else None
+
+def queue_score(username, solve_time, clues_used, event_date, win, current_game_day):
+    """
+    Compute the user's new stats and queue the score for a background
+    flush. Returns the stats plus the queued entry, or None if the user
+    doesn't exist.
+    """
+    entry = {
+        "name": username,
+        "solve_time": str(solve_time),
+        "clues_used": clues_used,
+        "date": event_date,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+    # The base stats load runs outside the queue's write lock; the result
+    # is applied and queued under it, so concurrent submits for the same
+    # user can't overwrite each other.
+    queued = score_queue.enqueue_result(
+        entry,
+        lambda: profile_cache.get(username, ", ".join(STAT_COLUMNS)),
+        lambda current: apply_result(current, bool(win), current_game_day)
+    )
+    if queued is None:
+        return None
+    entry["submission_id"], stats = queued
+    return dict(stats, entry=entry)
+
+def score_response(stats, username, event_date, current_game_day):
+    """Publish the stored entry and new stats, and build the reply."""
+    leaderboard_store.record(stats["entry"])
+    profile_cache.update(username, {column: stats[column] for column in STAT_COLUMNS})
+    if score_queue is None:
+        # Queued scores are noted by flush_queued_scores() once they're stored.
+        streak_board.note_change(username, stats["streak"])
+    response = {
+        "success": True,
+        "streak": stats["streak"],
+        "days_played": stats["days_played"],
+        "total_wins": stats["total_wins"],
+        "total_losses": stats["total_losses"],
+        "longest_win_streak": stats["longest_win_streak"]
+    }
+    # Where this entry placed today, e.g. 143rd of 2,310.
+    placing = None
+    if event_date == current_game_day:
+        placing = leaderboard_store.board(event_date).rank(username)
+    if placing:
+        response["rank"], response["players"] = placing
+    return response
+
+# Archive games (anything before yesterday's, which may still be finishing
+# across the cutoff) are never written to the leaderboard or the streaks.
+ARCHIVE_SCORE_SKIPPED = {"success": True, "message": "Score submission skipped for archive game."}
+
+def is_scored_date(event_date, current_game_day):
+    return event_date in (current_game_day, previous_game_date(current_game_day))
+
 @app.route("/api/submit_score", methods=["POST"])
 def submit_score():
     data = request.get_json()
@@ -235,94 +694,25 @@ def submit_score():
     if not username or not solve_time or clues_used is None or not event_date:
         return jsonify({"error": "Missing data"}), 400
 
-    # Build our score entry
-    score_entry = {
-        "name": username,
-        "solve_time": solve_time,
-        "clues_used": clues_used,
-        "date": event_date,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
-
-    # Retrieve x_id either from the request or the user record.
-    # if "x_id" in data and data["x_id"].strip():
-    #     score_entry["x_id"] = data["x_id"].strip()
-    # else:
-    #     result = supabase.table("users").select("x_id").eq("username", username).single().execute()
-    #     user_info = result.data
-    #     if user_info and user_info.get("x_id"):
-    #         score_entry["x_id"] = user_info.get("x_id")
-
-    try:
-        supabase.table("leaderboard").insert(score_entry).execute()
-    except Exception as e:
-        print("Leaderboard insert error:", str(e))
-        return jsonify({"error": "Failed to record leaderboard entry."}), 500
-
-    # Update the user's statistics.
+    # Insert the leaderboard row and update the user's statistics in one
+    # transactional round trip (see sql/submit_score.sql).
+    current_game_day = get_current_game_date()  # Using your game's cutoff logic.
+    if not is_scored_date(event_date, current_game_day):
+        return jsonify(ARCHIVE_SCORE_SKIPPED)
     try:
-        result = supabase.table("users").select("*").eq("username", username).single().execute()
-        user_data = result.data
-        if not user_data:
-            return jsonify({"error": "User not found."}), 404
-
-        days_played = user_data.get("days_played") or 0
-        total_wins = user_data.get("total_wins") or 0
-        total_losses = user_data.get("total_losses") or 0
-        current_streak = user_data.get("streak") or 0
-        longest_win_streak = user_data.get("longest_win_streak") or 0
-
-        today = datetime.strptime(event_date, "%Y-%m-%d").date()
-        days_played += 1
-
-        current_game_day = get_current_game_date()  # Using your game's cutoff logic.
-        current_game_date_obj = datetime.strptime(current_game_day, "%Y-%m-%d").date()
-        if win:
-            total_wins += 1
-            last_win = user_data.get("last_win_date")
-            if last_win:
-                last_win_date = datetime.fromisoformat(last_win).date()
-                day_difference = (current_game_date_obj - last_win_date).days
-                if day_difference == 1:
-                    current_streak += 1
-                elif day_difference > 1:
-                    current_streak = 1
-                # day_difference == 0 means same day; no update.
-            else:
-                current_streak = 1
-
-            if current_streak > longest_win_streak:
-                longest_win_streak = current_streak
-            new_last_win_date = current_game_day
+        if score_queue is not None:
+            stats = queue_score(username, solve_time, clues_used, event_date, win, current_game_day)
         else:
-            total_losses += 1
-            current_streak = 0
-            new_last_win_date = user_data.get("last_win_date")
-
-        # Update the user's statistics.
-        supabase.table("users").update({
-            "streak": current_streak,
-            "days_played": days_played,
-            "total_wins": total_wins,
-            "total_losses": total_losses,
-            "longest_win_streak": longest_win_streak,
-            "last_win_date": new_last_win_date,
-            "last_played_date": current_game_day
-        }).eq("username", username).execute()
-
-        return jsonify({
-            "success": True,
-            "streak": current_streak,
-            "days_played": days_played,
-            "total_wins": total_wins,
-            "total_losses": total_losses,
-            "longest_win_streak": longest_win_streak
-        })
+            stats = db.submit_score(username, solve_time, clues_used, event_date, win, current_game_day)
+        if stats is None:
+            return jsonify({"error": "User not found."}), 404
     except Exception as e:
         error_message = str(e)
         print("Leaderboard insert error:", error_message)
         return jsonify({"error": f"Failed to record leaderboard entry. Error: {error_message}"}), 500
 
+    return jsonify(score_response(stats, username, event_date, current_game_day))
+
 @app.route("/api/already_played", methods=["POST"])
 def already_played():
     """
@@ -334,8 +724,7 @@ def already_played():
     if not username:
         return jsonify({"error": "Missing username"}), 400
 
-    result = supabase.table("users").select("last_played_date").eq("username", username).single().execute()
-    user = result.data
+    user = profile_cache.get(username, "last_played_date")
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -356,10 +745,16 @@ def register():
     x_id = data.get("x_id", "").strip()
     if not username or not password:
         return jsonify({"error": "Username and password required."}), 400
-    result = supabase.table("users").select("username").eq("username", username).execute()
-    if result.data:
+    if not is_valid_name(username):
+        return jsonify({"error": "Usernames are 1-20 letters, digits, spaces or _.- and must be clean."}), 400
+    if x_id and not is_valid_x_username(x_id):
+        return jsonify({"error": "Invalid X username provided."}), 400
+    if db.get_user(username, "username"):
         return jsonify({"error": "Username already exists."}), 409
-    hashed_pw = generate_password_hash(password)
+    try:
+        hashed_pw = password_hasher.hash(password)
+    except HasherBusy:
+        return jsonify({"error": "Server busy, please try again."}), 503
     new_user = {
         "username": username,
         "password": hashed_pw,
@@ -373,7 +768,7 @@ def register():
         "created_at": datetime.utcnow().isoformat()
     }
     try:
-        supabase.table("users").insert(new_user).execute()
+        db.create_user(new_user)
         session['username'] = username
         session.permanent = True
         return jsonify({
@@ -395,12 +790,21 @@ def login():
     data = request.get_json()
     username = data.get("username", "").strip()
     password = data.get("password", "").strip()
-    result = supabase.table("users").select("*").eq("username", username).single().execute()
-    user = result.data
+    user = profile_cache.get(username, "username, password, streak, x_id")
     if not user:
         return jsonify({"error": "User not found."}), 404
-    if not check_password_hash(user["password"], password):
-        return jsonify({"error": "Incorrect password."}), 401
+    try:
+        if not password_hasher.verify(user["password"], password):
+            return jsonify({"error": "Incorrect password."}), 401
+        if password_hasher.needs_rehash(user["password"]):
+            # Hash parameters changed since this one was stored; upgrade it.
+            try:
+                db.update_user(user["username"], {"password": password_hasher.hash(password)})
+            except Exception as e:
+                # Not fatal: the old hash still works and is retried next login.
+                print("Password rehash failed:", str(e))
+    except HasherBusy:
+        return jsonify({"error": "Server busy, please try again."}), 503
     session['username'] = user["username"]
     session.permanent = True
     return jsonify({
@@ -420,12 +824,8 @@ def logout():
 @app.route("/api/user_full_stats", methods=["GET"])
 def user_full_stats():
     if "username" in session:
-        result = supabase.table("users") \
-                         .select("*") \
-                         .eq("username", session.get("username")) \
-                         .single() \
-                         .execute()
-        user_data = result.data
+        user_data = profile_cache.get(session.get("username"),
+                                      "streak, total_wins, days_played, longest_win_streak")
         if user_data:
             days_played = user_data.get("days_played") or 0
             total_wins = user_data.get("total_wins") or 0
@@ -441,21 +841,61 @@ def user_full_stats():
             })
     return jsonify({"error": "Not authenticated"}), 401
 
+# Threads for the independent reads of /api/bootstrap.
+bootstrap_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bootstrap")
+
+def bootstrap_payload(username, event, profile, streak_data):
+    """First-page-load state, from the reads made by /api/bootstrap."""
+    payload = {
+        "username": username,
+        "event": public_event_payload(event) if event else None,
+        "stats": None,
+        "already_played": None,
+        "streak_leaderboard": streak_data,
+        "rollover_at": game_clock.rollover_at()
+    }
+    if profile:
+        payload["stats"] = {"streak": profile.get("streak", 0)}
+        payload["already_played"] = profile.get("last_played_date") == get_current_game_date()
+    return payload
+
+@app.route("/api/bootstrap", methods=["GET"])
+def bootstrap():
+    """
+    Everything the page needs on first load in one round trip: session
+    identity, today's event, the user's streak and already-played flag,
+    and the streak leaderboard. The three reads run concurrently, and one
+    profile read serves both the stats and the already-played check.
+    """
+    username = session.get("username")
+
+    def submit(fn, *args):
+        # Copy the context so backend calls count towards this request's timings.
+        return bootstrap_pool.submit(contextvars.copy_context().run, fn, *args)
+
+    event = submit(get_event_for_today)
+    profile = submit(profile_cache.get, username, "streak, last_played_date") if username else None
+    streaks = submit(streak_board.top, 5)
+    try:
+        streak_data = streaks.result()
+    except Exception as e:
+        print("Error fetching streak leaderboard:", e)
+        streak_data = []
+    return jsonify(bootstrap_payload(username, event.result(),
+                                     profile.result() if profile else None, streak_data))
+
 # Route for the top streak leaders
 @app.route("/api/streak_leaderboard", methods=["GET"])
 def streak_leaderboard():
     """
     API endpoint to retrieve the top 5 users with the highest current streaks.
-    This queries the users table and sorts by the streak column in descending order.
+    Served from the shared snapshot; the users table is only sorted again
+    after a change that can alter the list.
     """
     try:
-        result = supabase.table("users") \
-                         .select("username, streak, x_id") \
-                         .order("streak", desc=True) \
-                         .limit(5) \
-                         .execute()
-        streak_data = result.data
-        return jsonify(streak_data)
+        streak_data = streak_board.top(5)
+        cached = board_responses.get(("streaks",), streak_data, lambda: streak_data)
+        return cached_json_response(cached, board_cache_control())
     except Exception as e:
         print("Error fetching streak leaderboard:", e)
         return jsonify({"error": "Failed to fetch streak leaderboard"}), 500
@@ -476,7 +916,11 @@ def update_x_profile():
         return jsonify({"error": "Invalid X username provided."}), 400
     
     try:
-        supabase.table("users").update({"x_id": new_x_id}).eq("username", username).execute()
+        db.update_user(username, {"x_id": new_x_id})
+        profile_cache.update(username, {"x_id": new_x_id})
+        streak_board.note_change(username)
+        # Leaderboard x_ids are cached, so let it pick up the new one.
+        x_id_cache.delete(f"x_id:{username}")
         return jsonify({"success": True, "x_id": new_x_id})
     except Exception as e:
         print("Update x profile error:", str(e))
@@ -499,13 +943,42 @@ def delete_account():
 
     try:
         # Remove the user from the users table.
-        supabase.table("users").delete().eq("username", username).execute()
+        db.delete_user(username)
+        profile_cache.evict(username)
+        streak_board.note_change(username)
+        x_id_cache.delete(f"x_id:{username}")
         session.clear()  # Clear the session upon deletion.
         return jsonify({"success": True})
     except Exception as e:
         print("Error deleting account:", str(e))
         return jsonify({"error": "Failed to delete account."}), 500
 
+startup.mark("setup")
+
+
+def create_app():
+    """
+    App factory for gunicorn: `gunicorn --preload "app:create_app()"`.
+
+    Importing this module only builds cheap objects; clients, word lists
+    and caches are otherwise created on first use. This does the
+    CPU-bound part of that up front. Under --preload it runs once in the
+    master and every worker inherits the result when it forks. Nothing
+    here opens a connection or starts a thread (the rollover, flusher and
+    hashing threads all start on first use in each worker), so nothing is
+    shared across the fork.
+    """
+    with startup.phase("warm"):
+        warm_backend()
+        profanity_filter.compile()
+        password_hasher.warm()
+        assets.manifest()
+        app.jinja_env.get_template("index.html")
+    startup.report()
+    return app
+
+
 if __name__ == "__main__":
+    startup.report()
     # In production, debug should be disabled for security reasons.
     app.run(host='0.0.0.0', port=5002, debug=False)
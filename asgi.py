@@ -0,0 +1,271 @@
+"""
+Async serving mode.
+
+The game endpoints, /api/bootstrap included, are served by native async
+handlers. Score submissions (sync ingest mode) and the leaderboard's
+x_id lookups go to Supabase through one pooled HTTP client per worker
+(see utils/async_db.py), so a worker keeps accepting requests while
+those round trips are in flight. Event, board, streak and profile reads
+are served from the caches app.py keeps; a miss loads through the sync
+backend on a worker thread, so the caches' single-flight still holds.
+Everything else - pages, static files, auth, settings - is passed to
+the regular Flask app.
+
+    uvicorn asgi:application --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:application
+"""
+import asyncio
+import json
+from typing import Dict, List
+from urllib.parse import parse_qsl
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from itsdangerous import BadSignature
+from werkzeug.datastructures import MultiDict
+
+from app import (ARCHIVE_SCORE_SKIPPED, app, board_cache_control, board_responses, bootstrap_payload, event_cache,
+                 event_cache_control, event_response_body, get_current_game_date, guess_log, is_scored_date,
+                 leaderboard_params, leaderboard_store, profile_cache, queue_score, cached_x_ids, remember_x_ids,
+                 score_queue, score_response, streak_board)
+from utils import metrics
+from utils.async_db import add_async_backend_wrapper, close_async_backend, get_async_backend
+from utils.http_cache import conditional
+
+# Usernames per x_id query; a page of 100 names becomes 4 concurrent requests.
+X_ID_CHUNK = 25
+
+
+
+class ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs every WSGI call on one shared thread (thread_sensitive),
+    # so a slow Flask route would queue all the others behind it.
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.run_wsgi_app.__wrapped__, thread_sensitive=False)
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi with Flask requests spread over the event loop's thread pool."""
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolWsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+wsgi_application = ThreadPoolWsgiToAsgi(app)
+session_serializer = app.session_interface.get_signing_serializer(app)
+session_cookie = app.config["SESSION_COOKIE_NAME"]
+
+if metrics.METRICS_ENABLED:
+    add_async_backend_wrapper(metrics.InstrumentedAsyncBackend)
+
+
+class Request:
+    def __init__(self, scope, body: bytes):
+        self.scope = scope
+        self.body = body
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.args = MultiDict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+
+    def json(self) -> Dict:
+        try:
+            data = json.loads(self.body or b"null")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def session(self) -> Dict:
+        """The Flask session, decoded from its signed cookie (read-only)."""
+        for part in self.headers.get("cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == session_cookie:
+                try:
+                    return session_serializer.loads(
+                        value, max_age=int(app.permanent_session_lifetime.total_seconds())
+                    )
+                except BadSignature:
+                    return {}
+        return {}
+
+
+async def get_event(game_date: str):
+    event = event_cache.cached(game_date)
+    if event is None:
+        # Miss: load through the shared cache so workers still single-flight.
+        event = await asyncio.to_thread(event_cache.get, game_date)
+    return event
+
+
+async def api_event(request):
+    event = await get_event(get_current_game_date())
+    if not event:
+        return 404, {"error": "No event found for today"}
+    return conditional(request.headers.get("if-none-match"), event_response_body(event), event_cache_control())
+
+
+async def check_guess(request):
+    data = request.json()
+    guess = str(data.get("guess", "")).strip().lower()
+    event_date = data.get("event_date")
+    if not guess or not event_date:
+        return 400, {"error": "Invalid guess data"}
+    event = await get_event(get_current_game_date())
+    if not event or event.get("date") != event_date:
+        return 403, {"error": "Event mismatch"}
+    normalized, score = event["matcher"].judge(guess)
+    guess_log.record(event_date, normalized, score is not None)
+    return 200, {"correct": score is not None}
+
+
+async def lookup_x_ids(names: List[str]):
+    """Async lookup_x_ids: cached names first, the rest in concurrent chunks."""
+    x_ids, missing = await asyncio.to_thread(cached_x_ids, names)
+    if missing:
+        backend = get_async_backend()
+        chunks = [missing[i:i + X_ID_CHUNK] for i in range(0, len(missing), X_ID_CHUNK)]
+        found = {}
+        for part in await asyncio.gather(*(backend.get_x_ids(chunk) for chunk in chunks)):
+            found.update(part)
+        await asyncio.to_thread(remember_x_ids, x_ids, missing, found)
+    return x_ids
+
+
+async def api_leaderboard(request):
+    today_str = get_current_game_date()
+    limit, max_clues = leaderboard_params(request.args)
+    try:
+        board = await asyncio.to_thread(leaderboard_store.board, today_str)
+        key = ("leaderboard", today_str, limit, max_clues)
+        cached = board_responses.lookup(key, board.version)
+        if cached is None:
+            version = board.version
+            leaderboard_data = board.top(limit, max_clues)
+            x_ids = await lookup_x_ids([entry["name"] for entry in leaderboard_data])
+            for entry in leaderboard_data:
+                entry["x_id"] = x_ids.get(entry["name"])
+            cached = board_responses.store(key, version, leaderboard_data)
+        return conditional(request.headers.get("if-none-match"), cached, board_cache_control())
+    except Exception as e:
+        print("Leaderboard fetch error:", e)
+        return 500, {"error": "Failed to fetch leaderboard data"}
+
+
+async def streak_leaderboard(request):
+    try:
+        streak_data = await asyncio.to_thread(streak_board.top, 5)
+        cached = board_responses.get(("streaks",), streak_data, lambda: streak_data)
+        return conditional(request.headers.get("if-none-match"), cached, board_cache_control())
+    except Exception as e:
+        print("Error fetching streak leaderboard:", e)
+        return 500, {"error": "Failed to fetch streak leaderboard"}
+
+
+async def bootstrap(request):
+    username = request.session().get("username")
+    reads = [get_event(get_current_game_date()), asyncio.to_thread(streak_board.top, 5)]
+    if username:
+        reads.append(asyncio.to_thread(profile_cache.get, username, "streak, last_played_date"))
+    event, streak_data, *profile = await asyncio.gather(*reads, return_exceptions=True)
+    for result in [event] + profile:
+        if isinstance(result, Exception):
+            raise result
+    if isinstance(streak_data, Exception):
+        print("Error fetching streak leaderboard:", streak_data)
+        streak_data = []
+    return 200, bootstrap_payload(username, event, profile[0] if profile else None, streak_data)
+
+
+async def submit_score(request):
+    data = request.json()
+    username = data.get("username")
+    session = request.session()
+    if "username" not in session or session.get("username") != username:
+        return 200, {"success": True, "message": "Score submission skipped for non-registered user."}
+
+    solve_time = data.get("solve_time")
+    clues_used = data.get("clues_used")
+    event_date = data.get("event_date")
+    win = data.get("win", False)
+    if not username or not solve_time or clues_used is None or not event_date:
+        return 400, {"error": "Missing data"}
+
+    current_game_day = get_current_game_date()
+    if not is_scored_date(event_date, current_game_day):
+        return 200, ARCHIVE_SCORE_SKIPPED
+    try:
+        if score_queue is not None:
+            stats = await asyncio.to_thread(queue_score, username, solve_time, clues_used, event_date,
+                                            win, current_game_day)
+        else:
+            stats = await get_async_backend().submit_score(username, solve_time, clues_used, event_date,
+                                                           win, current_game_day)
+        if stats is None:
+            return 404, {"error": "User not found."}
+    except Exception as e:
+        error_message = str(e)
+        print("Leaderboard insert error:", error_message)
+        return 500, {"error": f"Failed to record leaderboard entry. Error: {error_message}"}
+
+    return 200, await asyncio.to_thread(score_response, stats, username, event_date, current_game_day)
+
+
+ROUTES = {
+    ("GET", "/api/bootstrap"): bootstrap,
+    ("GET", "/api/event"): api_event,
+    ("POST", "/api/guess"): check_guess,
+    ("GET", "/api/leaderboard"): api_leaderboard,
+    ("GET", "/api/streak_leaderboard"): streak_leaderboard,
+    ("POST", "/api/submit_score"): submit_score,
+}
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def application(scope, receive, send):
+    handler = None
+    if scope["type"] == "http":
+        handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        if scope["type"] == "lifespan":
+            return await lifespan(receive, send)
+        return await wsgi_application(scope, receive, send)
+
+    # Timed like the Flask routes: same histogram, same Server-Timing header.
+    start = metrics.start_request() if metrics.METRICS_ENABLED else None
+    request = Request(scope, await read_body(receive))
+    # Handlers return (status, payload), or (status, body bytes, headers)
+    # for responses that were serialised ahead of time.
+    status, payload, *extra = await handler(request)
+    body = payload if isinstance(payload, bytes) else app.json.dumps(payload).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    for name, value in (extra[0] if extra else []):
+        headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+    if start is not None:
+        server_timing = metrics.finish_request(start, scope["path"], scope["method"], status)
+        headers.append((b"server-timing", server_timing.encode("latin-1")))
+    # Same CORS answer as flask_cors(supports_credentials=True): echo the origin.
+    origin = request.headers.get("origin")
+    if origin:
+        headers += [(b"access-control-allow-origin", origin.encode("latin-1")),
+                    (b"access-control-allow-credentials", b"true"),
+                    (b"vary", b"Origin")]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Today's board and event stats load in the background at startup.
+            leaderboard_store.prewarm(get_current_game_date())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_backend()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
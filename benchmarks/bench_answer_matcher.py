@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: guesses/sec for the compiled AnswerMatcher against the
+per-request loop check_guess() used before it.
+
+    python -m benchmarks.bench_answer_matcher [--guesses 20000]
+"""
+import argparse
+import random
+import string
+import time
+
+from rapidfuzz import fuzz
+
+from utils.answer_matcher import FUZZ_THRESHOLD, AnswerMatcher
+
+
+def legacy_check(guess, answer, alt_answers):
+    """The old check_guess() body, including its per-request normalisation."""
+    guess = guess.strip().lower()
+    correct = answer.strip().lower()
+    alts = [a.strip().lower() for a in alt_answers]
+    if guess == correct or guess in alts:
+        return True
+    if fuzz.ratio(guess, correct) >= FUZZ_THRESHOLD:
+        return True
+    for alt in alts:
+        if fuzz.ratio(guess, alt) >= FUZZ_THRESHOLD:
+            return True
+    return False
+
+
+def random_phrase(rng):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+             for _ in range(rng.randint(1, 4))]
+    return " ".join(words)
+
+
+def make_guesses(rng, answers, count):
+    # Mostly wrong guesses (the expensive path), some exact, some typos.
+    guesses = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            guesses.append(rng.choice(answers))
+        elif roll < 0.2:
+            a = list(rng.choice(answers))
+            a[rng.randrange(len(a))] = rng.choice(string.ascii_lowercase)
+            guesses.append("".join(a))
+        else:
+            guesses.append(random_phrase(rng))
+    return guesses
+
+
+def rate(fn, guesses):
+    start = time.perf_counter()
+    for g in guesses:
+        fn(g)
+    return len(guesses) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guesses", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'alts':>5} {'legacy/s':>12} {'matcher/s':>12} {'speedup':>8}")
+    for n_alts in (1, 10, 100):
+        answer = random_phrase(rng)
+        alts = [random_phrase(rng) for _ in range(n_alts)]
+        guesses = make_guesses(rng, [answer] + alts, args.guesses)
+        matcher = AnswerMatcher([answer] + alts)
+
+        legacy = rate(lambda g: legacy_check(g, answer, alts), guesses)
+        compiled = rate(matcher.matches, guesses)
+        print(f"{n_alts:>5} {legacy:>12,.0f} {compiled:>12,.0f} {compiled / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark: concurrent connections one worker can carry, sync vs async.
+
+Starts one gunicorn sync worker (app:app) and one uvicorn worker
+(asgi:application) on the local SQLite backend with simulated per-call
+latency, then drives each with an asyncio load generator at several
+concurrency levels. Every virtual client is a logged-in player looping
+for a fixed time over the reads the game polls (/api/event,
+/api/leaderboard, /api/streak_leaderboard), one read that no cache
+answers (/api/leaderboard/me, three backend queries) and
+/api/submit_score (sync ingest mode: one backend write). Every submit
+also moves the board, so /api/leaderboard misses its response cache
+after each one. Reports throughput and latency overall and per path.
+
+With 40 ms per backend call, one worker on a small box carried about
+20 req/s (p95 2.5 s at 50 clients) under gunicorn sync and about
+120 req/s (p95 1.0 s at 50 clients) under uvicorn. That is far below
+the cached-reads-only mix, where every request is served from memory.
+
+    python -m benchmarks.bench_async [--concurrency 1,10,50,100] [--latency-ms 40]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load_test import ROOT, configure_env, free_port, percentile, seed, session_cookies
+
+PATHS = [("GET", "/api/event"), ("GET", "/api/leaderboard"), ("GET", "/api/streak_leaderboard"),
+         ("GET", "/api/leaderboard/me"), ("POST", "/api/submit_score")]
+USERS = 50
+
+SERVERS = {
+    "gunicorn sync": lambda port: [sys.executable, "-m", "gunicorn", "--workers", "1",
+                                   "--backlog", "2048", "--bind", f"127.0.0.1:{port}",
+                                   "--log-level", "warning", "app:app"],
+    "uvicorn async": lambda port: [sys.executable, "-m", "uvicorn", "--workers", "1",
+                                   "--backlog", "2048", "--port", str(port),
+                                   "--log-level", "warning", "asgi:application"],
+}
+
+
+def wait_until_up(base, deadline=30):
+    stop = time.time() + deadline
+    while True:
+        try:
+            httpx.get(base + "/api/me", timeout=1)
+            return
+        except httpx.HTTPError:
+            if time.time() > stop:
+                raise RuntimeError(f"server at {base} did not start")
+            time.sleep(0.2)
+
+
+async def fetch(conn, host, method, path, cookie, body=b""):
+    """One request on a keep-alive connection, reopened when the server closes it."""
+    if conn.get("reader") is None:
+        conn["reader"], conn["writer"] = await asyncio.open_connection(*host)
+    conn["writer"].write(f"{method} {path} HTTP/1.1\r\nHost: {host[0]}\r\nCookie: session={cookie}\r\n"
+                         f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    head = (await conn["reader"].readuntil(b"\r\n\r\n")).decode("latin-1").lower()
+    length = int(head.split("content-length:", 1)[1].split("\r\n", 1)[0])
+    await conn["reader"].readexactly(length)
+    if "connection: close" in head:
+        conn["writer"].close()
+        conn["reader"] = None
+    return int(head.split(" ", 2)[1])
+
+
+def score_body(username, game_date, i):
+    elapsed = 20 + i % 400
+    return json.dumps({"username": username, "solve_time": f"{elapsed // 60:02d}:{elapsed % 60:02d}",
+                       "clues_used": i % 6 + 1, "event_date": game_date, "win": True}).encode()
+
+
+async def drive(host, concurrency, duration, cookies, game_date):
+    """
+    Run `concurrency` clients, one connection each, for `duration` seconds;
+    returns ({path: latencies}, errors, wall). A bare asyncio HTTP/1.1
+    client keeps the load generator cheap enough to saturate a server on
+    the same box.
+    """
+    latencies = {path: [] for _, path in PATHS}
+    errors = 0
+    stop = time.perf_counter() + duration
+
+    async def worker(index):
+        nonlocal errors
+        conn = {}
+        user = index % len(cookies)
+        i = index
+        while time.perf_counter() < stop:
+            method, path = PATHS[i % len(PATHS)]
+            body = score_body(f"player{user}", game_date, i) if method == "POST" else b""
+            i += 1
+            start = time.perf_counter()
+            try:
+                if await fetch(conn, host, method, path, cookies[user], body) >= 400:
+                    errors += 1
+            except (OSError, asyncio.IncompleteReadError, IndexError, ValueError):
+                errors += 1
+                conn["reader"] = None
+            latencies[path].append(time.perf_counter() - start)
+        if conn.get("reader") is not None:
+            conn["writer"].close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return {path: sorted(values) for path, values in latencies.items()}, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,10,50,100", help="comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=40, help="simulated latency per backend call")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="historle-async-")
+    args.ingest_mode = None
+    configure_env(args, workdir)
+    # Metrics snapshots are per-process files; keep them out of the numbers.
+    os.environ["HISTORLE_METRICS"] = "0"
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    game_date = app_module.get_current_game_date()
+    seed(game_date, USERS)
+    # Everyone starts on the board, so /api/leaderboard/me finds a row.
+    from utils.db import SQLiteBackend
+    backend = SQLiteBackend(os.environ["HISTORLE_SQLITE_PATH"])
+    for user in range(USERS):
+        backend.insert_leaderboard_entry({"name": f"player{user}", "solve_time": f"{user + 30}",
+                                          "clues_used": user % 6 + 1, "date": game_date})
+    cookies = session_cookies(app_module.app, USERS)
+
+    print(f"backend latency {args.latency_ms:.0f} ms per call, {args.duration:.0f}s per level, 1 worker")
+    print(f"{'server':<14} {'clients':>7} {'path':<24} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for name, command in SERVERS.items():
+        port = free_port()
+        server = subprocess.Popen(command(port), cwd=ROOT, env=dict(os.environ))
+        base = f"http://127.0.0.1:{port}"
+        try:
+            wait_until_up(base)
+            for concurrency in levels:
+                by_path, errors, wall = asyncio.run(
+                    drive(("127.0.0.1", port), concurrency, args.duration, cookies, game_date)
+                )
+                rows = [("all", sorted(sum(by_path.values(), [])))] + list(by_path.items())
+                for path, latencies in rows:
+                    if latencies:
+                        print(f"{name:<14} {concurrency:>7} {path:<24} {len(latencies) / wall:>8.1f} "
+                              f"{percentile(latencies, 50) * 1000:>8.1f} "
+                              f"{percentile(latencies, 95) * 1000:>8.1f} "
+                              f"{errors if path == 'all' else '':>6}")
+        finally:
+            server.terminate()
+            server.wait(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: the offline guess evaluator (distinct guesses, one cdist per
+date and scorer, vectorised thresholds) against a per-guess extractOne
+loop over every scorer and threshold, on a synthetic season of logs.
+Also checks that both give the same accept counts.
+
+    python -m benchmarks.bench_guess_eval [--days 30] [--guesses 1000] [--workers -1]
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from rapidfuzz import process
+
+from benchmarks.bench_answer_matcher import make_guesses, random_phrase
+from utils.answer_matcher import normalize_answer
+from utils.guess_eval import DEFAULT_THRESHOLDS, SCORERS, evaluate
+
+
+def make_season(rng, days, guesses_per_day):
+    corpus, answers = {}, {}
+    for day in range(days):
+        game_date = f"2026-{1 + day // 28:02d}-{1 + day % 28:02d}"
+        choices = [random_phrase(rng) for _ in range(rng.randint(1, 4))]
+        # Popular wrong guesses repeat, as they do in real logs.
+        popular = [random_phrase(rng) for _ in range(50)]
+        guesses = make_guesses(rng, choices, guesses_per_day)
+        guesses = [rng.choice(popular) if rng.random() < 0.4 else guess for guess in guesses]
+        corpus[game_date] = Counter(normalize_answer(guess) for guess in guesses if normalize_answer(guess))
+        answers[game_date] = choices
+    return corpus, answers
+
+
+def loop_accepts(corpus, answers):
+    """Accept counts the obvious way: every logged guess, every scorer, every threshold."""
+    accepted = {}
+    for name, scorer in SCORERS.items():
+        for threshold in DEFAULT_THRESHOLDS:
+            total = 0
+            for game_date, counts in corpus.items():
+                for guess, count in counts.items():
+                    for _ in range(count):
+                        if process.extractOne(guess, answers[game_date], scorer=scorer, processor=None,
+                                              score_cutoff=threshold):
+                            total += 1
+            accepted[(name, threshold)] = total
+    return accepted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--guesses", type=int, default=1000, help="guesses logged per day")
+    parser.add_argument("--workers", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus, answers = make_season(random.Random(args.seed), args.days, args.guesses)
+    made = sum(sum(counts.values()) for counts in corpus.values())
+    distinct = sum(len(counts) for counts in corpus.values())
+    settings = len(SCORERS) * len(DEFAULT_THRESHOLDS)
+    print(f"{made:,} guesses ({distinct:,} distinct) over {args.days} days, {settings} settings")
+
+    start = time.perf_counter()
+    expected = loop_accepts(corpus, answers)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = evaluate(corpus, answers, workers=args.workers)
+    eval_seconds = time.perf_counter() - start
+
+    mismatches = [row for row in results
+                  if round(row["accept_rate"] * row["guesses"]) != expected[(row["scorer"], row["threshold"])]]
+    print(f"{'per-guess loop':<16} {loop_seconds:>8.2f}s")
+    print(f"{'evaluate()':<16} {eval_seconds:>8.2f}s  ({loop_seconds / eval_seconds:.0f}x)")
+    print(f"accept-count mismatches: {len(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
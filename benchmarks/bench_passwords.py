@@ -0,0 +1,81 @@
+"""
+Benchmark: password checks per second, and what a burst of logins does
+to the requests sharing the worker.
+
+Runs a burst of check_password_hash calls from --threads threads, once
+inline on the calling threads (the old behaviour) and once through
+PasswordHasher's process pool. Meanwhile one thread keeps answering
+guesses (AnswerMatcher.matches) the way /api/guess does; its p95
+latency shows how much the hashing stalls everything else in the
+process.
+
+    python -m benchmarks.bench_passwords [--logins 40] [--threads 8] [--processes 2]
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from utils.answer_matcher import AnswerMatcher
+from utils.passwords import PASSWORD_HASH_METHOD, PasswordHasher, normalize_method
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run(hasher, stored, logins, threads):
+    matcher = AnswerMatcher(["Moon Landing", "Apollo 11", "First Moon Landing"])
+    guess_latencies = []
+    done = threading.Event()
+
+    def guesses():
+        while not done.is_set():
+            start = time.perf_counter()
+            matcher.matches("apolo eleven")
+            guess_latencies.append(time.perf_counter() - start)
+            time.sleep(0.001)
+
+    guesser = threading.Thread(target=guesses)
+    guesser.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda _: hasher.verify(stored, "correct horse"), range(logins)))
+    wall = time.perf_counter() - start
+    done.set()
+    guesser.join()
+    assert all(results)
+    guess_latencies.sort()
+    return logins / wall, percentile(guess_latencies, 95) * 1000, percentile(guess_latencies, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent login requests")
+    parser.add_argument("--processes", type=int, default=min(2, os.cpu_count() or 1))
+    parser.add_argument("--method", default=PASSWORD_HASH_METHOD)
+    args = parser.parse_args()
+
+    stored = generate_password_hash("correct horse", normalize_method(args.method))
+    cores = os.cpu_count() or 1
+    print(f"{normalize_method(args.method)}, {args.logins} logins from {args.threads} threads, {cores} cores")
+    print(f"{'mode':<22} {'logins/s':>9} {'per core':>9} {'guess p95 ms':>13} {'guess p99 ms':>13}")
+    modes = [
+        ("inline (before)", PasswordHasher(args.method, processes=0), 1),
+        (f"pool x{args.processes} (after)", PasswordHasher(args.method, processes=args.processes),
+         min(args.processes, cores)),
+    ]
+    for name, hasher, used_cores in modes:
+        if hasher.processes:
+            hasher.verify(stored, "correct horse")  # start the pool outside the timing
+        rate, p95, p99 = run(hasher, stored, args.logins, args.threads)
+        print(f"{name:<22} {rate:>9.1f} {rate / used_cores:>9.1f} {p95:>13.2f} {p99:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
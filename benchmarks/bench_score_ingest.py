@@ -0,0 +1,114 @@
+"""
+Benchmark: request latency and backend calls per 1,000 score submissions
+in the "sync" and "queue" ingestion modes.
+
+The backend is simulated: every call sleeps for the configured latency and
+is counted. The queue mode uses the real ScoreQueue on a temporary file.
+
+    python -m benchmarks.bench_score_ingest [--submissions 1000] [--latency-ms 40]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.score_queue import ScoreQueue
+from utils.streaks import apply_result
+
+
+class SimulatedBackend:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.users = {}
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def submit_score_rpc(self, username, win, game_date):
+        self.call()
+        with self._lock:
+            stats = apply_result(self.users.get(username, {}), win, game_date)
+            self.users[username] = stats
+        return stats
+
+    def read_user(self, username):
+        self.call()
+        return dict(self.users.get(username, {}))
+
+    def flush(self, entries, stats):
+        self.call()  # bulk leaderboard upsert
+        self.call()  # apply_user_stats RPC
+        with self._lock:
+            self.users.update(stats)
+
+
+def run_sync(backend, submissions, game_date):
+    def submit(item):
+        username, win = item
+        start = time.perf_counter()
+        backend.submit_score_rpc(username, win, game_date)
+        return time.perf_counter() - start
+    return submit
+
+
+def run_queue(backend, queue, game_date):
+    def submit(item):
+        username, win = item
+        start = time.perf_counter()
+        # As app.py's queue_score(): read_user() is the profile cache miss.
+        queue.enqueue_result({"name": username, "solve_time": "01:00", "clues_used": 2, "date": game_date},
+                             lambda: backend.read_user(username),
+                             lambda current: apply_result(current, win, game_date))
+        return time.perf_counter() - start
+    return submit
+
+
+def report(mode, latencies, backend, elapsed, count):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{mode:>6}: p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+          f"p95 {p95 * 1000:7.2f} ms  "
+          f"backend calls/1000 {backend.calls * 1000 / count:7.1f}  "
+          f"wall {elapsed:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=600)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    game_date = "2026-01-01"
+    items = [(f"user{rng.randrange(args.users)}", rng.random() < 0.7) for _ in range(args.submissions)]
+    latency = args.latency_ms / 1000
+
+    backend = SimulatedBackend(latency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        latencies = list(pool.map(run_sync(backend, items, game_date), items))
+    report("sync", latencies, backend, time.perf_counter() - start, args.submissions)
+
+    backend = SimulatedBackend(latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = ScoreQueue(backend.flush, path=os.path.join(tmp, "scores.db"), interval=0.2)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            latencies = list(pool.map(run_queue(backend, queue, game_date), items))
+        while queue.depth():
+            time.sleep(0.05)
+        report("queue", latencies, backend, time.perf_counter() - start, args.submissions)
+
+
+if __name__ == "__main__":
+    main()
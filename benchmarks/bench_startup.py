@@ -0,0 +1,142 @@
+"""
+Benchmark: cold-start phases and gunicorn worker boot time, with a budget.
+
+First imports app.py in fresh interpreters and reports the median of
+each startup phase (imports, module setup, create_app warm-up), and
+checks that importing starts no background threads. Then starts gunicorn
+with several workers, once as `app:app` (each worker imports the app)
+and once as the Procfile does (`--preload "app:create_app()"`, workers
+fork from a warmed master), and times each worker from fork to ready
+via gunicorn's pre_fork/post_worker_init hooks.
+
+Exits 1 if a preloaded worker takes longer than --budget-ms to boot or
+if importing the app starts a thread, so it can gate a deploy:
+
+    python -m benchmarks.bench_startup [--runs 5] [--workers 3] [--budget-ms 500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load_test import ROOT, free_port
+
+PROBE = """
+import json, threading
+import app
+threads = sorted(t.name for t in threading.enumerate() if t is not threading.main_thread())
+app.create_app()
+from utils import startup
+print("PHASES " + json.dumps({"phases": startup.phases, "threads": threads}))
+"""
+
+# Worker boot = fork (pre_fork runs in the master just before it) until
+# the worker has loaded the app and is about to accept connections.
+GUNICORN_HOOKS = """
+import time
+
+def pre_fork(server, worker):
+    worker.fork_started = time.time()
+
+def post_worker_init(worker):
+    print("WORKER_BOOT %.6f" % (time.time() - worker.fork_started), flush=True)
+"""
+
+
+def env_for(workdir):
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "startup-bench-secret")
+    env["HISTORLE_BACKEND"] = "sqlite"
+    env["HISTORLE_SQLITE_PATH"] = os.path.join(workdir, "historle.db")
+    env["HISTORLE_CACHE_DIR"] = os.path.join(workdir, "cache")
+    env["PYTHONPATH"] = ROOT
+    return env
+
+
+def import_phases(env, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True,
+                             text=True, check=True).stdout
+        line = next(line for line in out.splitlines() if line.startswith("PHASES "))
+        samples.append(json.loads(line[len("PHASES "):]))
+    names = list(samples[0]["phases"])
+    medians = {name: statistics.median(s["phases"][name] for s in samples) for name in names}
+    threads = sorted({name for s in samples for name in s["threads"]})
+    return medians, threads
+
+
+def worker_boot_times(env, target, preload, workers, hooks_path):
+    port = free_port()
+    command = [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+               "--config", hooks_path, "--log-level", "warning"]
+    if preload:
+        command.append("--preload")
+    started = time.perf_counter()
+    server = subprocess.Popen(command + [target], cwd=ROOT, env=env, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True)
+    try:
+        boots = []
+        while len(boots) < workers:
+            line = server.stdout.readline()
+            if not line:
+                raise RuntimeError(f"gunicorn exited before {workers} workers booted")
+            if line.startswith("WORKER_BOOT "):
+                boots.append(float(line.split()[1]))
+        all_ready = time.perf_counter() - started
+        httpx.get(f"http://127.0.0.1:{port}/api/me", timeout=5)
+        return boots, all_ready
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters for the phase timings")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=500, help="max boot time of a preloaded worker")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        env = env_for(workdir)
+        hooks_path = os.path.join(workdir, "hooks.py")
+        with open(hooks_path, "w") as f:
+            f.write(GUNICORN_HOOKS)
+
+        phases, threads = import_phases(env, args.runs)
+        print(f"startup phases (median of {args.runs} fresh interpreters)")
+        for name, seconds in phases.items():
+            print(f"  {name:<10} {seconds * 1000:>8.1f} ms")
+        print(f"  {'total':<10} {sum(phases.values()) * 1000:>8.1f} ms")
+        # flask_limiter's in-memory storage starts a one-shot expiry timer.
+        unexpected = [name for name in threads if not name.startswith("Thread-")]
+        print(f"threads started by import: {', '.join(threads) or 'none'}")
+        if unexpected:
+            failures.append(f"importing app started background threads: {', '.join(unexpected)}")
+
+        print(f"\n{'gunicorn mode':<36} {'worker boot ms (max)':>21} {'all ready ms':>13}")
+        for label, target, preload in [("app:app (import per worker)", "app:app", False),
+                                       ('--preload "app:create_app()"', "app:create_app()", True)]:
+            boots, all_ready = worker_boot_times(env, target, preload, args.workers, hooks_path)
+            print(f"{label:<36} {max(boots) * 1000:>21.1f} {all_ready * 1000:>13.1f}")
+            if preload and max(boots) * 1000 > args.budget_ms:
+                failures.append(f"preloaded worker booted in {max(boots) * 1000:.0f}ms "
+                                f"(budget {args.budget_ms:.0f}ms)")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    if failures:
+        sys.exit(1)
+    print(f"\nOK: preloaded workers boot within {args.budget_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
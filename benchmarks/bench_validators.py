@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: names validated per second by the compiled
+ProfanityFilter against better_profanity.contains_profanity, plus a
+parity check that both give the same verdict on every generated name.
+
+Names are a mix of random handles, censor words with leetspeak
+substitutions, mixed case and separators, words split across
+separators, and censor words embedded in longer words.
+
+    python -m benchmarks.bench_validators [--names 5000] [--seed 1]
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+from better_profanity import Profanity
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+from utils.validators import CHARS_MAPPING, ProfanityFilter
+
+SEPARATORS = " _.-"
+
+
+def leet(rng, word):
+    return "".join(rng.choice(CHARS_MAPPING[c]) if c in CHARS_MAPPING and rng.random() < 0.4 else c
+                   for c in word)
+
+
+def random_case(rng, word):
+    return "".join(c.upper() if rng.random() < 0.3 else c for c in word)
+
+
+def make_names(rng, words, count):
+    single = [w for w in words if " " not in w]
+    names = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            name = "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(3, 14)))
+        elif kind < 0.6:
+            name = leet(rng, rng.choice(words))
+        elif kind < 0.75:
+            word = rng.choice(single)
+            cut = rng.randint(1, max(1, len(word) - 1))
+            name = word[:cut] + rng.choice(SEPARATORS) + word[cut:]
+        elif kind < 0.9:
+            name = (rng.choice(["the", "x", "mr", "big", ""]) + rng.choice(single)
+                    + rng.choice(["", "99", "er", "_fan", " 2"]))
+        else:
+            parts = [rng.choice(single + ["cool", "player", "history"]) for _ in range(rng.randint(2, 3))]
+            name = rng.choice(SEPARATORS).join(parts)
+        names.append(random_case(rng, name)[:20])
+    return names
+
+
+def rate(check, names):
+    start = time.perf_counter()
+    for name in names:
+        check(name)
+    return len(names) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    words = list(read_wordlist(get_complete_path_of_file("profanity_wordlist.txt")))
+    names = make_names(random.Random(args.seed), words, args.names)
+
+    start = time.perf_counter()
+    legacy = Profanity()
+    legacy_load = time.perf_counter() - start
+    start = time.perf_counter()
+    compiled = ProfanityFilter().compile()
+    compiled_load = time.perf_counter() - start
+
+    mismatches = [name for name in names
+                  if legacy.contains_profanity(name) != compiled.contains_profanity(name)]
+    flagged = sum(compiled.contains_profanity(name) for name in names)
+    print(f"{len(names)} names, {flagged} flagged, {len(mismatches)} verdict mismatches")
+    for name in mismatches[:10]:
+        print(f"  mismatch: {name!r}")
+
+    print(f"{'validator':<22} {'load ms':>9} {'names/s':>11}")
+    print(f"{'better_profanity':<22} {legacy_load * 1000:>9.1f} {rate(legacy.contains_profanity, names):>11,.0f}")
+    print(f"{'compiled (ours)':<22} {compiled_load * 1000:>9.1f} {rate(compiled.contains_profanity, names):>11,.0f}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Load test: scripted player sessions against the real Flask app.
+
+Each session walks the full game flow - /api/bootstrap, a few
+/api/guess calls, /api/submit_score and /api/leaderboard - as a logged-in
+player. The app runs on the local SQLite backend with simulated per-call
+latency (HISTORLE_BACKEND_LATENCY_MS), either in-process through Flask's
+test client or behind gunicorn with N workers.
+
+Reports p50/p95/p99 per endpoint, requests/sec and backend calls per
+request (from the Server-Timing header when running under gunicorn),
+and writes the results as JSON under benchmarks/results/ so runs
+on different commits can be compared:
+
+    python -m benchmarks.load_test --sessions 500 --concurrency 16
+    python -m benchmarks.load_test --mode gunicorn --workers 4
+    python -m benchmarks.load_test --compare benchmarks/results/<old>.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+ANSWER = "Moon Landing"
+SERVER_TIMING_CALLS = re.compile(r'db;[^,]*desc="(\d+) calls"')
+WRONG_GUESSES = ["waterloo", "hastings", "magna carta", "rosetta stone", "apollo 13", "sputnik"]
+
+
+def configure_env(args, workdir):
+    """Point the app at a private SQLite database before it is imported."""
+    os.environ.setdefault("SECRET_KEY", "load-test-secret")
+    os.environ["HISTORLE_BACKEND"] = "sqlite"
+    os.environ["HISTORLE_SQLITE_PATH"] = os.path.join(workdir, "historle.db")
+    os.environ["HISTORLE_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ["HISTORLE_BACKEND_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["EVENT_REFRESH_STAMP"] = os.path.join(workdir, "event-refresh")
+    os.environ["SCORE_QUEUE_PATH"] = os.path.join(workdir, "scores.db")
+    if args.ingest_mode:
+        os.environ["SCORE_INGEST_MODE"] = args.ingest_mode
+
+
+def seed(game_date, users):
+    """Create today's event and the players used by the sessions."""
+    from utils.db import SQLiteBackend
+
+    backend = SQLiteBackend(os.environ["HISTORLE_SQLITE_PATH"])
+    backend.get_event(game_date) or backend._insert("daily_events", {
+        "date": game_date,
+        "answer": ANSWER,
+        "alt_answers": "Apollo 11;First Moon Landing",
+        "clues": "1969;A giant leap;Eagle;Tranquility;Armstrong;Aldrin",
+        "summary": "Apollo 11 landed on the Moon.",
+        "year": 1969,
+        "difficulty": "Easy",
+        "category": "Space",
+    })
+    for i in range(users):
+        if not backend.get_user(f"player{i}", "username"):
+            backend.create_user({
+                "username": f"player{i}",
+                "password": "unused",
+                "streak": 0,
+                "days_played": 0,
+                "total_wins": 0,
+                "total_losses": 0,
+                "longest_win_streak": 0,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            })
+
+
+def session_cookies(app, users):
+    serializer = app.session_interface.get_signing_serializer(app)
+    return [serializer.dumps({"username": f"player{i}", "_permanent": True}) for i in range(users)]
+
+
+def script(rng, username, game_date):
+    """The requests one player makes, as (method, path, json) tuples."""
+    steps = [("GET", "/api/bootstrap", None)]
+    wrong = rng.randint(0, 5)
+    for _ in range(min(wrong, 5)):
+        steps.append(("POST", "/api/guess", {"guess": rng.choice(WRONG_GUESSES), "event_date": game_date}))
+    win = wrong < 5
+    if win:
+        steps.append(("POST", "/api/guess", {"guess": ANSWER.lower(), "event_date": game_date}))
+    elapsed = rng.randint(20, 400)
+    steps.append(("POST", "/api/submit_score", {
+        "username": username,
+        "solve_time": f"{elapsed // 60:02d}:{elapsed % 60:02d}",
+        "clues_used": wrong + 1,
+        "event_date": game_date,
+        "win": win,
+    }))
+    steps.append(("GET", "/api/leaderboard", None))
+    return steps
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds, backend_calls, status):
+        with self._lock:
+            entry = self.samples.setdefault(endpoint, {"latencies": [], "calls": [], "errors": 0})
+            entry["latencies"].append(seconds)
+            if backend_calls is not None:
+                entry["calls"].append(backend_calls)
+            if status >= 400:
+                entry["errors"] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarise(recorder, wall):
+    endpoints = {}
+    total = 0
+    for endpoint, entry in sorted(recorder.samples.items()):
+        latencies = sorted(entry["latencies"])
+        total += len(latencies)
+        endpoints[endpoint] = {
+            "count": len(latencies),
+            "errors": entry["errors"],
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "backend_calls_per_request": (sum(entry["calls"]) / len(entry["calls"])) if entry["calls"] else None,
+        }
+    return {"requests": total, "wall_seconds": wall, "requests_per_sec": total / wall, "endpoints": endpoints}
+
+
+def run_in_process(args, game_date, recorder):
+    import app as app_module
+    from utils.db import get_backend
+
+    backend = get_backend()
+    cookies = session_cookies(app_module.app, args.users)
+
+    def play(index):
+        rng = random.Random(index)
+        user = index % args.users
+        client = app_module.app.test_client()
+        client.set_cookie("session", cookies[user])
+        for method, path, body in script(rng, f"player{user}", game_date):
+            before = backend.thread_calls()
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - start
+            # Server-Timing also counts calls the request fanned out to other threads.
+            match = SERVER_TIMING_CALLS.search(response.headers.get("Server-Timing", ""))
+            calls = int(match.group(1)) if match else backend.thread_calls() - before
+            recorder.add(f"{method} {path}", elapsed, calls, response.status_code)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(play, range(args.sessions)))
+    return time.perf_counter() - start
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_gunicorn(args, game_date, recorder):
+    import app as app_module
+
+    cookies = session_cookies(app_module.app, args.users)
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(args.workers),
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=ROOT, env=dict(os.environ)
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                urllib.request.urlopen(base + "/api/me", timeout=1)
+            except urllib.error.HTTPError:
+                break  # 401 means the server is up
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.2)
+
+        def play(index):
+            rng = random.Random(index)
+            user = index % args.users
+            for method, path, body in script(rng, f"player{user}", game_date):
+                data = json.dumps(body).encode() if body is not None else None
+                request = urllib.request.Request(base + path, data=data, method=method, headers={
+                    "Cookie": f"session={cookies[user]}",
+                    "Content-Type": "application/json",
+                })
+                start = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                        status, headers = response.status, response.headers
+                except urllib.error.HTTPError as e:
+                    status, headers = e.code, e.headers
+                # Backend calls happen in the workers; they report them in Server-Timing.
+                match = SERVER_TIMING_CALLS.search(headers.get("Server-Timing", ""))
+                recorder.add(f"{method} {path}", time.perf_counter() - start,
+                             int(match.group(1)) if match else None, status)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(play, range(args.sessions)))
+        return time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(result, baseline=None):
+    print(f"mode={result['config']['mode']} commit={result['commit']} "
+          f"{result['requests']} requests in {result['wall_seconds']:.2f}s "
+          f"= {result['requests_per_sec']:.1f} req/s")
+    print(f"{'endpoint':<24} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'calls/req':>9}")
+    for endpoint, stats in result["endpoints"].items():
+        calls = stats["backend_calls_per_request"]
+        line = (f"{endpoint:<24} {stats['count']:>6} {stats['p50_ms']:>8.2f} "
+                f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                f"{'-' if calls is None else f'{calls:.2f}':>9}")
+        old = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if old:
+            line += f"   p95 {stats['p95_ms'] - old['p95_ms']:+.2f} ms vs {baseline['commit']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["in-process", "gunicorn"], default="in-process")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--latency-ms", type=float, default=20, help="simulated latency per backend call")
+    parser.add_argument("--ingest-mode", choices=["sync", "queue"], help="SCORE_INGEST_MODE for the run")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<time>-<commit>-<mode>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="historle-load-")
+    configure_env(args, workdir)
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    game_date = app_module.get_current_game_date()
+    seed(game_date, args.users)
+
+    recorder = Recorder()
+    runner = run_gunicorn if args.mode == "gunicorn" else run_in_process
+    wall = runner(args, game_date, recorder)
+
+    result = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        **summarise(recorder, wall),
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{result['commit']}-{args.mode}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+-- Native arrays for daily_events, written by `flask import-events` (see
+-- utils/event_import.py). Rows that have clue_list and normalized_answers
+-- are loaded without any string parsing; the others fall back to the
+-- semicolon-joined clues/alt_answers columns, which the importer still fills.
+alter table public.daily_events add column if not exists clue_list text[];
+alter table public.daily_events add column if not exists alt_answer_list text[];
+alter table public.daily_events add column if not exists normalized_answers text[];
+
+-- Imports upsert on the date.
+create unique index if not exists daily_events_date_key on public.daily_events (date);
+
+-- Backfill the lists from the strings. normalized_answers needs the app's
+-- normalisation (accents, articles, punctuation), so existing rows keep it
+-- NULL until they are re-imported.
+update public.daily_events
+set clue_list = array(
+        select btrim(c) from unnest(string_to_array(clues, ';')) as c where btrim(c) <> ''
+    ),
+    alt_answer_list = array(
+        select btrim(a) from unnest(string_to_array(coalesce(alt_answers, ''), ';')) as a where btrim(a) <> ''
+    )
+where clue_list is null and clues is not null;
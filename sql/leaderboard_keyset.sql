@@ -0,0 +1,54 @@
+-- Keyset-paginated leaderboard (/api/leaderboard/page, /api/leaderboard/me).
+
+-- Solve time in whole seconds. Mirrors utils/leaderboard.py:solve_seconds(),
+-- keep the two in step: 'MM:SS' / 'H:MM:SS' or a plain number of seconds;
+-- anything else is 2^31 and sorts last. solve_time is text holding both
+-- formats, so it can't be sorted on directly ('9:59' > '10:00').
+create or replace function public.solve_seconds(p_solve_time text)
+returns bigint
+language sql
+immutable
+parallel safe
+as $$
+    select case
+        when btrim(p_solve_time) ~ '^\d+(\.\d*)?$' then floor(btrim(p_solve_time)::numeric)::bigint
+        when btrim(p_solve_time) ~ '^\d+(:\d+)+$' then (
+            select sum(part::bigint * (60::bigint ^ (n - ord))::bigint)::bigint
+            from unnest(string_to_array(btrim(p_solve_time), ':')) with ordinality as t(part, ord),
+                 (select cardinality(string_to_array(btrim(p_solve_time), ':')) as n) as parts
+        )
+        else 2147483648
+    end
+$$;
+
+alter table public.leaderboard
+    add column if not exists solve_seconds bigint
+    generated always as (public.solve_seconds(solve_time)) stored;
+
+-- Every page, however deep, is one range scan on this.
+drop index if exists public.leaderboard_keyset_idx;
+create index leaderboard_keyset_idx
+    on public.leaderboard (date, solve_seconds, clues_used, id);
+
+-- When each row was inserted (not the app-supplied timestamp, which a
+-- queued score sets long before its flush).
+alter table public.leaderboard
+    add column if not exists created_at timestamptz not null default clock_timestamp();
+
+-- The paging snapshot: the largest id among rows inserted more than a few
+-- seconds ago. Ids are handed out at insert, not at commit, so a plain
+-- max(id) can pass over a lower id whose transaction hasn't committed
+-- yet; that row would then turn up inside pages already served. Score
+-- writes are one short statement or function call, so anything inserted
+-- before the margin has committed (or rolled back). Rows newer than that
+-- show up in the next snapshot.
+create or replace function public.leaderboard_snapshot_id(p_date date)
+returns bigint
+language sql
+stable
+as $$
+    select coalesce(max(id), 0)
+    from public.leaderboard
+    where date = p_date
+      and created_at < clock_timestamp() - interval '5 seconds'
+$$;
@@ -0,0 +1,38 @@
+-- Support for SCORE_INGEST_MODE=queue (see utils/score_queue.py).
+
+-- Idempotency key for queued submissions. Rows written by the synchronous
+-- path leave it NULL, which the unique index allows any number of times.
+alter table public.leaderboard add column if not exists submission_id text;
+create unique index if not exists leaderboard_submission_id_key
+    on public.leaderboard (submission_id);
+
+-- Applies already computed stats for many users in one call. Values are
+-- absolute, so re-applying a batch after a crash is harmless.
+create or replace function public.apply_user_stats(p_stats json)
+returns integer
+language sql
+as $$
+    with updated as (
+        update public.users u set
+            streak = s.streak,
+            days_played = s.days_played,
+            total_wins = s.total_wins,
+            total_losses = s.total_losses,
+            longest_win_streak = s.longest_win_streak,
+            last_win_date = s.last_win_date,
+            last_played_date = s.last_played_date
+        from json_to_recordset(p_stats) as s(
+            username text,
+            streak integer,
+            days_played integer,
+            total_wins integer,
+            total_losses integer,
+            longest_win_streak integer,
+            last_win_date date,
+            last_played_date date
+        )
+        where u.username = s.username
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
@@ -0,0 +1,91 @@
+-- Records a finished game and updates the player's stats in one transaction.
+-- Called from app.py as supabase.rpc("submit_score", {...}).
+--
+-- The users row is locked (FOR UPDATE) before anything is written, so two
+-- concurrent submissions for the same player are applied one after the
+-- other instead of overwriting each other's streak. If the player doesn't
+-- exist nothing is inserted.
+--
+-- The stats logic mirrors utils/streaks.py:apply_result(), which is the
+-- reference implementation; keep the two in step.
+
+create or replace function public.submit_score(
+    p_name text,
+    p_solve_time text,
+    p_clues_used integer,
+    p_date date,
+    p_win boolean,
+    p_game_date date
+)
+returns json
+language plpgsql
+as $$
+declare
+    u public.users%rowtype;
+    entry public.leaderboard%rowtype;
+    v_streak integer;
+    v_days_played integer;
+    v_total_wins integer;
+    v_total_losses integer;
+    v_longest integer;
+    v_last_win date;
+    v_day_difference integer;
+begin
+    select * into u from public.users where username = p_name for update;
+    if not found then
+        raise exception 'User not found' using errcode = 'P0002';
+    end if;
+
+    insert into public.leaderboard (name, solve_time, clues_used, date, timestamp)
+    values (p_name, p_solve_time, p_clues_used, p_date, now())
+    returning * into entry;
+
+    v_streak := coalesce(u.streak, 0);
+    v_days_played := coalesce(u.days_played, 0) + 1;
+    v_total_wins := coalesce(u.total_wins, 0);
+    v_total_losses := coalesce(u.total_losses, 0);
+    v_longest := coalesce(u.longest_win_streak, 0);
+    v_last_win := u.last_win_date::date;
+
+    if p_win then
+        v_total_wins := v_total_wins + 1;
+        if v_last_win is not null then
+            v_day_difference := p_game_date - v_last_win;
+            if v_day_difference = 1 then
+                v_streak := v_streak + 1;
+            elsif v_day_difference > 1 then
+                v_streak := 1;
+            end if;
+            -- v_day_difference = 0 means same day; no update.
+        else
+            v_streak := 1;
+        end if;
+        v_longest := greatest(v_longest, v_streak);
+        v_last_win := p_game_date;
+    else
+        v_total_losses := v_total_losses + 1;
+        v_streak := 0;
+    end if;
+
+    update public.users set
+        streak = v_streak,
+        days_played = v_days_played,
+        total_wins = v_total_wins,
+        total_losses = v_total_losses,
+        longest_win_streak = v_longest,
+        last_win_date = v_last_win,
+        last_played_date = p_game_date
+    where username = p_name;
+
+    return json_build_object(
+        'entry', row_to_json(entry),
+        'streak', v_streak,
+        'days_played', v_days_played,
+        'total_wins', v_total_wins,
+        'total_losses', v_total_losses,
+        'longest_win_streak', v_longest,
+        'last_win_date', v_last_win,
+        'last_played_date', p_game_date
+    );
+end;
+$$;
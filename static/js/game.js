@@ -9,6 +9,8 @@ document.addEventListener("DOMContentLoaded", () => {
     let altAnswers = [];
     let startTime = Date.now();
     let userXId = null;
+    // Next game-day cutoff (ms since epoch), as reported by the server.
+    let rolloverAt = null;
 
     // **DOM Elements**
     const currentClueEl = document.getElementById("current-clue");
@@ -142,110 +144,10 @@ document.addEventListener("DOMContentLoaded", () => {
             .then(response => response.json())
             .then(data => {
                 if (data.username) {
-                    localStorage.setItem("username", data.username);
-                    document.getElementById("user-greeting").textContent = `ello, ${formatUsername(data.username)}`;
-    
-                    // Clear existing navbar buttons
-                    const navbarLinks = document.querySelector(".navbar-links");
-                    navbarLinks.innerHTML = "";
-
-                    // === ARTICLES BUTTON ===
-                    const articlesBtn = document.createElement("a");
-                    articlesBtn.href = "/articles";
-                    articlesBtn.className = "navbar-link";
-                    articlesBtn.title = "Articles";
-                    const articlesImg = document.createElement("img");
-                    articlesImg.src = "/static/images/articles.png";
-                    articlesImg.alt = "Articles";
-                    articlesImg.className = "nav-icon";
-                    articlesBtn.appendChild(articlesImg);
-                    navbarLinks.appendChild(articlesBtn);
-    
-                    // === DONATE BUTTON ===
-                    // const donateBtn = document.createElement("a");
-                    // donateBtn.href = "#donation-section";
-                    // donateBtn.className = "navbar-link";
-                    // donateBtn.title = "Donate";
-                    // const donateImg = document.createElement("img");
-                    // donateImg.src = "/static/images/donate.png";
-                    // donateImg.alt = "donate";
-                    // donateImg.className = "nav-icon";
-                    // donateBtn.appendChild(donateImg);
-                    // navbarLinks.appendChild(donateBtn);
-    
-                    // === STATS BUTTON ===
-                    const statsBtn = document.createElement("a");
-                    statsBtn.href = "#";
-                    statsBtn.className = "navbar-link";
-                    statsBtn.id = "stats-btn";
-                    statsBtn.title = "View Stats";
-                    const statsImg = document.createElement("img");
-                    statsImg.src = "/static/images/stats.png";
-                    statsImg.alt = "stats";
-                    statsImg.className = "nav-icon";
-                    statsBtn.appendChild(statsImg);
-                    navbarLinks.appendChild(statsBtn);
-                    statsBtn.addEventListener("click", (e) => {
-                        e.preventDefault();
-                        openStatsModal();
-                    });
-    
-                    // === SETTINGS BUTTON ===
-                    const settingsBtn = document.createElement("a");
-                    settingsBtn.href = "#";
-                    settingsBtn.className = "navbar-link";
-                    settingsBtn.id = "settings-btn";
-                    settingsBtn.title = "Settings";
-                    const settingsImg = document.createElement("img");
-                    settingsImg.src = "/static/images/settings.png";
-                    settingsImg.alt = "settings";
-                    settingsImg.className = "nav-icon";
-                    settingsBtn.appendChild(settingsImg);
-                    navbarLinks.appendChild(settingsBtn);
-                    settingsBtn.addEventListener("click", () => {
-                        const settingsModal = document.getElementById("settings-modal");
-                        if (settingsModal) {
-                            settingsModal.classList.remove("hidden");
-                            const xIdInput = document.getElementById("x-id-input");
-                            if (xIdInput) {
-                                xIdInput.value = userXId || "";
-                            }
-                        }
-                    });
-    
-                    // === LOGOUT BUTTON ===
-                    const logoutBtn = document.createElement("a");
-                    logoutBtn.href = "/logout";
-                    logoutBtn.className = "navbar-link";
-                    logoutBtn.id = "logout-btn";
-                    logoutBtn.title = "Logout";
-                    const logoutImg = document.createElement("img");
-                    logoutImg.src = "/static/images/logout-icon.png";
-                    logoutImg.alt = "logout";
-                    logoutImg.className = "nav-icon logout-icon";
-                    logoutBtn.appendChild(logoutImg);
-                    navbarLinks.appendChild(logoutBtn);
-                    logoutBtn.addEventListener("click", (e) => {
-                        document.getElementById("user-greeting").textContent = "";
-                        const statsBtn = document.getElementById("stats-btn");
-                        if (statsBtn) {
-                            statsBtn.remove();
-                        }
-                    });
-    
-                    // === Update Streak Display ===
+                    renderSession(data.username);
                     fetch("/api/user_stats", { credentials: 'include' })
                         .then(response => response.json())
-                        .then(stats => {
-                            const streakContainer = document.getElementById("streak-container");
-                            if (streakContainer) {
-                                streakContainer.innerHTML = '<p class="streak-display">🔥 Streak:</p>';
-                                const streakCount = document.createElement("span");
-                                streakCount.id = "streak-count-main";
-                                streakCount.textContent = stats.streak !== undefined ? stats.streak : "0";
-                                streakContainer.appendChild(streakCount);
-                            }
-                        })
+                        .then(stats => renderStreak(stats.streak))
                         .catch(err => console.error("Error fetching user stats:", err));
                 } else {
                     // No logged-in user found: show the authentication modal.
@@ -254,57 +156,165 @@ document.addEventListener("DOMContentLoaded", () => {
             })
             .catch(err => console.error("Error checking session:", err));
     }
+
+    // Greeting and navbar buttons for a logged-in user.
+    function renderSession(username) {
+        localStorage.setItem("username", username);
+        document.getElementById("user-greeting").textContent = `ello, ${formatUsername(username)}`;
+    
+        // Clear existing navbar buttons
+        const navbarLinks = document.querySelector(".navbar-links");
+        navbarLinks.innerHTML = "";
+
+        // === ARTICLES BUTTON ===
+        const articlesBtn = document.createElement("a");
+        articlesBtn.href = "/articles";
+        articlesBtn.className = "navbar-link";
+        articlesBtn.title = "Articles";
+        const articlesImg = document.createElement("img");
+        articlesImg.src = "/static/images/articles.png";
+        articlesImg.alt = "Articles";
+        articlesImg.className = "nav-icon";
+        articlesBtn.appendChild(articlesImg);
+        navbarLinks.appendChild(articlesBtn);
+    
+        // === DONATE BUTTON ===
+        // const donateBtn = document.createElement("a");
+        // donateBtn.href = "#donation-section";
+        // donateBtn.className = "navbar-link";
+        // donateBtn.title = "Donate";
+        // const donateImg = document.createElement("img");
+        // donateImg.src = "/static/images/donate.png";
+        // donateImg.alt = "donate";
+        // donateImg.className = "nav-icon";
+        // donateBtn.appendChild(donateImg);
+        // navbarLinks.appendChild(donateBtn);
+    
+        // === STATS BUTTON ===
+        const statsBtn = document.createElement("a");
+        statsBtn.href = "#";
+        statsBtn.className = "navbar-link";
+        statsBtn.id = "stats-btn";
+        statsBtn.title = "View Stats";
+        const statsImg = document.createElement("img");
+        statsImg.src = "/static/images/stats.png";
+        statsImg.alt = "stats";
+        statsImg.className = "nav-icon";
+        statsBtn.appendChild(statsImg);
+        navbarLinks.appendChild(statsBtn);
+        statsBtn.addEventListener("click", (e) => {
+            e.preventDefault();
+            openStatsModal();
+        });
+    
+        // === SETTINGS BUTTON ===
+        const settingsBtn = document.createElement("a");
+        settingsBtn.href = "#";
+        settingsBtn.className = "navbar-link";
+        settingsBtn.id = "settings-btn";
+        settingsBtn.title = "Settings";
+        const settingsImg = document.createElement("img");
+        settingsImg.src = "/static/images/settings.png";
+        settingsImg.alt = "settings";
+        settingsImg.className = "nav-icon";
+        settingsBtn.appendChild(settingsImg);
+        navbarLinks.appendChild(settingsBtn);
+        settingsBtn.addEventListener("click", () => {
+            const settingsModal = document.getElementById("settings-modal");
+            if (settingsModal) {
+                settingsModal.classList.remove("hidden");
+                const xIdInput = document.getElementById("x-id-input");
+                if (xIdInput) {
+                    xIdInput.value = userXId || "";
+                }
+            }
+        });
+    
+        // === LOGOUT BUTTON ===
+        const logoutBtn = document.createElement("a");
+        logoutBtn.href = "/logout";
+        logoutBtn.className = "navbar-link";
+        logoutBtn.id = "logout-btn";
+        logoutBtn.title = "Logout";
+        const logoutImg = document.createElement("img");
+        logoutImg.src = "/static/images/logout-icon.png";
+        logoutImg.alt = "logout";
+        logoutImg.className = "nav-icon logout-icon";
+        logoutBtn.appendChild(logoutImg);
+        navbarLinks.appendChild(logoutBtn);
+        logoutBtn.addEventListener("click", (e) => {
+            document.getElementById("user-greeting").textContent = "";
+            const statsBtn = document.getElementById("stats-btn");
+            if (statsBtn) {
+                statsBtn.remove();
+            }
+        });
+    }
+
+    // === Update Streak Display ===
+    function renderStreak(streak) {
+        const streakContainer = document.getElementById("streak-container");
+        if (streakContainer) {
+            streakContainer.innerHTML = '<p class="streak-display">🔥 Streak:</p>';
+            const streakCount = document.createElement("span");
+            streakCount.id = "streak-count-main";
+            streakCount.textContent = streak !== undefined ? streak : "0";
+            streakContainer.appendChild(streakCount);
+        }
+    }
         
     // Function to update the streak leaderboard display.
     function updateStreakLeaderboard() {
         fetch('/api/streak_leaderboard', { credentials: 'include' })
             .then(response => response.json())
-            .then(data => {
-                const streakLeaderboardEl = document.getElementById("streak-leaderboard-entries");
-                if (!streakLeaderboardEl) {
-                    console.error("Element #streak-leaderboard-entries not found.");
-                    return;
-                }
-                streakLeaderboardEl.innerHTML = ""; // Clear any existing data.
+            .then(renderStreakLeaderboard)
+            .catch(err => console.error("Error updating streak leaderboard:", err));
+    }
 
-                data.forEach((entry, index) => {
-                    const entryDiv = document.createElement("div");
-                    entryDiv.className = "leaderboard-entry"; // Reuse existing leaderboard styling.
+    function renderStreakLeaderboard(data) {
+        const streakLeaderboardEl = document.getElementById("streak-leaderboard-entries");
+        if (!streakLeaderboardEl) {
+            console.error("Element #streak-leaderboard-entries not found.");
+            return;
+        }
+        streakLeaderboardEl.innerHTML = ""; // Clear any existing data.
 
-                    // Rank
-                    const rankSpan = document.createElement("span");
-                    rankSpan.className = "rank";
-                    rankSpan.textContent = index + 1;
-                    entryDiv.appendChild(rankSpan);
+        data.forEach((entry, index) => {
+            const entryDiv = document.createElement("div");
+            entryDiv.className = "leaderboard-entry"; // Reuse existing leaderboard styling.
 
-                    // Username with optional X profile link.
-                    const nameSpan = document.createElement("span");
-                    nameSpan.className = "name";
-                    if (entry.x_id) {
-                        const anchor = document.createElement("a");
-                        anchor.href = `https://x.com/${entry.x_id}`;
-                        anchor.innerHTML = escapeHTML(formatUsername(entry.username));
-                        const xLogoImg = document.createElement("img");
-                        xLogoImg.src = "/static/images/x-logo.png";
-                        xLogoImg.alt = "X Logo";
-                        xLogoImg.className = "x-logo";
-                        anchor.appendChild(xLogoImg);
-                        nameSpan.appendChild(anchor);
-                    } else {
-                        nameSpan.textContent = escapeHTML(formatUsername(entry.username));
-                    }
-                    entryDiv.appendChild(nameSpan);
+            // Rank
+            const rankSpan = document.createElement("span");
+            rankSpan.className = "rank";
+            rankSpan.textContent = index + 1;
+            entryDiv.appendChild(rankSpan);
+
+            // Username with optional X profile link.
+            const nameSpan = document.createElement("span");
+            nameSpan.className = "name";
+            if (entry.x_id) {
+                const anchor = document.createElement("a");
+                anchor.href = `https://x.com/${entry.x_id}`;
+                anchor.innerHTML = escapeHTML(formatUsername(entry.username));
+                const xLogoImg = document.createElement("img");
+                xLogoImg.src = "/static/images/x-logo.png";
+                xLogoImg.alt = "X Logo";
+                xLogoImg.className = "x-logo";
+                anchor.appendChild(xLogoImg);
+                nameSpan.appendChild(anchor);
+            } else {
+                nameSpan.textContent = escapeHTML(formatUsername(entry.username));
+            }
+            entryDiv.appendChild(nameSpan);
 
-                    // Display the streak value.
-                    const streakSpan = document.createElement("span");
-                    streakSpan.className = "streak";
-                    streakSpan.textContent = "🔥 " + entry.streak;
-                    entryDiv.appendChild(streakSpan);
+            // Display the streak value.
+            const streakSpan = document.createElement("span");
+            streakSpan.className = "streak";
+            streakSpan.textContent = "🔥 " + entry.streak;
+            entryDiv.appendChild(streakSpan);
 
-                    streakLeaderboardEl.appendChild(entryDiv);
-                });
-            })
-            .catch(err => console.error("Error updating streak leaderboard:", err));
+            streakLeaderboardEl.appendChild(entryDiv);
+        });
     }
 
 
@@ -429,56 +439,13 @@ document.addEventListener("DOMContentLoaded", () => {
                         body: JSON.stringify({ username: storedUsername })
                     })
                     .then(res => res.json())
-                    .then(result => {
-                        if (result.already_played) {
-                            revealAnswerAndSummary();
-                            currentClueEl.innerHTML = `<span class='clue-text'>You've already played today's event. Come back tomorrow!</span>`;
-                            guessForm.style.display = "none";
-                        } else {
-                            // Reset local game state for a new game.
-                            currentClueIndex = 0;
-                            remainingGuesses = 5;
-                            startTime = Date.now();
-                            updateClueDisplay();
-                            updateProgressBar();
-                            document.getElementById("event-year").textContent = currentEvent.category || "History";
-                            document.getElementById("event-difficulty").textContent = currentEvent.difficulty || "Unknown";
-                        }
-                    })
+                    .then(result => startEvent(result.already_played))
                     .catch(err => {
                         console.error("Error checking play status:", err);
-                        // Fallback: check localStorage
-                        const alreadyPlayed = localStorage.getItem("played_" + currentEvent.date);
-                        if (alreadyPlayed) {
-                            revealAnswerAndSummary();
-                            currentClueEl.innerHTML = `<span class='clue-text'>You've already played today's event. Come back tomorrow!</span>`;
-                            guessForm.style.display = "none";
-                        } else {
-                            currentClueIndex = 0;
-                            remainingGuesses = 5;
-                            startTime = Date.now();
-                            updateClueDisplay();
-                            updateProgressBar();
-                            document.getElementById("event-year").textContent = currentEvent.category || "History";
-                            document.getElementById("event-difficulty").textContent = currentEvent.difficulty || "Unknown";
-                        }
+                        startEvent(null);  // Fallback: check localStorage
                     });
                 } else {
-                    // Non-logged-in users: fallback to localStorage.
-                    const alreadyPlayed = localStorage.getItem("played_" + currentEvent.date);
-                    if (alreadyPlayed) {
-                        revealAnswerAndSummary();
-                        currentClueEl.innerHTML = `<span class='clue-text'>You've already played today's event. Come back tomorrow!</span>`;
-                        guessForm.style.display = "none";
-                        return;
-                    }
-                    currentClueIndex = 0;
-                    remainingGuesses = 5;
-                    startTime = Date.now();
-                    updateClueDisplay();
-                    updateProgressBar();
-                    document.getElementById("event-year").textContent = currentEvent.category || "History";
-                    document.getElementById("event-difficulty").textContent = currentEvent.difficulty || "Unknown";
+                    startEvent(null);
                 }
             })
             .catch(error => {
@@ -487,6 +454,62 @@ document.addEventListener("DOMContentLoaded", () => {
             });
     }
 
+    // Show currentEvent, or the "already played" state. alreadyPlayed is the
+    // server's answer; null means unknown, so fall back to localStorage.
+    function startEvent(alreadyPlayed) {
+        if (alreadyPlayed === null || alreadyPlayed === undefined) {
+            alreadyPlayed = !!localStorage.getItem("played_" + currentEvent.date);
+        }
+        if (alreadyPlayed) {
+            revealAnswerAndSummary();
+            currentClueEl.innerHTML = `<span class='clue-text'>You've already played today's event. Come back tomorrow!</span>`;
+            guessForm.style.display = "none";
+            return;
+        }
+        // Reset local game state for a new game.
+        currentClueIndex = 0;
+        remainingGuesses = 5;
+        startTime = Date.now();
+        updateClueDisplay();
+        updateProgressBar();
+        document.getElementById("event-year").textContent = currentEvent.category || "History";
+        document.getElementById("event-difficulty").textContent = currentEvent.difficulty || "Unknown";
+    }
+
+    // First page load: session, streak, event, play status and streak
+    // leaderboard in one request. Falls back to the individual endpoints.
+    function bootstrap() {
+        fetch("/api/bootstrap", { credentials: 'include' })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                if (data.username) {
+                    renderSession(data.username);
+                    renderStreak(data.stats ? data.stats.streak : undefined);
+                } else {
+                    document.getElementById("auth-modal").classList.remove("hidden");
+                }
+                renderStreakLeaderboard(data.streak_leaderboard || []);
+                rolloverAt = data.rollover_at ? data.rollover_at * 1000 : null;
+                if (!data.event) {
+                    currentClueEl.innerHTML = "<span class='clue-text'>Error loading event.</span>";
+                    return;
+                }
+                currentEvent = data.event;
+                startEvent(data.already_played);
+            })
+            .catch(err => {
+                console.error("Bootstrap failed, loading piecemeal:", err);
+                checkSession();
+                fetchEvent();
+                updateStreakLeaderboard();
+            });
+    }
+
     // Update the current displayed clue.
     function updateClueDisplay() {
         if (currentEvent && currentEvent.clues && currentClueIndex < currentEvent.clues.length) {
@@ -724,15 +747,18 @@ document.addEventListener("DOMContentLoaded", () => {
             tomorrowEastern.setDate(nowEastern.getDate() + 1);
             tomorrowEastern.setHours(0, 0, 0, 0);
             
-            // Compute the difference in milliseconds
-            const timeLeft = tomorrowEastern - nowEastern;
+            // Compute the difference in milliseconds; the server's cutoff wins when known.
+            const timeLeft = rolloverAt ? rolloverAt - Date.now() : tomorrowEastern - nowEastern;
             
             // If timeLeft is less than or equal to 0, display zeros and re-fetch event data
             if (timeLeft <= 0) {
                 document.getElementById("countdown-hours").textContent = "00";
                 document.getElementById("countdown-minutes").textContent = "00";
                 document.getElementById("countdown-seconds").textContent = "00";
-                fetchEvent();  // Refresh the event at midnight Eastern.
+                if (rolloverAt) {
+                    rolloverAt += 24 * 60 * 60 * 1000;
+                }
+                fetchEvent();  // Refresh the event at the cutoff.
             } else {
                 const hours = Math.floor(timeLeft / (1000 * 60 * 60));
                 const minutes = Math.floor((timeLeft % (1000 * 60 * 60)) / (1000 * 60));
@@ -1045,17 +1071,14 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 
 
-    // Call checkSession as the first step, then proceed with initializing the game.
-    checkSession();
+    // Load session, event, stats and streak leaderboard in one request.
+    bootstrap();
     showBookmarkBanner();
 
-    // Initialize game, countdown, and leaderboard.
-    fetchEvent();
+    // Initialize countdown and leaderboards.
     startCountdown();
     updateLeaderboard();
     setInterval(updateLeaderboard, 10000);
-    // Initialize streak leaderboard.
-    updateStreakLeaderboard();
     setInterval(updateStreakLeaderboard, 10000);
 
     // Debug button to clear the played flag.
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Tests that import app.py run it against a throwaway SQLite database and
+# cache directory; set before anything reads the environment.
+_workdir = tempfile.mkdtemp(prefix="historle-tests-")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("HISTORLE_BACKEND", "sqlite")
+os.environ.setdefault("HISTORLE_SQLITE_PATH", os.path.join(_workdir, "historle.db"))
+os.environ.setdefault("HISTORLE_CACHE_DIR", os.path.join(_workdir, "cache"))
+os.environ.setdefault("EVENT_REFRESH_STAMP", os.path.join(_workdir, "event-refresh"))
+os.environ.setdefault("SCORE_QUEUE_PATH", os.path.join(_workdir, "scores.db"))
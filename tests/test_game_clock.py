@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+
+from utils.game_clock import GAME_TIMEZONE, GameClock
+
+
+class FakeClock:
+    def __init__(self, when: datetime):
+        self.now = GAME_TIMEZONE.localize(when).timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def make_clock(tmp_path, monkeypatch):
+    # tick() is driven by the tests, not by the background thread.
+    monkeypatch.setattr(GameClock, "_ensure_thread", lambda self: None)
+
+    def make(fake, cutoff_hour=0, directory=tmp_path):
+        return GameClock(cutoff_hour=cutoff_hour, clock=fake, directory=str(directory))
+    return make
+
+
+@pytest.mark.parametrize("cutoff_hour, before, after", [
+    (0, datetime(2026, 3, 7, 23, 59, 59), ("2026-03-07", "2026-03-08")),
+    (20, datetime(2026, 3, 7, 19, 59, 59), ("2026-03-06", "2026-03-07")),
+])
+def test_hooks_get_previous_and_new_date(make_clock, cutoff_hour, before, after):
+    fake = FakeClock(before)
+    clock = make_clock(fake, cutoff_hour)
+    calls = []
+    clock.on_rollover(lambda previous, new: calls.append((previous, new)))
+
+    assert clock.today() == after[0]
+    assert clock.tick() is False
+    fake.advance(1)
+    assert clock.today() == after[1]
+    assert clock.tick() is True
+    assert calls == [after]
+    assert clock.tick() is False
+    assert calls == [after]
+
+
+def test_once_hook_runs_in_one_of_two_clocks(make_clock, tmp_path):
+    fake = FakeClock(datetime(2026, 3, 7, 23, 59, 59))
+    first, second = make_clock(fake, directory=tmp_path), make_clock(fake, directory=tmp_path)
+    once_calls, every_calls = [], []
+
+    def rotate_journals(previous, new):
+        once_calls.append((previous, new))
+
+    def drop_caches(previous, new):
+        every_calls.append((previous, new))
+
+    for clock in (first, second):
+        clock.on_rollover(rotate_journals, once=True)
+        clock.on_rollover(drop_caches)
+        clock.today()
+    fake.advance(1)
+    assert first.tick() and second.tick()
+
+    assert once_calls == [("2026-03-07", "2026-03-08")]
+    assert every_calls == [("2026-03-07", "2026-03-08")] * 2
+
+
+def test_no_hook_runs_before_first_today(make_clock):
+    fake = FakeClock(datetime(2026, 3, 7, 12, 0))
+    clock = make_clock(fake)
+    calls = []
+    clock.on_rollover(lambda previous, new: calls.append((previous, new)))
+
+    # Days pass before anything asks for the date: the first look only
+    # records today, it doesn't count as a rollover.
+    fake.advance(3 * 86400)
+    assert clock._hooked_date is None
+    assert clock.tick() is False
+    assert calls == []
+    assert clock.today() == "2026-03-10"
+
+    fake.advance(86400)
+    assert clock.tick() is True
+    assert calls == [("2026-03-10", "2026-03-11")]
+
+
+def test_dst_day_is_one_hour_short(make_clock):
+    # 2026-03-08 is the spring-forward day in New York.
+    fake = FakeClock(datetime(2026, 3, 8, 12, 0))
+    clock = make_clock(fake)
+    clock.today()
+    starts, ends, _ = clock._window
+    assert ends - starts == 23 * 3600
@@ -0,0 +1,94 @@
+import random
+import sqlite3
+
+import pytest
+
+from utils.db import SQLiteBackend
+from utils.event_stats import UNTIMED
+from utils.leaderboard import DailyLeaderboard, decode_cursor, encode_cursor, keyset_key, solve_seconds
+
+GAME_DATE = "2026-10-18"
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("01:23", 83), ("9:59", 599), ("10:00", 600), ("1:02:03", 3723), (" 02:00 ", 120),
+    ("83", 83), ("83.9", 83), (83, 83), (83.9, 83), ("0", 0),
+    ("", UNTIMED), (None, UNTIMED), ("abc", UNTIMED), ("1:-5", UNTIMED), ("-5", UNTIMED), (-5, UNTIMED),
+])
+def test_solve_seconds(value, seconds):
+    assert solve_seconds(value) == seconds
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / "leaderboard.db"))
+
+
+def mixed_rows(count=60, seed=3):
+    """Rows as both submit paths send them: 'MM:SS' strings and plain numbers of seconds."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        seconds = rng.choice([59, 60, 61, 599, 600, 601, rng.randint(1, 1500)])
+        solve_time = f"{seconds // 60:02d}:{seconds % 60:02d}" if i % 2 else str(seconds)
+        rows.append({"name": f"p{i}", "solve_time": solve_time, "clues_used": rng.randint(0, 6),
+                     "date": GAME_DATE})
+    return rows
+
+
+def test_pages_follow_the_in_memory_board(backend):
+    board = DailyLeaderboard(GAME_DATE)
+    for row in mixed_rows():
+        board.add(backend.insert_leaderboard_entry(row))
+    expected = [row["id"] for row in board.top(100, max_clues=5)]
+
+    snapshot = backend.leaderboard_snapshot_id(GAME_DATE)
+    paged, after = [], None
+    while True:
+        rows = backend.fetch_leaderboard(GAME_DATE, 7, after=after, max_clues=5, snapshot_id=snapshot)
+        if not rows:
+            break
+        paged.extend(row["id"] for row in rows)
+        after, _ = decode_cursor(encode_cursor(rows[-1], len(paged)))
+    assert paged == expected
+
+    # Backwards from the end gives the same rows.
+    last = backend.fetch_leaderboard(GAME_DATE, 100, max_clues=5)[-1]
+    before = backend.fetch_leaderboard(GAME_DATE, 10, before=keyset_key(last), max_clues=5)
+    assert [row["id"] for row in before] == expected[-11:-1]
+
+
+def test_position_uses_numeric_order(backend):
+    backend.insert_leaderboard_entry({"name": "slow", "solve_time": "10:00", "clues_used": 1, "date": GAME_DATE})
+    backend.insert_leaderboard_entry({"name": "fast", "solve_time": "9:59", "clues_used": 1, "date": GAME_DATE})
+    backend.insert_leaderboard_entry({"name": "manual", "solve_time": "61", "clues_used": 1, "date": GAME_DATE})
+    positions = {name: backend.leaderboard_position(GAME_DATE, name)[1] for name in ("slow", "fast", "manual")}
+    assert positions == {"manual": 1, "fast": 2, "slow": 3}
+
+
+def test_snapshot_hides_later_rows(backend):
+    backend.insert_leaderboard_entry({"name": "a", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE})
+    snapshot = backend.leaderboard_snapshot_id(GAME_DATE)
+    backend.insert_leaderboard_entry({"name": "b", "solve_time": "00:10", "clues_used": 1, "date": GAME_DATE})
+    rows = backend.fetch_leaderboard(GAME_DATE, 10, snapshot_id=snapshot)
+    assert [row["name"] for row in rows] == ["a"]
+
+
+def test_existing_database_gets_solve_seconds(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        create table leaderboard (id integer primary key autoincrement, name text not null, solve_time text,
+                                  clues_used integer, date text not null, timestamp text, x_profile text,
+                                  submission_id text unique);
+        create index leaderboard_date_idx on leaderboard (date, solve_time, clues_used);
+        insert into leaderboard (name, solve_time, clues_used, date) values ('a', '10:00', 1, '2026-10-18');
+        insert into leaderboard (name, solve_time, clues_used, date) values ('b', '95', 1, '2026-10-18');
+    """)
+    conn.close()
+
+    backend = SQLiteBackend(path)
+    assert [(row["name"], row["solve_seconds"]) for row in backend.fetch_leaderboard(GAME_DATE)] == \
+        [("b", 95), ("a", 600)]
+    indexes = {row["name"] for row in backend._query("pragma index_list(leaderboard)")}
+    assert "leaderboard_keyset_idx" in indexes and "leaderboard_date_idx" not in indexes
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from utils.score_queue import ScoreQueue
+from utils.streaks import apply_result
+
+GAME_DATE = "2026-10-18"
+
+
+def make_queue(tmp_path, flushed=None):
+    flushed = [] if flushed is None else flushed
+    queue = ScoreQueue(lambda entries, stats: flushed.append((entries, stats)),
+                       path=str(tmp_path / "scores.db"), interval=3600)
+    queue._ensure_flusher = lambda: None  # flushes are driven by the test
+    return queue
+
+
+def test_concurrent_submits_for_one_user_are_serialised(tmp_path):
+    queue = make_queue(tmp_path)
+    base = {"streak": 0, "days_played": 0, "total_wins": 0, "total_losses": 0,
+            "longest_win_streak": 0, "last_win_date": None}
+
+    def slow_apply(current):
+        time.sleep(0.05)  # widen the read-modify-write window
+        return apply_result(current, True, GAME_DATE)
+
+    def submit(i):
+        entry = {"name": "player", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE,
+                 "timestamp": str(i)}
+        queue.enqueue_result(entry, lambda: dict(base), slow_apply)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert queue.depth() == 4
+    assert queue.pending_stats("player")["days_played"] == 4
+    assert queue.pending_stats("player")["total_wins"] == 4
+
+
+def test_unknown_user_queues_nothing(tmp_path):
+    queue = make_queue(tmp_path)
+    entry = {"name": "nobody", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE}
+    assert queue.enqueue_result(entry, lambda: None, lambda current: current) is None
+    assert queue.depth() == 0
+
+
+def test_flush_sends_newest_stats_per_user(tmp_path):
+    flushed = []
+    queue = make_queue(tmp_path, flushed)
+    for i in range(3):
+        entry = {"name": "player", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE}
+        queue.enqueue_result(entry, lambda: {"days_played": 0},
+                             lambda current: {"days_played": current["days_played"] + 1})
+    assert queue.flush_once() == 3
+    entries, stats = flushed[0]
+    assert len(entries) == 3 and stats == {"player": {"days_played": 3}}
+    assert queue.depth() == 0
+
+
+def test_base_stats_load_outside_the_write_lock(tmp_path):
+    queue = make_queue(tmp_path)
+
+    def slow_load():
+        time.sleep(0.1)  # a profile cache miss
+        return {"days_played": 0}
+
+    def submit(i):
+        entry = {"name": f"player{i}", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE}
+        queue.enqueue_result(entry, slow_load, lambda current: {"days_played": current["days_played"] + 1})
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert queue.depth() == 8
+    assert time.perf_counter() - start < 0.4  # 0.8 s if the loads took turns
+
+
+def test_load_that_races_a_flush_is_redone(tmp_path):
+    queue = make_queue(tmp_path)
+    stored = {"days_played": 0}
+    loads = []
+
+    def load():
+        loads.append(dict(stored))
+        if len(loads) == 1:
+            # Another worker queues and flushes for this user mid-load.
+            other = {"name": "player", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE}
+            queue._insert(queue._connect(), dict(other, submission_id="other"), {"days_played": 1})
+            queue.flush_once()
+            stored["days_played"] = 1
+        return dict(loads[-1])
+
+    entry = {"name": "player", "solve_time": "01:00", "clues_used": 1, "date": GAME_DATE}
+    _, stats = queue.enqueue_result(entry, load, lambda current: {"days_played": current["days_played"] + 1})
+    assert len(loads) == 2
+    assert stats == {"days_played": 2}
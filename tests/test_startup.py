@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import plus create_app() takes about half a second on a laptop; this
+# leaves room for a slow CI box while still catching an eager client,
+# word list or network call creeping back into startup.
+STARTUP_BUDGET_SECONDS = 2.0
+
+# Run in a fresh interpreter: app.py may already be imported by other
+# tests, and both the phases and the thread check are about a cold start.
+PROBE = """
+import json, threading
+import app
+app.create_app()
+from utils import startup
+threads = sorted(t.name for t in threading.enumerate() if t is not threading.main_thread())
+print("PROBE " + json.dumps({"phases": startup.phases, "total": startup.total(), "threads": threads}))
+"""
+
+
+def run_probe():
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", PROBE], cwd=ROOT, env=os.environ.copy(),
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    line = next(line for line in result.stdout.splitlines() if line.startswith("PROBE "))
+    return json.loads(line[len("PROBE "):])
+
+
+def test_create_app_starts_no_threads_and_fits_budget():
+    probe = run_probe()
+    assert probe["threads"] == []
+    assert set(probe["phases"]) >= {"imports", "setup", "warm"}
+    assert probe["total"] < STARTUP_BUDGET_SECONDS, probe["phases"]
@@ -0,0 +1,155 @@
+import os
+
+import pytest
+
+from utils.db import SQLiteBackend
+from utils.shared_cache import SharedCache
+from utils.streak_board import StreakBoard
+from utils.streaks import STAT_COLUMNS, apply_result, recompute_streaks
+
+GAME_DATE = "2026-10-18"
+
+# A Postgres database with the Supabase schema (users, leaderboard), for
+# checking sql/submit_score.sql itself. Each test runs in a transaction
+# that is rolled back, function definition included.
+TEST_DATABASE_URL = os.environ.get("HISTORLE_TEST_DATABASE_URL")
+SUBMIT_SCORE_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "sql", "submit_score.sql")
+
+NEW_USER = {"streak": 0, "days_played": 0, "total_wins": 0, "total_losses": 0,
+            "longest_win_streak": 0, "last_win_date": None, "last_played_date": None}
+
+# (name, user's row before the game, win, expected stats after it)
+CASES = [
+    ("first win", NEW_USER, True,
+     {"streak": 1, "days_played": 1, "total_wins": 1, "total_losses": 0,
+      "longest_win_streak": 1, "last_win_date": GAME_DATE}),
+    ("consecutive win", dict(NEW_USER, streak=3, days_played=5, total_wins=4, total_losses=1,
+                             longest_win_streak=3, last_win_date="2026-10-17"), True,
+     {"streak": 4, "days_played": 6, "total_wins": 5, "total_losses": 1,
+      "longest_win_streak": 4, "last_win_date": GAME_DATE}),
+    ("same-day resubmit", dict(NEW_USER, streak=2, days_played=2, total_wins=2,
+                               longest_win_streak=2, last_win_date=GAME_DATE), True,
+     {"streak": 2, "days_played": 3, "total_wins": 3, "total_losses": 0,
+      "longest_win_streak": 2, "last_win_date": GAME_DATE}),
+    ("loss", dict(NEW_USER, streak=3, days_played=3, total_wins=3,
+                  longest_win_streak=3, last_win_date="2026-10-17"), False,
+     {"streak": 0, "days_played": 4, "total_wins": 3, "total_losses": 1,
+      "longest_win_streak": 3, "last_win_date": "2026-10-17"}),
+    ("win after a two-day gap", dict(NEW_USER, streak=5, days_played=9, total_wins=7, total_losses=2,
+                                     longest_win_streak=6, last_win_date="2026-10-16"), True,
+     {"streak": 1, "days_played": 10, "total_wins": 8, "total_losses": 2,
+      "longest_win_streak": 6, "last_win_date": GAME_DATE}),
+    ("win after a long gap", dict(NEW_USER, streak=2, days_played=2, total_wins=2,
+                                  longest_win_streak=2, last_win_date="2026-09-01"), True,
+     {"streak": 1, "days_played": 3, "total_wins": 3, "total_losses": 0,
+      "longest_win_streak": 2, "last_win_date": GAME_DATE}),
+]
+
+CASE_IDS = [case[0] for case in CASES]
+
+
+@pytest.mark.parametrize("name, before, win, expected", CASES, ids=CASE_IDS)
+def test_apply_result(name, before, win, expected):
+    assert apply_result(before, win, GAME_DATE) == dict(expected, last_played_date=GAME_DATE)
+
+
+def test_apply_result_does_not_modify_its_input():
+    before = dict(NEW_USER, streak=3, last_win_date="2026-10-17")
+    apply_result(before, True, GAME_DATE)
+    assert before == dict(NEW_USER, streak=3, last_win_date="2026-10-17")
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / "streaks.db"))
+
+
+@pytest.fixture
+def postgres():
+    if not TEST_DATABASE_URL:
+        pytest.skip("HISTORLE_TEST_DATABASE_URL is not set")
+    psycopg = pytest.importorskip("psycopg")
+    conn = psycopg.connect(TEST_DATABASE_URL)
+    try:
+        with open(SUBMIT_SCORE_SQL) as f:
+            conn.execute(f.read())
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.mark.parametrize("name, before, win, expected", CASES, ids=CASE_IDS)
+def test_submit_score_sql_matches_reference(postgres, name, before, win, expected):
+    columns = ["username", "password"] + [column for column in STAT_COLUMNS if column in before]
+    row = dict(before, username="submit-score-test", password="unused")
+    postgres.execute(
+        f"insert into public.users ({', '.join(columns)}) values ({', '.join(['%s'] * len(columns))})",
+        [row[column] for column in columns]
+    )
+    result = postgres.execute(
+        "select public.submit_score(%s, %s, %s, %s::date, %s, %s::date)",
+        ["submit-score-test", "01:23", 2 if win else 6, GAME_DATE, win, GAME_DATE]
+    ).fetchone()[0]
+
+    assert {column: result[column] for column in STAT_COLUMNS} == dict(expected, last_played_date=GAME_DATE)
+    assert result["entry"]["name"] == "submit-score-test"
+
+
+@pytest.mark.parametrize("name, before, win, expected", CASES, ids=CASE_IDS)
+def test_sqlite_submit_score_stores_the_stats(backend, name, before, win, expected):
+    # The stats come from apply_result (checked above); this covers the
+    # local backend's transaction: entry inserted, user row updated.
+    backend.create_user(dict(before, username="player", password="unused"))
+    result = backend.submit_score("player", "01:23", 2 if win else 6, GAME_DATE, win, GAME_DATE)
+
+    stats = dict(expected, last_played_date=GAME_DATE)
+    assert {column: result[column] for column in STAT_COLUMNS} == stats
+    assert backend.get_user("player", ", ".join(STAT_COLUMNS)) == stats
+    assert result["entry"]["name"] == "player"
+    assert [row["name"] for row in backend.iter_leaderboard(GAME_DATE)] == ["player"]
+
+
+def test_submit_score_for_unknown_user_writes_nothing(backend):
+    assert backend.submit_score("nobody", "01:23", 2, GAME_DATE, True, GAME_DATE) is None
+    assert list(backend.iter_leaderboard(GAME_DATE)) == []
+
+
+def test_recompute_resets_only_streaks_still_broken(backend):
+    for username, last_win in [("current", "2026-10-17"), ("broken", "2026-10-15"), ("never", None),
+                               ("won since read", "2026-10-15")]:
+        backend.create_user(dict(NEW_USER, username=username, password="unused", streak=3,
+                                 last_win_date=last_win))
+    rows = list(backend.iter_streaks())
+    # A win lands between reading the streaks and resetting them.
+    backend.update_user("won since read", {"streak": 4, "last_win_date": GAME_DATE})
+    notified = []
+
+    result = recompute_streaks(rows, backend.reset_streaks, GAME_DATE, on_reset=notified.extend)
+
+    assert result == {"checked": 4, "reset": 2}
+    assert sorted(notified) == ["broken", "never"]
+    streaks = {row["username"]: row["streak"] for row in backend.top_streaks(10)}
+    assert streaks == {"current": 3, "won since read": 4, "broken": 0, "never": 0}
+
+
+def test_streak_board_drops_a_rebuild_that_raced_a_change(backend, tmp_path):
+    backend.create_user(dict(NEW_USER, username="leader", password="unused", streak=3))
+    loads = []
+
+    def load(limit):
+        rows = backend.top_streaks(limit)
+        loads.append(rows)
+        if len(loads) == 1:
+            # A submit lands after the rows were read; there is no snapshot
+            # yet, so only the generation tells the rebuild about it.
+            backend.update_user("leader", {"streak": 4})
+            board.note_change("leader", 4)
+        return rows
+
+    board = StreakBoard(load, cache=SharedCache(str(tmp_path / "cache"), ttl=60))
+    assert board.top()[0]["streak"] == 3
+    assert board.top()[0]["streak"] == 4
+    assert board.top()[0]["streak"] == 4
+    assert len(loads) == 2
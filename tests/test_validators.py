@@ -0,0 +1,61 @@
+import pytest
+from better_profanity import profanity
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+from utils.validators import ProfanityFilter
+
+# Hand-picked cases: clean text, Scunthorpe-style near misses, leetspeak,
+# multi-word phrases, and separators between, around and inside words.
+CORPUS = [
+    "", " ", "hello world", "Historle", "Battle of Hastings", "Treaty of Versailles",
+    "class", "assassin", "Scunthorpe", "cocktail", "Essex", "Middlesex", "Moby Dick", "Dick Cheney",
+    "cum laude", "Hancock", "analysis", "therapist", "grape", "Shitake", "button",
+    "shit", "SHIT", "Shit!", "sh1t", "$hit", "5h17", "sh!t", "shiiit", "shits", "bullshit",
+    "f*ck", "fvck", "fuck", "FuCk", "b1tch", "bi7ch", "@ss", "a$$", "a55", "4ss", "@$$",
+    "blow job", "blowjob", "blow-job", "blow_job", "blow.job", "blow  job", "blow\tjob", "blow\njob",
+    "b1ow j0b", "bull shit", "bull-shit", "2 girls 1 cup", "2-girls-1-cup", "2 girls, 1 cup",
+    "doggy style!", "the doggy-style", "deep throat.", "auto erotic", "auto-erotic car",
+    "shit.", ".shit", "sh.it", "s h i t", "sh-it", "shit!!!", "-shit-", "(shit)", "'shit'",
+    "a.s.s", "ass-hat", "x_shit_x", "shit_", "_shit", "you're", "it's", "don't-shit",
+    "@@@", "***", "*", "**", "*****", "____", "---", "...", "@", "$$$", "a*", "*s", "s*",
+    "naïve", "shït", "💩 shit", "shit💩", "ab\ncd", "tab\there", "multi   space", "trailing ",
+    "Napoleon Bonaparte", "Fall of the Berlin Wall", "The Great Fire of London",
+    "Marie Curie wins the Nobel Prize", "Moon landing 1969", "Cuban Missile Crisis",
+]
+
+
+def _variants(word):
+    """A few spellings of a censor word the filter has to agree on."""
+    leet = word.replace("a", "@").replace("e", "3").replace("s", "$").replace("i", "1").replace("o", "0")
+    yield word
+    yield leet
+    yield word.upper()
+    yield f"the {word}!"
+    yield word.replace(" ", "-")
+    yield word.replace(" ", "")
+    yield f"x{word}x"
+    yield f"{word[:-1]} {word[-1:]}"
+
+
+@pytest.fixture(scope="module")
+def reference():
+    profanity.load_censor_words()
+    return profanity.contains_profanity
+
+
+@pytest.fixture(scope="module")
+def profanity_filter():
+    return ProfanityFilter().compile()
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_matches_better_profanity(profanity_filter, reference, text):
+    assert profanity_filter.contains_profanity(text) == reference(text)
+
+
+def test_matches_better_profanity_on_word_list(profanity_filter, reference):
+    # Every 7th censor word, in each of its variants: a fixed, list-wide sample.
+    words = sorted(read_wordlist(get_complete_path_of_file("profanity_wordlist.txt")))[::7]
+    mismatches = [text for word in words for text in _variants(word)
+                  if profanity_filter.contains_profanity(text) != reference(text)]
+    assert mismatches == []
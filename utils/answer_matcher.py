@@ -0,0 +1,74 @@
+import re
+import unicodedata
+from typing import Iterable, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+# Minimum fuzz.ratio score (0-100) for a guess to count as correct;
+# `flask evaluate-guesses` scores other settings against logged guesses.
+FUZZ_THRESHOLD = 79
+
+_APOSTROPHES = re.compile(r"['‘’`]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_LEADING_ARTICLE = re.compile(r"^(the|a|an) ")
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Canonical form used for both answers and guesses: accents stripped,
+    lowercased, punctuation folded to single spaces and a leading
+    "the"/"a"/"an" removed.
+    """
+    text = text or ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.lower()
+    text = _APOSTROPHES.sub("", text)
+    text = _NON_WORD.sub(" ", text).strip()
+    stripped = _LEADING_ARTICLE.sub("", text)
+    # Don't reduce an answer like "The" to nothing.
+    return stripped or text
+
+
+class AnswerMatcher:
+    """
+    Accepted answers for one event, compiled once when the event loads.
+
+    Exact hits are a set lookup on the normalised guess; everything else
+    goes through a single rapidfuzz extractOne pass with a score cutoff.
+    """
+
+    def __init__(self, answers: Iterable[str], threshold: int = FUZZ_THRESHOLD):
+        normalized = (normalize_answer(a) for a in answers if a)
+        # dict.fromkeys de-duplicates while keeping the official answer first.
+        self.choices = list(dict.fromkeys(n for n in normalized if n))
+        self.exact = frozenset(self.choices)
+        self.threshold = threshold
+
+    @classmethod
+    def from_normalized(cls, choices: Iterable[str], threshold: int = FUZZ_THRESHOLD) -> "AnswerMatcher":
+        """A matcher for answers that were normalised (and de-duplicated) when stored."""
+        matcher = cls.__new__(cls)
+        matcher.choices = list(choices)
+        matcher.exact = frozenset(matcher.choices)
+        matcher.threshold = threshold
+        return matcher
+
+    def judge(self, guess: str) -> Tuple[str, Optional[float]]:
+        """(normalised guess, best fuzz.ratio score at or above the threshold or None)."""
+        normalized = normalize_answer(guess)
+        if not normalized:
+            return normalized, None
+        if normalized in self.exact:
+            return normalized, 100.0
+        best = process.extractOne(normalized, self.choices, scorer=fuzz.ratio,
+                                  processor=None, score_cutoff=self.threshold)
+        return normalized, best[1] if best else None
+
+    def score(self, guess: str) -> Optional[float]:
+        """Best fuzz.ratio score at or above the threshold, or None."""
+        return self.judge(guess)[1]
+
+    def matches(self, guess: str) -> bool:
+        return self.score(guess) is not None
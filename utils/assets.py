@@ -0,0 +1,252 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app, request, send_file
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# ASSET_PIPELINE=0 serves static files as they are (handy while editing them).
+ASSET_PIPELINE_ENABLED = os.environ.get("ASSET_PIPELINE", "1") != "0"
+
+# Hashed copies and their compressed variants go here, outside static/.
+ASSET_BUILD_DIR = os.environ.get(
+    "ASSET_BUILD_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static-build")
+)
+
+# Files from earlier builds are kept this long, so pages rendered before a
+# rebuild (or by a worker still on the old build) can still load them.
+ASSET_KEEP_SECONDS = 24 * 3600
+
+# Only text-like files are worth compressing; images are already compressed.
+COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".txt", ".xml", ".ico", ".map"}
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_MANIFEST = "manifest.json"
+_STATIC_REF = re.compile(r"""url_for\(\s*['"]static['"]\s*,\s*filename\s*=\s*['"]([^'"]+)['"]""")
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def hashed_filename(filename: str, data: bytes) -> str:
+    """'js/game.js' -> 'js/game.<12 hex digits of the content hash>.js'."""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha1(data).hexdigest()[:12]}{ext}"
+
+
+def template_assets(template_path: str) -> List[str]:
+    """Static filenames a template references through url_for('static', ...), in order."""
+    with open(template_path, encoding="utf-8") as f:
+        names = _STATIC_REF.findall(f.read())
+    return list(dict.fromkeys(name for name in names if not name.endswith("/")))
+
+
+class AssetPipeline:
+    """
+    Content-hashed, precompressed copies of the files under static/.
+
+    build() copies every static file to the build directory under a name
+    that includes its content hash, writes gzip (and, with the brotli
+    package installed, brotli) variants of text files, and records the
+    mapping in a manifest. Once attached with init_app(),
+    url_for('static', filename=...) returns the hashed name and the static
+    route serves it with the best encoding the client accepts and a
+    one-year immutable Cache-Control, so returning players never
+    revalidate it. Names that aren't in the manifest (e.g. literal
+    /static/ paths in game.js) are served by Flask as before.
+
+    Each process loads the manifest on first use and rebuilds it first if
+    a source file changed since; create_app() does this before forking.
+    """
+
+    def __init__(self, source_dir: str, build_dir: str = ASSET_BUILD_DIR,
+                 enabled: bool = ASSET_PIPELINE_ENABLED):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.enabled = enabled
+        self._files: Optional[Dict[str, Dict]] = None  # source name -> manifest entry
+        self._by_hashed: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.url_defaults(self._hash_static_url)
+        app.view_functions["static"] = self.serve
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.build_dir, _MANIFEST)
+
+    def _sources(self) -> Iterable[str]:
+        for root, dirs, names in os.walk(self.source_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(names):
+                if not name.startswith("."):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, self.source_dir).replace(os.sep, "/")
+
+    def build(self) -> Dict[str, Dict]:
+        """Hash and compress every static file; returns the new manifest entries."""
+        files = {}
+        for name in self._sources():
+            path = os.path.join(self.source_dir, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            stat = os.stat(path)
+            hashed = hashed_filename(name, data)
+            entry = {"hashed": hashed, "size": len(data), "mtime": stat.st_mtime, "gzip": None, "br": None}
+            target = os.path.join(self.build_dir, hashed)
+            if not os.path.exists(target):
+                _write_atomic(target, data)
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                variants = {"gzip": lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+                if brotli is not None:
+                    variants["br"] = lambda: brotli.compress(data, quality=11)
+                for encoding, compress in variants.items():
+                    suffix = ".gz" if encoding == "gzip" else ".br"
+                    if os.path.exists(target + suffix):
+                        entry[encoding] = os.path.getsize(target + suffix)
+                        continue
+                    compressed = compress()
+                    # Not worth a Content-Encoding for a few percent.
+                    if len(compressed) < len(data) * 0.9:
+                        _write_atomic(target + suffix, compressed)
+                        entry[encoding] = len(compressed)
+            files[name] = entry
+        _write_atomic(self._manifest_path(), json.dumps({"built": time.time(), "files": files}).encode())
+        self._prune(files)
+        self._use(files)
+        return files
+
+    def ensure_built(self) -> Dict[str, Dict]:
+        """The current manifest, rebuilding first if it is missing or a source changed."""
+        files = self._read_manifest()
+        if files is None or self._stale(files):
+            files = self.build()
+            print(self.summary(files), flush=True)
+        else:
+            self._use(files)
+        return files
+
+    def manifest(self) -> Dict[str, Dict]:
+        if self._files is None:
+            with self._lock:
+                if self._files is None and not self.enabled:
+                    self._use({})
+                elif self._files is None:
+                    try:
+                        self.ensure_built()
+                    except OSError as e:
+                        # Serve the plain files rather than failing the page.
+                        print("Asset build error:", e)
+                        self._use({})
+        return self._files
+
+    def hashed_name(self, filename: str) -> Optional[str]:
+        entry = self.manifest().get(filename)
+        return entry["hashed"] if entry else None
+
+    def serve(self, filename: str):
+        """Static route: hashed names get the precompressed variant and immutable caching."""
+        self.manifest()
+        entry = self._by_hashed.get(filename)
+        if entry is None:
+            return current_app.send_static_file(filename)
+        path = os.path.join(self.build_dir, entry["hashed"])
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = self._pick_encoding(entry)
+        response = send_file(path + (".br" if encoding == "br" else ".gz") if encoding else path,
+                             mimetype=mimetype, conditional=True, max_age=31536000)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if entry["gzip"] or entry["br"]:
+            response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    def summary(self, files: Dict[str, Dict]) -> str:
+        compressed = sum(1 for entry in files.values() if entry["gzip"] or entry["br"])
+        return (f"Assets built: {len(files)} files ({compressed} precompressed"
+                f"{', brotli' if brotli is not None else ', gzip only'}) in {self.build_dir}")
+
+    def report(self, filenames: Iterable[str]) -> Dict[str, int]:
+        """Bytes a first visit downloads for these files, plain vs. best encoding."""
+        files = self.manifest()
+        plain = best = count = 0
+        for name in filenames:
+            entry = files.get(name)
+            if entry is None:
+                continue
+            count += 1
+            plain += entry["size"]
+            best += min(size for size in (entry["size"], entry["gzip"], entry["br"]) if size)
+        return {"files": count, "plain": plain, "compressed": best, "saved": plain - best}
+
+    def _pick_encoding(self, entry: Dict) -> Optional[str]:
+        accepted = request.accept_encodings
+        if entry["br"] and accepted.quality("br") > 0:
+            return "br"
+        if entry["gzip"] and accepted.quality("gzip") > 0:
+            return "gzip"
+        return None
+
+    def _hash_static_url(self, endpoint: str, values: Dict):
+        if endpoint == "static" and "filename" in values:
+            hashed = self.hashed_name(values["filename"])
+            if hashed:
+                values["filename"] = hashed
+
+    def _use(self, files: Dict[str, Dict]):
+        self._by_hashed = {entry["hashed"]: entry for entry in files.values()}
+        self._files = files
+
+    def _read_manifest(self) -> Optional[Dict[str, Dict]]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)["files"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _stale(self, files: Dict[str, Dict]) -> bool:
+        names = list(self._sources())
+        if set(names) != set(files):
+            return True
+        for name in names:
+            stat = os.stat(os.path.join(self.source_dir, name))
+            entry = files[name]
+            if stat.st_size != entry["size"] or stat.st_mtime != entry["mtime"]:
+                return True
+        return False
+
+    def _prune(self, files: Dict[str, Dict]):
+        keep = {entry["hashed"] for entry in files.values()}
+        cutoff = time.time() - ASSET_KEEP_SECONDS
+        for root, _, names in os.walk(self.build_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.build_dir).replace(os.sep, "/")
+                base = re.sub(r"\.(gz|br)$", "", relative)
+                if relative == _MANIFEST or base in keep:
+                    continue
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
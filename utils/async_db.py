@@ -0,0 +1,130 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+import httpx
+
+from utils.db import BACKENDS
+
+# Connections shared by every request handled by one ASGI worker.
+POOL_SIZE = int(os.environ.get("HISTORLE_HTTP_POOL", "50"))
+
+
+def _in_list(values: List[str]) -> str:
+    """PostgREST in.() filter with every value quoted."""
+    quoted = ('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return "in.(" + ",".join(quoted) + ")"
+
+
+class AsyncSupabaseBackend:
+    """
+    The calls asgi.py makes on the event loop - score submission and the
+    leaderboard's x_id lookups - talking to Supabase's PostgREST API
+    through one pooled httpx.AsyncClient. Method names and return values
+    match utils.db.SupabaseBackend.
+    """
+
+    def __init__(self):
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_KEY")
+        if not url or not key:
+            raise Exception("Supabase credentials not set in environment variables")
+        self._base_url = url.rstrip("/") + "/rest/v1"
+        self._headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use so it belongs to the worker's event loop.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers=self._headers,
+                limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+                timeout=10,
+            )
+        return self._client
+
+    async def _select(self, table: str, params: Dict) -> List[Dict]:
+        response = await self.client.get(f"/{table}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_x_ids(self, usernames):
+        if not usernames:
+            return {}
+        rows = await self._select("users", {"select": "username,x_id", "username": _in_list(list(usernames))})
+        return {row["username"]: row.get("x_id") for row in rows}
+
+    async def submit_score(self, name, solve_time, clues_used, date, win, game_date):
+        response = await self.client.post("/rpc/submit_score", json={
+            "p_name": name,
+            "p_solve_time": str(solve_time),
+            "p_clues_used": clues_used,
+            "p_date": date,
+            "p_win": bool(win),
+            "p_game_date": game_date
+        })
+        if response.status_code >= 400 and "User not found" in response.text:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class AsyncLocalBackend:
+    """
+    Async face of a synchronous backend (the local SQLite driver). The
+    simulated latency is awaited on the event loop, like a real network
+    call would be, and the query itself runs on a worker thread.
+    """
+
+    def __init__(self, inner, latency: float = 0):
+        self.inner = inner
+        self.latency = latency
+
+    def __getattr__(self, name):
+        method = getattr(self.inner, name)
+
+        async def call(*args, **kwargs):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+    async def aclose(self):
+        pass
+
+
+_async_backend = None
+_wrappers = []
+
+
+def add_async_backend_wrapper(wrapper):
+    """add_backend_wrapper() for the async backend. Must be called before first use."""
+    _wrappers.append(wrapper)
+
+
+def get_async_backend():
+    """The async backend matching HISTORLE_BACKEND, created on first use."""
+    global _async_backend
+    if _async_backend is None:
+        name = os.environ.get("HISTORLE_BACKEND", "supabase")
+        if name == "supabase":
+            _async_backend = AsyncSupabaseBackend()
+        else:
+            latency_ms = float(os.environ.get("HISTORLE_BACKEND_LATENCY_MS", "0"))
+            _async_backend = AsyncLocalBackend(BACKENDS[name](), latency_ms / 1000)
+        for wrapper in _wrappers:
+            _async_backend = wrapper(_async_backend)
+    return _async_backend
+
+
+async def close_async_backend():
+    """Close the shared connection pool, if one was opened."""
+    if _async_backend is not None:
+        await _async_backend.aclose()
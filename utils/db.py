@@ -1,112 +1,832 @@
+import json
 import os
-from typing import Dict, List, Optional
-from datetime import datetime
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
 
-# Load environment variables from .env file in development
-load_dotenv()
+from utils.leaderboard import solve_seconds
+from utils.streaks import apply_result
+
+# Development .env files are looked for here, in this order.
+ENV_FILES = (
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"),
+    os.path.join(os.getcwd(), ".env"),
+)
+
+_env_loaded = False
+
+_COLUMN = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def parse_columns(columns: str) -> List[str]:
+    """Split a PostgREST-style column list ("username, x_id") into names."""
+    if columns.strip() == "*":
+        return ["*"]
+    names = [c.strip() for c in columns.split(",") if c.strip()]
+    for name in names:
+        if not _COLUMN.match(name):
+            raise ValueError(f"Invalid column name: {name!r}")
+    return names
+
+
+class Backend:
+    """
+    Storage interface used by every route in app.py.
+
+    Rows use the table's own column names (snake_case) in both directions.
+    Implementations: SupabaseBackend (production) and SQLiteBackend (local
+    runs, load tests and benchmarks), selected with HISTORLE_BACKEND.
+    """
+
+    @classmethod
+    def warm(cls):
+        """Import whatever the backend needs, without connecting (used before forking)."""
+
+    def get_event(self, game_date: str) -> Optional[Dict]:
+        """The daily_events row for game_date, or None."""
+        raise NotImplementedError
+
+    def event_dates(self, dates: List[str]) -> List[str]:
+        """Which of the given dates already have a daily_events row."""
+        raise NotImplementedError
+
+    def upsert_events(self, events: List[Dict]):
+        """Insert or replace (by date) a batch of daily_events rows in one statement."""
+        raise NotImplementedError
+
+    def iter_leaderboard(self, game_date: str, page_size: int = 1000) -> Iterator[Dict]:
+        """Every leaderboard row for game_date, read one page at a time."""
+        raise NotImplementedError
+
+    def fetch_leaderboard(self, game_date: str, limit: int = 100, after: Optional[Tuple] = None,
+                          before: Optional[Tuple] = None, max_clues: Optional[int] = None,
+                          snapshot_id: Optional[int] = None) -> List[Dict]:
+        """
+        Up to `limit` rows for game_date in (solve_seconds, clues_used, id)
+        order. `after`/`before` are keyset cursors, such a triple from an
+        earlier page: the rows right after it, or the `limit` rows right
+        before it (still returned in ascending order). Deep pages are an
+        index range scan like the first. Rows with more than max_clues clues
+        or an id above snapshot_id are left out.
+        """
+        raise NotImplementedError
+
+    def leaderboard_snapshot_id(self, game_date: str) -> int:
+        """
+        An id that pins a paging snapshot for game_date (0 if no rows): no
+        row with a lower id may still be uncommitted, so every later page
+        sees exactly the rows with id <= it.
+        """
+        raise NotImplementedError
+
+    def leaderboard_position(self, game_date: str, name: str, max_clues: Optional[int] = None,
+                             snapshot_id: Optional[int] = None) -> Optional[Tuple[Dict, int]]:
+        """The player's best row and its 1-based rank under the same filters, or None."""
+        raise NotImplementedError
+
+    def insert_leaderboard_entry(self, entry: Dict) -> Dict:
+        """Insert one leaderboard row and return it as stored."""
+        raise NotImplementedError
+
+    def get_user(self, username: str, columns: str = "*") -> Optional[Dict]:
+        """The user's row restricted to `columns`, or None."""
+        raise NotImplementedError
+
+    def get_x_ids(self, usernames: List[str]) -> Dict[str, Optional[str]]:
+        """Map each existing username to its x_id with one query."""
+        raise NotImplementedError
+
+    def create_user(self, user: Dict):
+        raise NotImplementedError
+
+    def update_user(self, username: str, fields: Dict):
+        raise NotImplementedError
+
+    def delete_user(self, username: str):
+        raise NotImplementedError
+
+    def top_streaks(self, limit: int = 5) -> List[Dict]:
+        """username, streak and x_id of the users with the highest streaks."""
+        raise NotImplementedError
+
+    def iter_streaks(self, page_size: int = 1000) -> Iterator[Dict]:
+        """id, username, streak and last_win_date of every user with a streak, by id."""
+        raise NotImplementedError
+
+    def reset_streaks(self, usernames: List[str], won_before: str) -> List[str]:
+        """
+        Set streak to 0, in one statement, for those of the given users
+        whose last win is still before won_before ('YYYY-MM-DD'), so a
+        win recorded since they were read is never wiped. Returns the
+        usernames actually reset.
+        """
+        raise NotImplementedError
+
+    def submit_score(self, name: str, solve_time: str, clues_used: int, date: str,
+                     win: bool, game_date: str) -> Optional[Dict]:
+        """
+        Insert the leaderboard row and update the user's stats atomically.
+        Returns the new stats plus the stored row under "entry", or None if
+        the user doesn't exist.
+        """
+        raise NotImplementedError
+
+    def flush_scores(self, entries: List[Dict], stats: Dict[str, Dict]):
+        """
+        Write a batch from the score queue. Entries already stored (same
+        submission_id) are skipped; stats are absolute per-user values.
+        """
+        raise NotImplementedError
+
+
+class SupabaseBackend(Backend):
+    @classmethod
+    def warm(cls):
+        import supabase  # noqa: F401
 
-class Database:
     def __init__(self):
         """Initialize Supabase client with environment variables."""
-        url: str = os.environ.get("SUPABASE_URL")
-        key: str = os.environ.get("SUPABASE_KEY")
-        
+        from supabase import create_client
+
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_KEY")
         if not url or not key:
-            raise ValueError("Missing Supabase credentials. Please check your environment variables.")
-        
-        self.client: Client = create_client(url, key)
-    
-    def save_leaderboard_entry(self, entry: Dict) -> Dict:
-        """
-        Save a new leaderboard entry to Supabase.
-        
-        Args:
-            entry (dict): The leaderboard entry containing name, solve_time, clues_used, etc.
-            
-        Returns:
-            dict: The saved entry with its database ID
-        """
+            raise Exception("Supabase credentials not set in environment variables")
+        self.client = create_client(url, key)
+
+    def get_event(self, game_date):
+        result = self.client.table("daily_events") \
+                            .select("*") \
+                            .eq("date", game_date) \
+                            .limit(1) \
+                            .execute()
+        return result.data[0] if result.data else None
+
+    def event_dates(self, dates):
+        if not dates:
+            return []
+        result = self.client.table("daily_events").select("date").in_("date", list(dates)).execute()
+        return [row["date"] for row in (result.data or [])]
+
+    def upsert_events(self, events):
+        if events:
+            self.client.table("daily_events").upsert(events, on_conflict="date").execute()
+
+    def iter_leaderboard(self, game_date, page_size=1000):
+        start = 0
+        while True:
+            result = self.client.table("leaderboard") \
+                                .select("*") \
+                                .eq("date", game_date) \
+                                .order("id", desc=False) \
+                                .range(start, start + page_size - 1) \
+                                .execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            start += page_size
+
+    def _leaderboard_query(self, query, game_date, max_clues, snapshot_id):
+        query = query.eq("date", game_date)
+        if max_clues is not None:
+            query = query.lte("clues_used", max_clues)
+        if snapshot_id is not None:
+            query = query.lte("id", snapshot_id)
+        return query
+
+    @staticmethod
+    def _keyset_filter(key, op):
+        """PostgREST or-filter for (solve_seconds, clues_used, id) strictly `op` ("gt"/"lt") key."""
+        seconds, clues_used, row_id = (int(value) for value in key)
+        return (f"solve_seconds.{op}.{seconds},"
+                f"and(solve_seconds.eq.{seconds},clues_used.{op}.{clues_used}),"
+                f"and(solve_seconds.eq.{seconds},clues_used.eq.{clues_used},id.{op}.{row_id})")
+
+    def fetch_leaderboard(self, game_date, limit=100, after=None, before=None, max_clues=None,
+                          snapshot_id=None):
+        descending = before is not None and after is None
+        query = self._leaderboard_query(self.client.table("leaderboard").select("*"),
+                                        game_date, max_clues, snapshot_id)
+        if after is not None:
+            query = query.or_(self._keyset_filter(after, "gt"))
+        if before is not None:
+            query = query.or_(self._keyset_filter(before, "lt"))
+        result = query.order("solve_seconds", desc=descending) \
+                      .order("clues_used", desc=descending) \
+                      .order("id", desc=descending) \
+                      .limit(limit) \
+                      .execute()
+        rows = result.data or []
+        return rows[::-1] if descending else rows
+
+    def leaderboard_snapshot_id(self, game_date):
+        # Ids are handed out before commit, so max(id) alone could pin a
+        # snapshot that a lower id commits into later; see
+        # sql/leaderboard_keyset.sql.
+        result = self.client.rpc("leaderboard_snapshot_id", {"p_date": game_date}).execute()
+        return result.data or 0
+
+    def leaderboard_position(self, game_date, name, max_clues=None, snapshot_id=None):
+        query = self._leaderboard_query(self.client.table("leaderboard").select("*"),
+                                        game_date, max_clues, snapshot_id)
+        result = query.eq("name", name) \
+                      .order("solve_seconds").order("clues_used").order("id") \
+                      .limit(1) \
+                      .execute()
+        if not result.data:
+            return None
+        row = result.data[0]
+        ahead = self._leaderboard_query(self.client.table("leaderboard").select("id", count="exact", head=True),
+                                        game_date, max_clues, snapshot_id) \
+                    .or_(self._keyset_filter((row["solve_seconds"], row["clues_used"], row["id"]), "lt")) \
+                    .execute()
+        return row, (ahead.count or 0) + 1
+
+    def insert_leaderboard_entry(self, entry):
+        result = self.client.table("leaderboard").insert(entry).execute()
+        return result.data[0] if result.data else entry
+
+    def get_user(self, username, columns="*"):
+        result = self.client.table("users") \
+                            .select(columns) \
+                            .eq("username", username) \
+                            .limit(1) \
+                            .execute()
+        return result.data[0] if result.data else None
+
+    def get_x_ids(self, usernames):
+        if not usernames:
+            return {}
+        result = self.client.table("users") \
+                            .select("username, x_id") \
+                            .in_("username", list(usernames)) \
+                            .execute()
+        return {user["username"]: user.get("x_id") for user in (result.data or [])}
+
+    def create_user(self, user):
+        self.client.table("users").insert(user).execute()
+
+    def update_user(self, username, fields):
+        self.client.table("users").update(fields).eq("username", username).execute()
+
+    def delete_user(self, username):
+        self.client.table("users").delete().eq("username", username).execute()
+
+    def top_streaks(self, limit=5):
+        result = self.client.table("users") \
+                            .select("username, streak, x_id") \
+                            .order("streak", desc=True) \
+                            .limit(limit) \
+                            .execute()
+        return result.data or []
+
+    def iter_streaks(self, page_size=1000):
+        last_id = 0
+        while True:
+            result = self.client.table("users") \
+                                .select("id, username, streak, last_win_date") \
+                                .gt("streak", 0) \
+                                .gt("id", last_id) \
+                                .order("id", desc=False) \
+                                .limit(page_size) \
+                                .execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def reset_streaks(self, usernames, won_before):
+        if not usernames:
+            return []
+        result = self.client.table("users").update({"streak": 0}) \
+                                           .in_("username", list(usernames)) \
+                                           .or_(f"last_win_date.is.null,last_win_date.lt.{won_before}") \
+                                           .execute()
+        return [row["username"] for row in result.data or []]
+
+    def submit_score(self, name, solve_time, clues_used, date, win, game_date):
+        # One transactional round trip, see sql/submit_score.sql.
         try:
-            # Ensure the entry has all required fields
-            required_fields = {'name', 'solveTime', 'cluesUsed', 'date'}
-            if not all(field in entry for field in required_fields):
-                raise ValueError(f"Missing required fields. Entry must contain: {required_fields}")
-            
-            # Convert the entry to match database schema
-            db_entry = {
-                'name': entry['name'],
-                'solve_time': entry['solveTime'],
-                'clues_used': entry['cluesUsed'],
-                'date': entry['date'],
-                'x_profile': entry.get('xProfile'),  # Optional field
-                'timestamp': entry.get('timestamp', datetime.utcnow().isoformat() + "Z")
-            }
-            
-            # Insert the entry into Supabase
-            result = self.client.table('leaderboard').insert(db_entry).execute()
-            
-            if 'error' in result:
-                raise Exception(f"Failed to save entry: {result['error']}")
-                
-            return result.data[0]
-            
+            result = self.client.rpc("submit_score", {
+                "p_name": name,
+                "p_solve_time": str(solve_time),
+                "p_clues_used": clues_used,
+                "p_date": date,
+                "p_win": bool(win),
+                "p_game_date": game_date
+            }).execute()
         except Exception as e:
-            print(f"Error saving leaderboard entry: {str(e)}")
+            if "User not found" in str(e):
+                return None
             raise
-    
-    def fetch_leaderboard(self, date: Optional[str] = None) -> List[Dict]:
-        """
-        Fetch the leaderboard entries for a specific date, sorted by solve time and clues used.
-        
-        Args:
-            date (str, optional): The date to fetch entries for. Defaults to today.
-            
-        Returns:
-            list: List of leaderboard entries
-        """
+        return result.data
+
+    def flush_scores(self, entries, stats):
+        # One bulk insert and one stats RPC, see sql/score_queue.sql.
+        self.client.table("leaderboard") \
+                   .upsert(entries, on_conflict="submission_id", ignore_duplicates=True) \
+                   .execute()
+        self.client.rpc("apply_user_stats", {
+            "p_stats": [dict(user_stats, username=username) for username, user_stats in stats.items()]
+        }).execute()
+
+
+SQLITE_SCHEMA = """
+create table if not exists users (
+    id integer primary key autoincrement,
+    username text not null unique,
+    password text,
+    x_id text,
+    streak integer default 0,
+    last_win_date text,
+    last_played_date text,
+    days_played integer default 0,
+    total_wins integer default 0,
+    total_losses integer default 0,
+    longest_win_streak integer default 0,
+    created_at text
+);
+create index if not exists users_streak_idx on users (streak);
+create table if not exists daily_events (
+    id integer primary key autoincrement,
+    date text not null unique,
+    answer text,
+    alt_answers text,
+    clues text,
+    summary text,
+    year integer,
+    difficulty text,
+    category text,
+    clue_list text,
+    alt_answer_list text,
+    normalized_answers text
+);
+create table if not exists leaderboard (
+    id integer primary key autoincrement,
+    name text not null,
+    solve_time text,
+    clues_used integer,
+    date text not null,
+    timestamp text,
+    x_profile text,
+    submission_id text unique,
+    solve_seconds integer
+);
+"""
+
+# Created after the solve_seconds migration. SQLite appends the rowid (id)
+# to every index entry, so this serves the (solve_seconds, clues_used, id)
+# keyset pages.
+SQLITE_LEADERBOARD_INDEX = """
+drop index if exists leaderboard_date_idx;
+create index if not exists leaderboard_keyset_idx on leaderboard (date, solve_seconds, clues_used);
+"""
+
+
+# daily_events array columns (text[] in Postgres), stored as JSON in SQLite.
+EVENT_ARRAY_COLUMNS = ("clue_list", "alt_answer_list", "normalized_answers")
+
+
+class SQLiteBackend(Backend):
+    """
+    Local driver with the same tables and columns as the Supabase project,
+    so the whole game runs offline. The stats update uses the reference
+    implementation in utils/streaks.py inside one transaction.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get("HISTORLE_SQLITE_PATH", "historle.db")
+        self._local = threading.local()
+        self._conn().executescript(SQLITE_SCHEMA)
+        # Databases created before the array columns existed.
+        existing = {row["name"] for row in self._query("pragma table_info(daily_events)")}
+        for column in EVENT_ARRAY_COLUMNS:
+            if column not in existing:
+                self._conn().execute(f"alter table daily_events add column {column} text")
+        # Databases created before solve_seconds existed.
+        existing = {row["name"] for row in self._query("pragma table_info(leaderboard)")}
+        if "solve_seconds" not in existing:
+            self._conn().execute("alter table leaderboard add column solve_seconds integer")
+        rows = self._conn().execute("select id, solve_time from leaderboard where solve_seconds is null")
+        self._conn().executemany("update leaderboard set solve_seconds = ? where id = ?",
+                                 [(solve_seconds(solve_time), row_id) for row_id, solve_time in rows.fetchall()])
+        self._conn().executescript(SQLITE_LEADERBOARD_INDEX)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads or a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        return [dict(row) for row in self._conn().execute(sql, params).fetchall()]
+
+    def _insert(self, table: str, row: Dict, or_ignore: bool = False) -> Optional[int]:
+        columns = parse_columns(", ".join(row))
+        verb = "insert or ignore" if or_ignore else "insert"
+        cursor = self._conn().execute(
+            f"{verb} into {table} ({', '.join(columns)}) values ({', '.join('?' for _ in columns)})",
+            [row[c] for c in columns]
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def _insert_score(self, entry: Dict, or_ignore: bool = False) -> Optional[int]:
+        # Postgres computes solve_seconds itself (a generated column).
+        return self._insert("leaderboard", dict(entry, solve_seconds=solve_seconds(entry.get("solve_time"))),
+                            or_ignore=or_ignore)
+
+    def get_event(self, game_date):
+        rows = self._query("select * from daily_events where date = ? limit 1", (game_date,))
+        if not rows:
+            return None
+        event = rows[0]
+        for column in EVENT_ARRAY_COLUMNS:
+            if event.get(column) is not None:
+                event[column] = json.loads(event[column])
+        return event
+
+    def event_dates(self, dates):
+        if not dates:
+            return []
+        placeholders = ", ".join("?" for _ in dates)
+        rows = self._query(f"select date from daily_events where date in ({placeholders})", list(dates))
+        return [row["date"] for row in rows]
+
+    def upsert_events(self, events):
+        if not events:
+            return
+        columns = parse_columns(", ".join(events[0]))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "date")
+        sql = (f"insert into daily_events ({', '.join(columns)}) values ({', '.join('?' for _ in columns)}) "
+               f"on conflict (date) do update set {updates}")
+        rows = [[json.dumps(event.get(c)) if c in EVENT_ARRAY_COLUMNS and event.get(c) is not None
+                 else event.get(c) for c in columns] for event in events]
+        conn = self._conn()
+        conn.execute("begin immediate")
         try:
-            if not date:
-                date = datetime.now().strftime('%Y-%m-%d')
-            
-            # Query Supabase with sorting and filtering
-            result = self.client.table('leaderboard')\
-                .select('*')\
-                .eq('date', date)\
-                .order('solve_time', desc=False)\
-                .order('clues_used', desc=False)\
-                .limit(100)\
-                .execute()
-            
-            if 'error' in result:
-                raise Exception(f"Failed to fetch leaderboard: {result['error']}")
-            
-            # Convert database format back to application format
-            entries = []
-            for entry in result.data:
-                app_entry = {
-                    'name': entry['name'],
-                    'solveTime': entry['solve_time'],
-                    'cluesUsed': entry['clues_used'],
-                    'date': entry['date'],
-                    'timestamp': entry['timestamp']
-                }
-                
-                if entry.get('x_profile'):
-                    app_entry['xProfile'] = entry['x_profile']
-                
-                entries.append(app_entry)
-            
-            return entries
-            
-        except Exception as e:
-            print(f"Error fetching leaderboard: {str(e)}")
+            conn.executemany(sql, rows)
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+
+    def iter_leaderboard(self, game_date, page_size=1000):
+        last_id = 0
+        while True:
+            rows = self._query(
+                "select * from leaderboard where date = ? and id > ? order by id limit ?",
+                (game_date, last_id, page_size)
+            )
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def _leaderboard_filters(game_date, max_clues, snapshot_id):
+        where, params = ["date = ?"], [game_date]
+        if max_clues is not None:
+            where.append("clues_used <= ?")
+            params.append(max_clues)
+        if snapshot_id is not None:
+            where.append("id <= ?")
+            params.append(snapshot_id)
+        return where, params
+
+    def fetch_leaderboard(self, game_date, limit=100, after=None, before=None, max_clues=None,
+                          snapshot_id=None):
+        where, params = self._leaderboard_filters(game_date, max_clues, snapshot_id)
+        if after is not None:
+            where.append("(solve_seconds, clues_used, id) > (?, ?, ?)")
+            params += list(after)
+        if before is not None:
+            where.append("(solve_seconds, clues_used, id) < (?, ?, ?)")
+            params += list(before)
+        descending = before is not None and after is None
+        order = "desc" if descending else "asc"
+        rows = self._query(
+            f"select * from leaderboard where {' and '.join(where)} "
+            f"order by solve_seconds {order}, clues_used {order}, id {order} limit ?",
+            params + [limit]
+        )
+        return rows[::-1] if descending else rows
+
+    def leaderboard_snapshot_id(self, game_date):
+        # One writer at a time, and ids are assigned inside its transaction,
+        # so they commit in order and max(id) is exact.
+        rows = self._query("select max(id) as id from leaderboard where date = ?", (game_date,))
+        return rows[0]["id"] or 0
+
+    def leaderboard_position(self, game_date, name, max_clues=None, snapshot_id=None):
+        where, params = self._leaderboard_filters(game_date, max_clues, snapshot_id)
+        rows = self._query(
+            f"select * from leaderboard where {' and '.join(where)} and name = ? "
+            "order by solve_seconds, clues_used, id limit 1",
+            params + [name]
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        ahead = self._query(
+            f"select count(*) as n from leaderboard where {' and '.join(where)} "
+            "and (solve_seconds, clues_used, id) < (?, ?, ?)",
+            params + [row["solve_seconds"], row["clues_used"], row["id"]]
+        )
+        return row, ahead[0]["n"] + 1
+
+    def insert_leaderboard_entry(self, entry):
+        row_id = self._insert_score(entry)
+        return dict(entry, id=row_id, solve_seconds=solve_seconds(entry.get("solve_time")))
+
+    def get_user(self, username, columns="*"):
+        rows = self._query(
+            f"select {', '.join(parse_columns(columns))} from users where username = ? limit 1",
+            (username,)
+        )
+        return rows[0] if rows else None
+
+    def get_x_ids(self, usernames):
+        usernames = list(usernames)
+        if not usernames:
+            return {}
+        rows = self._query(
+            f"select username, x_id from users where username in ({', '.join('?' for _ in usernames)})",
+            usernames
+        )
+        return {row["username"]: row["x_id"] for row in rows}
+
+    def create_user(self, user):
+        self._insert("users", user)
+
+    def update_user(self, username, fields):
+        columns = parse_columns(", ".join(fields))
+        self._conn().execute(
+            f"update users set {', '.join(c + ' = ?' for c in columns)} where username = ?",
+            [fields[c] for c in columns] + [username]
+        )
+
+    def delete_user(self, username):
+        self._conn().execute("delete from users where username = ?", (username,))
+
+    def top_streaks(self, limit=5):
+        return self._query(
+            "select username, streak, x_id from users order by streak desc limit ?", (limit,)
+        )
+
+    def iter_streaks(self, page_size=1000):
+        last_id = 0
+        while True:
+            rows = self._query(
+                "select id, username, streak, last_win_date from users "
+                "where streak > 0 and id > ? order by id limit ?",
+                (last_id, page_size)
+            )
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def reset_streaks(self, usernames, won_before):
+        usernames = list(usernames)
+        if not usernames:
+            return []
+        where = (f"username in ({', '.join('?' for _ in usernames)}) "
+                 "and (last_win_date is null or last_win_date < ?)")
+        conn = self._conn()
+        conn.execute("begin immediate")
+        try:
+            reset = [row[0] for row in conn.execute(f"select username from users where {where}",
+                                                    usernames + [won_before])]
+            conn.execute(f"update users set streak = 0 where {where}", usernames + [won_before])
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+        return reset
+
+    def submit_score(self, name, solve_time, clues_used, date, win, game_date):
+        conn = self._conn()
+        # "begin immediate" takes the write lock up front, like FOR UPDATE.
+        conn.execute("begin immediate")
+        try:
+            user = self.get_user(name)
+            if not user:
+                conn.execute("rollback")
+                return None
+            entry = {
+                "name": name,
+                "solve_time": str(solve_time),
+                "clues_used": clues_used,
+                "date": date,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+            entry["id"] = self._insert_score(entry)
+            entry["solve_seconds"] = solve_seconds(entry["solve_time"])
+            stats = apply_result(user, bool(win), game_date)
+            self.update_user(name, stats)
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+        return dict(stats, entry=entry)
+
+    def flush_scores(self, entries, stats):
+        conn = self._conn()
+        conn.execute("begin immediate")
+        try:
+            for entry in entries:
+                self._insert_score(entry, or_ignore=True)
+            for username, user_stats in stats.items():
+                self.update_user(username, user_stats)
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
             raise
 
-# Create a singleton instance
-db = Database()
 
-# Export functions for easier imports
-save_leaderboard_entry = db.save_leaderboard_entry
-fetch_leaderboard = db.fetch_leaderboard 
\ No newline at end of file
+class SimulatedLatencyBackend(Backend):
+    """
+    Wraps another backend, sleeping before every call to stand in for
+    network round trips and counting calls (overall and per thread).
+    Enabled with HISTORLE_BACKEND_LATENCY_MS for load tests and benchmarks.
+    """
+
+    def __init__(self, inner: Backend, latency: float):
+        self.inner = inner
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def thread_calls(self) -> int:
+        """Calls made so far from the current thread."""
+        return getattr(self._local, "calls", 0)
+
+    def __getattribute__(self, name):
+        attr = object.__getattribute__(self, name)
+        if name.startswith("_") or not hasattr(Backend, name) or not callable(attr):
+            return attr
+        inner_method = getattr(object.__getattribute__(self, "inner"), name)
+
+        def call(*args, **kwargs):
+            with self._lock:
+                self.calls += 1
+            self._local.calls = getattr(self._local, "calls", 0) + 1
+            time.sleep(self.latency)
+            return inner_method(*args, **kwargs)
+        return call
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+# Table (or RPC) each Backend method talks to, for instrumentation.
+METHOD_TABLES = {
+    "get_event": "daily_events",
+    "event_dates": "daily_events",
+    "upsert_events": "daily_events",
+    "iter_leaderboard": "leaderboard",
+    "fetch_leaderboard": "leaderboard",
+    "leaderboard_snapshot_id": "leaderboard",
+    "leaderboard_position": "leaderboard",
+    "insert_leaderboard_entry": "leaderboard",
+    "get_user": "users",
+    "get_x_ids": "users",
+    "create_user": "users",
+    "update_user": "users",
+    "delete_user": "users",
+    "top_streaks": "users",
+    "iter_streaks": "users",
+    "reset_streaks": "users",
+    "submit_score": "rpc:submit_score",
+    "flush_scores": "rpc:apply_user_stats",
+}
+
+BACKENDS = {
+    "supabase": SupabaseBackend,
+    "sqlite": SQLiteBackend,
+}
+
+_backend: Optional[Backend] = None
+_backend_lock = threading.Lock()
+_wrappers = []
+
+
+def add_backend_wrapper(wrapper):
+    """
+    Register a callable (backend -> backend) applied when the backend is
+    created, e.g. for instrumentation. Must be called before first use.
+    """
+    _wrappers.append(wrapper)
+
+
+def load_environment():
+    """
+    Load the first .env file found into os.environ (development only).
+    Runs once; python-dotenv is only imported when there is a file.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    for path in ENV_FILES:
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+
+
+def backend_class() -> type:
+    """The Backend subclass named by HISTORLE_BACKEND (default: supabase)."""
+    load_environment()
+    name = os.environ.get("HISTORLE_BACKEND", "supabase")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HISTORLE_BACKEND {name!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def warm_backend():
+    """Import the configured backend's client library without creating a client."""
+    backend_class().warm()
+
+
+def get_backend() -> Backend:
+    """The process-wide backend chosen by HISTORLE_BACKEND (default: supabase)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = backend_class()()
+                latency_ms = float(os.environ.get("HISTORLE_BACKEND_LATENCY_MS", "0"))
+                if latency_ms > 0:
+                    backend = SimulatedLatencyBackend(backend, latency_ms / 1000)
+                for wrapper in _wrappers:
+                    backend = wrapper(backend)
+                _backend = backend
+    return _backend
+
+
+def set_backend(backend: Optional[Backend]):
+    """Replace the process-wide backend (load tests, benchmarks)."""
+    global _backend
+    _backend = backend
+
+
+class _BackendProxy:
+    """
+    Module-level handle for the backend. Methods are looked up when they
+    are called, so importing `db` (or passing `db.get_event` around) never
+    creates a client.
+    """
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            return getattr(get_backend(), name)(*args, **kwargs)
+        call.__name__ = name
+        return call
+
+
+db = _BackendProxy()
+
+
+def save_leaderboard_entry(entry: Dict) -> Dict:
+    """
+    Save a new leaderboard entry.
+
+    Args:
+        entry (dict): the row to insert (name, solve_time, clues_used, date, ...)
+
+    Returns:
+        dict: The saved entry with its database ID
+    """
+    entry = dict(entry)
+    entry.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+    return db.insert_leaderboard_entry(entry)
+
+
+def fetch_leaderboard(date: Optional[str] = None, limit: int = 100, after: Optional[Tuple] = None) -> List[Dict]:
+    """
+    Fetch the leaderboard entries for a specific date, sorted by solve time, clues used and id.
+
+    Args:
+        date (str, optional): The date to fetch entries for. Defaults to today.
+        limit (int): Page size.
+        after (tuple, optional): (solve_seconds, clues_used, id) of the last row of
+            the previous page; the next page starts right after it.
+
+    Returns:
+        list: List of leaderboard entries
+    """
+    if not date:
+        date = datetime.now().strftime('%Y-%m-%d')
+    return db.fetch_leaderboard(date, limit, after=after)
@@ -0,0 +1,265 @@
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from utils.answer_matcher import AnswerMatcher
+from utils.game_clock import game_day_end, next_game_date, previous_game_date
+from utils.shared_cache import SharedCache
+
+# How long a "no event for this date" answer is remembered before we ask the
+# database again (editors sometimes add the event late).
+MISSING_EVENT_TTL = 60
+
+# Start loading tomorrow's event this many seconds before the cutoff.
+PREWARM_SECONDS = 300
+
+# Past events kept parsed per process for archive play (least recently
+# played dropped first), and how many days either side of an opened date
+# are loaded in the background.
+ARCHIVE_CACHE_SIZE = int(os.environ.get("ARCHIVE_CACHE_SIZE", "256"))
+ARCHIVE_PREFETCH_DAYS = int(os.environ.get("ARCHIVE_PREFETCH_DAYS", "1"))
+
+# Raw past events are also shared between workers for this long, so each
+# date is read from the database about once a day per host.
+ARCHIVE_SHARED_TTL = 24 * 3600
+
+# Shared marker file touched by refresh() so every worker drops its copy.
+REFRESH_STAMP_PATH = os.environ.get(
+    "EVENT_REFRESH_STAMP",
+    os.path.join(tempfile.gettempdir(), "historle-event-refresh")
+)
+
+
+def split_field(value) -> List[str]:
+    """Turn a semicolon-separated string (or an existing list) into a clean list."""
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(";") if v.strip()]
+    return [v.strip() for v in (value or []) if v and v.strip()]
+
+
+def parse_event(raw: Dict) -> Dict:
+    """
+    Convert a daily_events row into the event dict used by the routes.
+    'alt_answers' and 'clues' become lists and the accepted answers are
+    compiled into an AnswerMatcher so the guess endpoint never has to
+    normalise them per request.
+
+    Rows written by `flask import-events` already carry the lists and the
+    normalised answers (clue_list, alt_answer_list, normalized_answers)
+    and are used as they are; older rows have their strings parsed.
+    """
+    event = dict(raw)
+    if raw.get("clue_list") is not None and raw.get("normalized_answers") is not None:
+        event["clues"] = raw["clue_list"]
+        event["alt_answers"] = raw.get("alt_answer_list") or []
+        event["matcher"] = AnswerMatcher.from_normalized(raw["normalized_answers"])
+        return event
+    event["alt_answers"] = split_field(event.get("alt_answers"))
+    event["clues"] = split_field(event.get("clues"))
+    event["matcher"] = AnswerMatcher([event.get("answer") or ""] + event["alt_answers"])
+    return event
+
+
+class EventCache:
+    """
+    In-process store of parsed daily events, keyed by game date.
+
+    Each date is loaded from the backend once and kept until the end of its
+    game day. Missing events are remembered briefly, backend errors are not
+    cached at all. Shortly before the cutoff the next day's event is loaded
+    on a background thread so the rollover doesn't stampede the database.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Dict]],
+                 prewarm_seconds: int = PREWARM_SECONDS,
+                 stamp_path: str = REFRESH_STAMP_PATH):
+        self._loader = loader
+        self._prewarm_seconds = prewarm_seconds
+        self._stamp_path = stamp_path
+        self._entries: Dict[str, tuple] = {}  # date -> (event, expires_at)
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._prewarming = set()
+        self._stamp_seen = self._read_stamp()
+        self._stamp_checked = time.time()
+
+    def get(self, game_date: str) -> Optional[Dict]:
+        """Return the parsed event for game_date, loading it on first use."""
+        now = time.time()
+        self._check_refresh_stamp(now)
+        entry = self._entries.get(game_date)
+        if entry is None or entry[1] <= now:
+            entry = self._load(game_date)
+            if entry is None:
+                return None
+        # A missing event is only remembered briefly; don't prewarm off it.
+        if entry[0] is not None and entry[1] - now <= self._prewarm_seconds:
+            self._maybe_prewarm(next_game_date(game_date))
+        return entry[0]
+
+    def cached(self, game_date: str) -> Optional[Dict]:
+        """The event if it is already loaded and fresh; never touches the backend."""
+        entry = self._entries.get(game_date)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+        return None
+
+    def refresh(self, game_date: Optional[str] = None):
+        """
+        Drop cached events (one date or all of them) in this process and
+        signal the other workers to do the same.
+        """
+        with self._lock:
+            if game_date:
+                self._entries.pop(game_date, None)
+            else:
+                self._entries.clear()
+        try:
+            with open(self._stamp_path, "a"):
+                os.utime(self._stamp_path, None)
+        except OSError as e:
+            print("Error touching event refresh stamp:", e)
+        self._stamp_seen = self._read_stamp()
+
+    def prewarm(self, game_date: str):
+        """Load game_date into the cache if it isn't there already."""
+        entry = self._entries.get(game_date)
+        if entry is None or entry[1] <= time.time():
+            self._load(game_date)
+
+    def _load(self, game_date: str) -> Optional[tuple]:
+        with self._lock:
+            load_lock = self._load_locks.setdefault(game_date, threading.Lock())
+        # Only one thread per date goes to the backend; the rest wait for it.
+        with load_lock:
+            now = time.time()
+            entry = self._entries.get(game_date)
+            if entry is not None and entry[1] > now:
+                return entry
+            try:
+                raw = self._loader(game_date)
+            except Exception as e:
+                print("Error fetching event from backend:", e)
+                return None
+            if raw:
+                entry = (parse_event(raw), self._expires_at(game_date))
+            else:
+                entry = (None, now + MISSING_EVENT_TTL)
+            with self._lock:
+                self._entries[game_date] = entry
+                self._prune(now)
+            return entry
+
+    def _expires_at(self, game_date: str) -> float:
+        return game_day_end(game_date)
+
+    def _prune(self, now: float):
+        for key in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+            self._load_locks.pop(key, None)
+
+    def _maybe_prewarm(self, game_date: str):
+        with self._lock:
+            entry = self._entries.get(game_date)
+            if (entry is not None and entry[1] > time.time()) or game_date in self._prewarming:
+                return
+            self._prewarming.add(game_date)
+
+        def run():
+            try:
+                self.prewarm(game_date)
+            finally:
+                with self._lock:
+                    self._prewarming.discard(game_date)
+
+        threading.Thread(target=run, name=f"prewarm-{game_date}", daemon=True).start()
+
+    def _read_stamp(self) -> float:
+        try:
+            return os.stat(self._stamp_path).st_mtime
+        except OSError:
+            return 0.0
+
+    def _check_refresh_stamp(self, now: float):
+        # At most one stat() per second, not one per request.
+        if now - self._stamp_checked < 1:
+            return
+        self._stamp_checked = now
+        stamp = self._read_stamp()
+        if stamp != self._stamp_seen:
+            self._stamp_seen = stamp
+            with self._lock:
+                self._entries.clear()
+
+
+class ArchiveCache(EventCache):
+    """
+    Parsed past events, with their compiled matchers, for archive play.
+
+    A past event doesn't change, so entries never expire; beyond `maxsize`
+    the least recently played date is dropped. Raw rows also go through a
+    SharedCache, so a date one worker has read is a file read for the
+    others. Opening a date loads the `prefetch_days` dates either side of
+    it on background threads (archived dates only), so stepping through
+    the archive finds the next game already parsed. refresh() on either
+    cache, or the admin refresh endpoint, clears this one too.
+
+    Only dates before yesterday are archived: yesterday's game still
+    counts for the leaderboard and streaks across the cutoff, so it can't
+    be replayed from here.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Dict]], today: Callable[[], str],
+                 maxsize: int = ARCHIVE_CACHE_SIZE, prefetch_days: int = ARCHIVE_PREFETCH_DAYS,
+                 shared: Optional[SharedCache] = None, stamp_path: str = REFRESH_STAMP_PATH):
+        super().__init__(self._load_shared, prewarm_seconds=0, stamp_path=stamp_path)
+        self._backend_loader = loader
+        self._today = today
+        self.maxsize = maxsize
+        self.prefetch_days = prefetch_days
+        self._shared = shared or SharedCache(ttl=ARCHIVE_SHARED_TTL)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, game_date: str) -> Optional[Dict]:
+        event = super().get(game_date)
+        with self._lock:
+            if game_date in self._entries:
+                self._entries.move_to_end(game_date)
+        if event is not None:
+            for neighbour in self._neighbours(game_date):
+                self._maybe_prewarm(neighbour)
+        return event
+
+    def is_archived(self, game_date: str) -> bool:
+        """Whether game_date can be played in the archive: before yesterday's game."""
+        return game_date < previous_game_date(self._today())
+
+    def _neighbours(self, game_date: str) -> List[str]:
+        dates, before, after = [], game_date, game_date
+        for _ in range(self.prefetch_days):
+            before, after = previous_game_date(before), next_game_date(after)
+            dates.append(before)
+            if self.is_archived(after):
+                dates.append(after)
+        return dates
+
+    def _load_shared(self, game_date: str) -> Optional[Dict]:
+        key = f"archive-event:{self._stamp_seen}:{game_date}"
+        raw = self._shared.get(key)
+        if raw is None:
+            raw = self._backend_loader(game_date)
+            if raw:
+                self._shared.set(key, raw)
+        return raw
+
+    def _expires_at(self, game_date: str) -> float:
+        return float("inf")
+
+    def _prune(self, now: float):
+        super()._prune(now)
+        while len(self._entries) > self.maxsize:
+            game_date, _ = self._entries.popitem(last=False)
+            self._load_locks.pop(game_date, None)
@@ -0,0 +1,176 @@
+import csv
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from utils.answer_matcher import AnswerMatcher, normalize_answer
+
+# Columns accepted in import files; anything else is reported and ignored.
+EVENT_FIELDS = ("date", "answer", "alt_answers", "clues", "summary", "year", "difficulty", "category")
+
+# Rows per upsert statement.
+IMPORT_BATCH_SIZE = 100
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def read_events(path: str, fmt: str = "auto") -> List[Dict]:
+    """
+    Records from a CSV file (one event per row, header line required) or a
+    JSON file (a list of objects, or {"events": [...]}). List fields may be
+    JSON arrays or semicolon-separated strings in either format.
+    """
+    if fmt == "auto":
+        fmt = "json" if os.path.splitext(path)[1].lower() == ".json" else "csv"
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            return list(csv.DictReader(f))
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("events")
+    if not isinstance(data, list) or not all(isinstance(record, dict) for record in data):
+        raise ValueError("JSON import must be a list of event objects or {\"events\": [...]}")
+    return data
+
+
+def _list_field(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            try:
+                value = json.loads(text)
+            except ValueError:
+                return [text]
+        else:
+            return [part.strip() for part in text.split(";")]
+    if not isinstance(value, list):
+        return [str(value).strip()]
+    return [str(item).strip() for item in value]
+
+
+def _text_field(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def build_event_row(record: Dict) -> Tuple[Dict, List[str], List[str]]:
+    """
+    One daily_events row from an import record, with its errors and warnings.
+
+    The row keeps the semicolon-joined clues/alt_answers columns for
+    readers that still parse them and adds the native lists plus the
+    normalised answer set the app loads directly.
+    """
+    errors, warnings = [], []
+    game_date = _text_field(record.get("date")) or ""
+    if not _DATE.match(game_date):
+        errors.append(f"date {game_date!r} is not YYYY-MM-DD")
+    else:
+        try:
+            datetime.strptime(game_date, "%Y-%m-%d")
+        except ValueError:
+            errors.append(f"date {game_date!r} does not exist")
+
+    unknown = sorted(set(record) - set(EVENT_FIELDS))
+    if unknown:
+        warnings.append(f"ignored columns: {', '.join(unknown)}")
+
+    answer = _text_field(record.get("answer"))
+    if not answer:
+        errors.append("answer is empty")
+    elif not normalize_answer(answer):
+        errors.append(f"answer {answer!r} has no letters or digits")
+
+    clues = _list_field(record.get("clues"))
+    if not clues:
+        errors.append("no clues")
+    elif any(not clue for clue in clues):
+        errors.append(f"clue {[i + 1 for i, clue in enumerate(clues) if not clue]} is empty")
+
+    alt_answers = [alt for alt in _list_field(record.get("alt_answers")) if alt]
+    for alt in alt_answers:
+        if not normalize_answer(alt):
+            errors.append(f"alt answer {alt!r} has no letters or digits")
+    for value in clues + alt_answers:
+        if ";" in value:
+            errors.append(f"{value[:30]!r} contains ';', which the joined clues/alt_answers columns can't hold")
+
+    normalized = AnswerMatcher([answer or ""] + alt_answers).choices
+    if answer and len(normalized) < 1 + len(alt_answers):
+        warnings.append("alt answers that normalise to the same text as another answer were dropped")
+
+    year = record.get("year")
+    if year in (None, ""):
+        year = None
+    else:
+        try:
+            year = int(str(year).strip())
+        except ValueError:
+            errors.append(f"year {year!r} is not a whole number")
+            year = None
+
+    row = {
+        "date": game_date,
+        "answer": answer,
+        "alt_answers": ";".join(alt_answers),
+        "clues": ";".join(clues),
+        "summary": _text_field(record.get("summary")),
+        "year": year,
+        "difficulty": _text_field(record.get("difficulty")),
+        "category": _text_field(record.get("category")),
+        "clue_list": clues,
+        "alt_answer_list": alt_answers,
+        "normalized_answers": normalized,
+    }
+    return row, errors, warnings
+
+
+def validate_events(records: Iterable[Dict]) -> Tuple[List[Dict], List[str], List[str]]:
+    """
+    (rows, errors, warnings) for a whole import. Besides each record's own
+    checks: a date may appear only once, and two events may not share an
+    official answer. Other answers shared between events are warnings,
+    since the same guess would then be accepted on both days.
+    """
+    rows, errors, warnings = [], [], []
+    first_line: Dict[str, int] = {}
+    official: Dict[str, str] = {}
+    accepted: Dict[str, str] = {}
+    for line, record in enumerate(records, start=1):
+        row, row_errors, row_warnings = build_event_row(record)
+        label = f"record {line} ({row['date'] or 'no date'})"
+        errors += [f"{label}: {message}" for message in row_errors]
+        warnings += [f"{label}: {message}" for message in row_warnings]
+        if row["date"] in first_line:
+            errors.append(f"{label}: duplicate date, first used by record {first_line[row['date']]}")
+        else:
+            first_line[row["date"]] = line
+        if row["normalized_answers"] and row["answer"]:
+            main = row["normalized_answers"][0]
+            if main in official:
+                errors.append(f"{label}: answer {row['answer']!r} is also the answer on {official[main]}")
+            else:
+                official[main] = row["date"]
+            for choice in row["normalized_answers"]:
+                other = accepted.setdefault(choice, row["date"])
+                # A shared official answer is already an error above.
+                if other != row["date"] and official.get(choice) != other:
+                    warnings.append(f"{label}: {choice!r} is also accepted on {other}")
+        rows.append(row)
+    return rows, errors, warnings
+
+
+def import_events(rows: List[Dict], backend, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """Upsert validated rows in batches; returns how many were new and how many replaced."""
+    existing = set()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        existing.update(backend.event_dates([row["date"] for row in batch]))
+        backend.upsert_events(batch)
+    return {"imported": len(rows), "new": len(rows) - len(existing), "replaced": len(existing)}
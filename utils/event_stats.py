@@ -0,0 +1,99 @@
+import bisect
+from typing import Dict, List, Optional
+
+# Upper edges (seconds, exclusive) of the solve-time buckets: 15s steps for
+# the first five minutes, then minutes up to a quarter hour, then five
+# minutes up to an hour. Anything slower lands in one open-ended bucket.
+SOLVE_TIME_EDGES = tuple(range(15, 301, 15)) + tuple(range(360, 901, 60)) + tuple(range(1200, 3601, 300))
+
+# Solve times this long or more are unparseable placeholders (see
+# leaderboard.solve_seconds) and are left out of the time histogram.
+UNTIMED = 1 << 31
+
+# Percentiles reported for the solve times.
+PERCENTILES = (25, 50, 75, 90)
+
+
+class SolveStats:
+    """
+    Running aggregates for one game date: players, solves, losses, a
+    histogram of clues used and a fixed-bucket histogram of solve times.
+
+    add() is O(1) in the number of rows (a bisect over the fixed edges), so
+    the counts can be kept current on every submission and read without
+    touching the table. Percentiles are interpolated within their bucket,
+    which is exact to a few seconds for the times players actually take.
+    A row with more than max_clues clues is a loss; its time is not counted.
+    """
+
+    def __init__(self, max_clues: int, edges=SOLVE_TIME_EDGES):
+        self.max_clues = max_clues
+        self.edges = edges
+        self.players = 0
+        self.lost = 0
+        self.clues = [0] * (max_clues + 1)  # index = clues_used, for solves
+        self.timed = 0
+        self.times = [0] * (len(edges) + 1)
+        self.time_total = 0
+        self.fastest: Optional[int] = None
+        self.slowest: Optional[int] = None
+
+    @property
+    def solved(self) -> int:
+        return self.players - self.lost
+
+    def add(self, clues_used: int, seconds: Optional[int]):
+        self.players += 1
+        if clues_used > self.max_clues:
+            self.lost += 1
+            return
+        self.clues[max(clues_used, 0)] += 1
+        if seconds is None or not 0 <= seconds < UNTIMED:
+            return
+        self.timed += 1
+        self.times[bisect.bisect_right(self.edges, seconds)] += 1
+        self.time_total += seconds
+        if self.fastest is None or seconds < self.fastest:
+            self.fastest = seconds
+        if self.slowest is None or seconds > self.slowest:
+            self.slowest = seconds
+
+    def percentile(self, pct: float) -> Optional[int]:
+        """Solve time (seconds) below which pct percent of solves fall, or None with no solves."""
+        if not self.timed:
+            return None
+        rank = pct / 100 * self.timed
+        seen = 0
+        for index, count in enumerate(self.times):
+            if count and seen + count >= rank:
+                low = self.edges[index - 1] if index else 0
+                high = self.edges[index] if index < len(self.edges) else self.slowest
+                value = low + (high - low) * (rank - seen) / count
+                return int(round(min(max(value, self.fastest), self.slowest)))
+            seen += count
+        return self.slowest
+
+    def as_dict(self) -> Dict:
+        solved = self.solved
+        buckets: List[Dict] = []
+        for index, count in enumerate(self.times):
+            if count:
+                buckets.append({
+                    "from": self.edges[index - 1] if index else 0,
+                    "to": self.edges[index] if index < len(self.edges) else None,
+                    "count": count
+                })
+        return {
+            "players": self.players,
+            "solved": solved,
+            "lost": self.lost,
+            "solve_rate": round(100 * solved / self.players, 1) if self.players else None,
+            "clues_used": {str(clues): count for clues, count in enumerate(self.clues) if clues or count},
+            "solve_time": {
+                "buckets": buckets,
+                "percentiles": {f"p{pct}": self.percentile(pct) for pct in PERCENTILES},
+                "mean": round(self.time_total / self.timed) if self.timed else None,
+                "fastest": self.fastest,
+                "slowest": self.slowest
+            }
+        }
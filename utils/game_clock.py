@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+import pytz
+
+from utils.shared_cache import CACHE_DIR
+
+# All game days roll over on Eastern Time (DST-aware).
+GAME_TIMEZONE = pytz.timezone("America/New_York")
+
+# Hour (Eastern) at which a new game day starts: 0 is midnight, 20 is 8pm.
+# Game date D runs from D at this hour until D+1 at this hour.
+GAME_CUTOFF_HOUR = int(os.environ.get("GAME_CUTOFF_HOUR", "0"))
+
+# The rollover thread re-checks at least this often, so a suspended host
+# or a clock jump never delays the hooks by more than this.
+MAX_SLEEP = 60
+
+
+def game_day_start(game_date: str, cutoff_hour: int = GAME_CUTOFF_HOUR) -> float:
+    """Epoch timestamp at which game_date becomes the current game date."""
+    day = datetime.strptime(game_date, "%Y-%m-%d").replace(hour=cutoff_hour)
+    return GAME_TIMEZONE.localize(day).timestamp()
+
+
+def game_day_end(game_date: str, cutoff_hour: int = GAME_CUTOFF_HOUR) -> float:
+    """Epoch timestamp at which the given game date stops being the current one."""
+    return game_day_start(next_game_date(game_date), cutoff_hour)
+
+
+def next_game_date(game_date: str) -> str:
+    day = datetime.strptime(game_date, "%Y-%m-%d") + timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+def previous_game_date(game_date: str) -> str:
+    day = datetime.strptime(game_date, "%Y-%m-%d") - timedelta(days=1)
+    return day.strftime("%Y-%m-%d")
+
+
+def game_date_at(timestamp: float, cutoff_hour: int = GAME_CUTOFF_HOUR) -> str:
+    """The game date current at the given epoch timestamp."""
+    local = datetime.fromtimestamp(timestamp, GAME_TIMEZONE)
+    return (local - timedelta(hours=cutoff_hour)).strftime("%Y-%m-%d")
+
+
+class GameClock:
+    """
+    The current game date, with the day's boundaries precomputed as epoch
+    timestamps: today() is one comparison against the cached window until
+    the cutoff passes.
+
+    Functions registered with on_rollover(fn) are called as fn(previous,
+    current) on a background thread when the game date changes. Hooks
+    registered with once=True run in only one process per rollover (the
+    first to claim a marker file in the shared cache directory); the
+    others run in every worker. The thread starts with the first today()
+    call in each process, so a gunicorn --preload master, which never
+    serves, never runs hooks. `clock` returns epoch seconds and can be
+    replaced in tests, which then drive the hooks with tick().
+    """
+
+    def __init__(self, cutoff_hour: int = GAME_CUTOFF_HOUR, clock: Callable[[], float] = time.time,
+                 directory: str = CACHE_DIR):
+        self.cutoff_hour = cutoff_hour
+        self.clock = clock
+        self.directory = directory
+        # (starts, ends, game_date) of the current game day.
+        self._window: Tuple[float, float, str] = (0.0, 0.0, "")
+        self._hooks: List[Tuple[Callable[[str, str], None], bool]] = []
+        self._hooked_date: Optional[str] = None
+        self._tick_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid = None
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        # Threads don't survive a fork; recompute (and restart) in the child.
+        os.register_at_fork(after_in_child=self._forget_window)
+
+    def today(self) -> str:
+        """The current game date, 'YYYY-MM-DD'."""
+        starts, ends, game_date = self._window
+        now = self.clock()
+        if starts <= now < ends:
+            return game_date
+        return self._recompute(now)[2]
+
+    def rollover_at(self) -> float:
+        """Epoch timestamp of the next cutoff."""
+        self.today()
+        return self._window[1]
+
+    def seconds_until_rollover(self) -> float:
+        return max(0.0, self.rollover_at() - self.clock())
+
+    def on_rollover(self, hook: Callable[[str, str], None], once: bool = False):
+        """Run hook(previous_date, new_date) whenever the game date changes."""
+        self._hooks.append((hook, once))
+
+    def tick(self) -> bool:
+        """Run the hooks if the game date changed since the last tick."""
+        with self._tick_lock:
+            current = self.today()
+            previous = self._hooked_date
+            if previous is None or previous == current:
+                self._hooked_date = current
+                return False
+            self._hooked_date = current
+            for hook, once in self._hooks:
+                if once and not self._claim(hook, current):
+                    continue
+                try:
+                    hook(previous, current)
+                except Exception as e:
+                    print(f"Rollover hook {getattr(hook, '__name__', hook)} failed:", e)
+            return True
+
+    def _recompute(self, now: float) -> Tuple[float, float, str]:
+        game_date = game_date_at(now, self.cutoff_hour)
+        window = (game_day_start(game_date, self.cutoff_hour), game_day_end(game_date, self.cutoff_hour),
+                  game_date)
+        self._window = window
+        if self._hooks:
+            if self._hooked_date is None:
+                self._hooked_date = game_date
+            self._ensure_thread()
+        return window
+
+    def _forget_window(self):
+        self._window = (0.0, 0.0, "")
+        self._thread = None
+
+    def _claim(self, hook, game_date: str) -> bool:
+        # The first process to create the marker runs the hook for this date.
+        name = getattr(hook, "__name__", "hook")
+        path = os.path.join(self.directory, f"rollover-{game_date}-{name}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            return False
+        except OSError as e:
+            print("Rollover marker error:", e)
+            return False
+        self._prune_markers(game_date)
+        return True
+
+    def _prune_markers(self, game_date: str):
+        oldest = previous_game_date(game_date)
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith("rollover-") and name[9:19] < oldest:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="game-clock", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            delay = min(max(self._window[1] - self.clock(), 0.05), MAX_SLEEP)
+            self._wake.wait(delay)
+            self.tick()
@@ -0,0 +1,136 @@
+import csv
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from rapidfuzz import fuzz
+from rapidfuzz.process import cdist
+
+from utils.answer_matcher import normalize_answer
+
+try:
+    import numpy as np  # optional: pip install numpy (needed by cdist)
+except ImportError:
+    np = None
+
+# Scorers the evaluator can compare; check_guess() uses "ratio".
+SCORERS: Dict[str, Callable] = {
+    "ratio": fuzz.ratio,
+    "token_sort_ratio": fuzz.token_sort_ratio,
+    "WRatio": fuzz.WRatio,
+}
+
+DEFAULT_THRESHOLDS = (60, 65, 70, 75, 79, 80, 85, 90, 95)
+
+_TRUE = {"1", "true", "yes", "y", "correct"}
+_FALSE = {"0", "false", "no", "n", "wrong", "incorrect"}
+
+
+def parse_thresholds(text: str) -> List[int]:
+    """'60,70,79' or a range 'start-stop[:step]' (stop included) -> sorted thresholds."""
+    values = set()
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            span, _, step = part.partition(":")
+            start, _, stop = span.partition("-")
+            values.update(range(int(start), int(stop) + 1, int(step or 1)))
+        elif part:
+            values.add(int(part))
+    if not values or not all(0 <= value <= 100 for value in values):
+        raise ValueError(f"thresholds must be between 0 and 100: {text!r}")
+    return sorted(values)
+
+
+def read_labels(path: str) -> Dict[str, Dict[str, bool]]:
+    """
+    Hand labels from a CSV with date, guess and correct columns (1/0,
+    true/false, yes/no), as {date: {normalised guess: correct}}.
+    """
+    labels: Dict[str, Dict[str, bool]] = {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line, record in enumerate(csv.DictReader(f), start=2):
+            verdict = (record.get("correct") or "").strip().lower()
+            if verdict not in _TRUE | _FALSE:
+                raise ValueError(f"{path}:{line}: correct must be 1/0, true/false or yes/no")
+            guess = normalize_answer(record.get("guess") or "")
+            if guess:
+                labels.setdefault((record.get("date") or "").strip(), {})[guess] = verdict in _TRUE
+    return labels
+
+
+def best_scores(guesses: Sequence[str], choices: Sequence[str], scorer: Callable, workers: int = -1):
+    """Each guess's best score against the choices, from one cdist call across `workers` threads."""
+    if not guesses or not choices:
+        return np.zeros(len(guesses), dtype=np.float32)
+    matrix = cdist(guesses, choices, scorer=scorer, processor=None, dtype=np.float32, workers=workers)
+    return matrix.max(axis=1)
+
+
+def evaluate(corpus: Dict[str, Counter], answers: Dict[str, List[str]],
+             labels: Optional[Dict[str, Dict[str, bool]]] = None,
+             scorers: Sequence[str] = tuple(SCORERS), thresholds: Sequence[int] = DEFAULT_THRESHOLDS,
+             workers: int = -1) -> List[Dict]:
+    """
+    Replay logged guesses against every scorer and threshold.
+
+    corpus maps a date to its distinct normalised guesses and how often
+    each was made; answers maps a date to its normalised accepted answers.
+    Every distinct guess is scored once per scorer (a cdist matrix per
+    date), then each threshold is a vectorised comparison, so the cost
+    barely grows with the number of thresholds. Rates are per guess made.
+    Labelled guesses that were never logged are scored too, once each.
+
+    Returns one row per (scorer, threshold): accept_rate over all guesses
+    and, where labels exist, precision, recall and F1 with their counts.
+    """
+    if np is None:
+        raise RuntimeError("the guess evaluator needs numpy (pip install numpy)")
+    labels = labels or {}
+    dates = [game_date for game_date in sorted(set(corpus) | set(labels)) if answers.get(game_date)]
+    guesses, weights, truth, choices_by_date = [], [], [], []
+    for game_date in dates:
+        counts = Counter(corpus.get(game_date) or {})
+        for guess in labels.get(game_date, {}):
+            counts.setdefault(guess, 1)
+        day_labels = labels.get(game_date, {})
+        day_guesses = list(counts)
+        guesses.append(day_guesses)
+        weights.append(np.array([counts[guess] for guess in day_guesses], dtype=np.int64))
+        truth.append(np.array([-1 if guess not in day_labels else int(day_labels[guess])
+                               for guess in day_guesses], dtype=np.int8))
+        choices_by_date.append(answers[game_date])
+    weight = np.concatenate(weights) if weights else np.zeros(0, dtype=np.int64)
+    label = np.concatenate(truth) if truth else np.zeros(0, dtype=np.int8)
+    positive, negative = label == 1, label == 0
+
+    results = []
+    for name in scorers:
+        scorer = SCORERS[name]
+        parts = [best_scores(day_guesses, choices, scorer, workers)
+                 for day_guesses, choices in zip(guesses, choices_by_date)]
+        score = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+        for threshold in thresholds:
+            accepted = score >= threshold
+            tp = int(weight[accepted & positive].sum())
+            fp = int(weight[accepted & negative].sum())
+            fn = int(weight[~accepted & positive].sum())
+            precision = tp / (tp + fp) if tp + fp else None
+            recall = tp / (tp + fn) if tp + fn else None
+            f1 = (2 * precision * recall / (precision + recall)
+                  if precision is not None and recall is not None and precision + recall else None)
+            results.append({
+                "scorer": name,
+                "threshold": threshold,
+                "guesses": int(weight.sum()),
+                "accept_rate": float(weight[accepted].sum() / weight.sum()) if weight.sum() else None,
+                "tp": tp, "fp": fp, "fn": fn,
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+            })
+    return results
+
+
+def distinct_guesses(corpus: Dict[str, Counter]) -> Tuple[int, int]:
+    """(guesses made, distinct guesses scored) across the corpus."""
+    return sum(sum(c.values()) for c in corpus.values()), sum(len(c) for c in corpus.values())
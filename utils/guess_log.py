@@ -0,0 +1,110 @@
+import atexit
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.shared_cache import CACHE_DIR
+
+# GUESS_LOG=0 turns guess logging off.
+GUESS_LOG_ENABLED = os.environ.get("GUESS_LOG", "1") != "0"
+
+# One append-only file per game date, shared by every worker on the host.
+GUESS_LOG_DIR = os.environ.get("GUESS_LOG_DIR", os.path.join(CACHE_DIR, "guesses"))
+
+# Buffered guesses are written out once this many bytes have collected or
+# this many seconds have passed since the last write, whichever is first.
+GUESS_LOG_BUFFER_BYTES = 64 * 1024
+GUESS_LOG_FLUSH_SECONDS = float(os.environ.get("GUESS_LOG_FLUSH_SECONDS", "5"))
+
+# Longer guesses are cut; nobody types a 200 character event name.
+MAX_GUESS_LENGTH = 100
+
+_FILE_NAME = re.compile(r"^guesses-(\d{4}-\d{2}-\d{2})\.tsv$")
+
+
+class GuessLog:
+    """
+    Append-only record of the guesses check_guess() scored.
+
+    Each guess is one line, `<normalised guess>\\t<1 if accepted else 0>`, in
+    guesses-<game date>.tsv. Normalised guesses only hold [a-z0-9 ], so
+    the format needs no escaping and is exactly what the matcher compared.
+    Lines are buffered per process and appended with one write() when the
+    buffer fills, when it is older than flush_seconds (checked as guesses
+    arrive) and at exit, so logging costs a list append per guess. A
+    worker killed outright loses at most its unwritten buffer.
+    """
+
+    def __init__(self, directory: str = GUESS_LOG_DIR, enabled: bool = GUESS_LOG_ENABLED,
+                 flush_seconds: float = GUESS_LOG_FLUSH_SECONDS,
+                 buffer_bytes: int = GUESS_LOG_BUFFER_BYTES):
+        self.directory = directory
+        self.enabled = enabled
+        self.flush_seconds = flush_seconds
+        self.buffer_bytes = buffer_bytes
+        self._buffers: Dict[str, List[str]] = {}
+        self._size = 0
+        self._flushed_at = time.time()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def path(self, game_date: str) -> str:
+        return os.path.join(self.directory, f"guesses-{game_date}.tsv")
+
+    def record(self, game_date: str, normalized_guess: str, accepted: bool):
+        if not self.enabled or not normalized_guess:
+            return
+        line = f"{normalized_guess[:MAX_GUESS_LENGTH]}\t{1 if accepted else 0}\n"
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent's buffer is the parent's to write.
+                self._buffers, self._size, self._pid = {}, 0, os.getpid()
+                atexit.register(self.flush)
+            self._buffers.setdefault(game_date, []).append(line)
+            self._size += len(line)
+            due = self._size >= self.buffer_bytes or time.time() - self._flushed_at >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            buffers, self._buffers, self._size = self._buffers, {}, 0
+            self._flushed_at = time.time()
+        for game_date, lines in buffers.items():
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd = os.open(self.path(game_date), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, "".join(lines).encode("ascii"))
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                print("Guess log write error:", e)
+
+    def dates(self) -> List[str]:
+        """Game dates that have a log file, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(match.group(1) for match in map(_FILE_NAME.match, names) if match)
+
+    def read(self, game_date: str) -> Iterator[Tuple[str, bool]]:
+        """(normalised guess, accepted) for every complete line logged for game_date."""
+        try:
+            f = open(self.path(game_date), encoding="ascii", errors="replace")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                guess, sep, accepted = line.rstrip("\n").rpartition("\t")
+                if sep and guess and line.endswith("\n"):
+                    yield guess, accepted == "1"
+
+    def corpus(self, dates: Optional[Iterable[str]] = None) -> Dict[str, Counter]:
+        """Per date, how many times each distinct guess was made."""
+        return {game_date: Counter(guess for guess, _ in self.read(game_date))
+                for game_date in (self.dates() if dates is None else dates)}
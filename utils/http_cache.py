@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, NamedTuple, Optional, Tuple
+
+
+class CachedJSON(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag from the body itself, so every worker hands out the same one."""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names this ETag (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional(if_none_match: Optional[str], cached: CachedJSON,
+                cache_control: str) -> Tuple[int, bytes, List[Tuple[str, str]]]:
+    """(status, body, headers) for a cached body: 304 with no body if the client has it."""
+    headers = [("ETag", cached.etag), ("Cache-Control", cache_control)]
+    if etag_matches(if_none_match, cached.etag):
+        return 304, b"", headers
+    return 200, cached.body, headers
+
+
+class ResponseCache:
+    """
+    JSON response bodies serialised once per version of their data.
+
+    Each key (e.g. one leaderboard view) holds the version it was built
+    from, the encoded body and its ETag. Requests with an unchanged
+    version get the stored bytes back; only a new version (or an entry
+    older than `ttl`, for bodies that also embed data without a version)
+    serialises again. Versions are compared with ==. At most `maxsize`
+    keys are kept, least recently used first out.
+    """
+
+    def __init__(self, dumps: Callable[[Any], str], maxsize: int = 256, ttl: Optional[float] = None):
+        self._dumps = dumps
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, CachedJSON]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable, version: Any) -> Optional[CachedJSON]:
+        """The stored body for key if it was built from this version and is fresh."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        cached_version, built_at, cached = entry
+        if self.ttl is not None and time.time() - built_at > self.ttl:
+            return None
+        if cached_version is not version and cached_version != version:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return cached
+
+    def store(self, key: Hashable, version: Any, payload: Any) -> CachedJSON:
+        body = (self._dumps(payload) + "\n").encode("utf-8")
+        cached = CachedJSON(body, etag_for(body))
+        with self._lock:
+            self._entries[key] = (version, time.time(), cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return cached
+
+    def get(self, key: Hashable, version: Any, build: Callable[[], Any]) -> CachedJSON:
+        """The body for key at this version, calling build() for the payload if needed."""
+        cached = self.lookup(key, version)
+        if cached is None:
+            cached = self.store(key, version, build())
+        return cached
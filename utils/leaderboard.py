@@ -0,0 +1,318 @@
+import base64
+import bisect
+import heapq
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.event_stats import UNTIMED, SolveStats
+from utils.shared_cache import CACHE_DIR
+
+# Rows with more clues than this are losses and never make the board.
+MAX_CLUES = 5
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_JOURNAL_NAME = re.compile(r"^leaderboard-(\d{4}-\d{2}-\d{2})\.jsonl$")
+_CLOCK_TIME = re.compile(r"^\d+(:\d+)+$")
+_PLAIN_SECONDS = re.compile(r"^\d+(\.\d*)?$")
+
+# Board order for rows without a table id yet (queued submissions): after
+# every stored row with the same time and clues, in arrival order.
+_UNSAVED = 1 << 62
+
+
+def solve_seconds(value) -> int:
+    """
+    Solve time as whole seconds. Accepts 'MM:SS' or 'H:MM:SS' (the auto
+    submit) and a number of seconds, as a number or a string (the manual
+    submit's timeTaken). Anything else is UNTIMED and sorts last. Stored
+    as leaderboard.solve_seconds; sql/leaderboard_keyset.sql has the same
+    rules as public.solve_seconds(), keep the two in step.
+    """
+    if isinstance(value, (int, float)):
+        return int(value) if value >= 0 else UNTIMED
+    text = str(value).strip() if value is not None else ""
+    if _PLAIN_SECONDS.match(text):
+        return int(float(text))
+    if not _CLOCK_TIME.match(text):
+        return UNTIMED
+    seconds = 0
+    for part in text.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def keyset_key(row: Dict) -> Tuple[int, int, int]:
+    """A stored row's (solve_seconds, clues_used, id): the full board's sort and paging key."""
+    return row["solve_seconds"], row["clues_used"], row["id"]
+
+
+def encode_cursor(row: Dict, rank: int) -> str:
+    """Opaque page cursor: a row's keyset_key() plus its rank."""
+    data = json.dumps(list(keyset_key(row)) + [rank], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Tuple, int]:
+    """((solve_seconds, clues_used, id), rank) from encode_cursor(); ValueError if it isn't one."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        seconds, clues_used, row_id, rank = data
+        key = (int(seconds), int(clues_used), int(row_id))
+        rank = int(rank)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    if rank < 1:
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    return key, rank
+
+
+def entry_identity(row: Dict):
+    """Stable identity of a leaderboard row, used to de-duplicate rows."""
+    # Queued submissions carry a submission_id before they have a table id.
+    return row.get("submission_id") or row.get("id") or (row.get("name"), row.get("timestamp"))
+
+
+class DailyLeaderboard:
+    """
+    Every leaderboard row for one game date, kept sorted in memory.
+
+    Rows are bucketed by clues_used (a small integer) and each bucket is a
+    list sorted by (solve_seconds, clues, id), the table's keyset order;
+    rows not stored yet sort after stored ties. The top K for any
+    clue cap is a K-step heap merge of the eligible buckets and a player's
+    rank is a bisect per bucket, so neither touches the database. The
+    day's solve statistics (utils.event_stats) are updated with each row.
+    """
+
+    def __init__(self, game_date: str):
+        self.game_date = game_date
+        self._buckets: Dict[int, List[tuple]] = {}
+        self._best: Dict[str, tuple] = {}  # name -> best sort key
+        self._seen = set()
+        self._seq = 0
+        self._stats = SolveStats(MAX_CLUES)
+        self.frozen = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    @property
+    def version(self) -> int:
+        """Grows with every accepted row; usable as a cache version."""
+        return self._seq
+
+    def add(self, row: Dict) -> bool:
+        """Insert a row in place. Returns False if it was already present or the board is frozen."""
+        identity = entry_identity(row)
+        clues = int(row.get("clues_used") or 0)
+        with self._lock:
+            if self.frozen or identity in self._seen:
+                return False
+            self._seen.add(identity)
+            self._seq += 1
+            key = (solve_seconds(row.get("solve_time")), clues, row.get("id") or _UNSAVED + self._seq)
+            bisect.insort(self._buckets.setdefault(clues, []), key + (row,))
+            self._stats.add(clues, key[0])
+            name = row.get("name")
+            if name and (name not in self._best or key < self._best[name]):
+                self._best[name] = key
+            return True
+
+    def extend(self, rows: Iterable[Dict]):
+        for row in rows:
+            self.add(row)
+
+    def _eligible(self, max_clues: int) -> List[List[tuple]]:
+        return [bucket for clues, bucket in self._buckets.items() if clues <= max_clues]
+
+    def top(self, limit: int = 10, max_clues: int = MAX_CLUES) -> List[Dict]:
+        """The best `limit` rows with clues_used <= max_clues, as copies."""
+        with self._lock:
+            merged = heapq.merge(*self._eligible(max_clues))
+            return [dict(item[3]) for _, item in zip(range(limit), merged)]
+
+    def total(self, max_clues: int = MAX_CLUES) -> int:
+        with self._lock:
+            return sum(len(bucket) for bucket in self._eligible(max_clues))
+
+    def stats(self) -> Dict:
+        """Players, solve rate, clue and solve-time histograms and percentiles for the day."""
+        with self._lock:
+            return dict(self._stats.as_dict(), date=self.game_date)
+
+    def rank(self, name: str, max_clues: int = MAX_CLUES) -> Optional[Tuple[int, int]]:
+        """
+        (1-based rank of the player's best eligible row, number of eligible
+        rows), or None if the player has no eligible row today.
+        """
+        with self._lock:
+            key = self._best.get(name)
+            if key is None or key[1] > max_clues:
+                return None
+            buckets = self._eligible(max_clues)
+            ahead = sum(bisect.bisect_left(bucket, key) for bucket in buckets)
+            return ahead + 1, sum(len(bucket) for bucket in buckets)
+
+
+class LeaderboardStore:
+    """
+    Per-date DailyLeaderboards for this process.
+
+    A board is built from the table the first time its date is read (at
+    startup or after rollover). New scores are appended to a per-date
+    journal file in the shared cache directory, which every worker replays
+    before answering, so boards stay in step across workers without extra
+    database reads.
+    """
+
+    def __init__(self, loader: Callable[[str], Iterable[Dict]],
+                 directory: str = CACHE_DIR, keep_days: int = 2):
+        self._loader = loader
+        self._directory = directory
+        self._keep_days = keep_days
+        self._boards: Dict[str, DailyLeaderboard] = {}
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._prewarming = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def _journal_path(self, game_date: str) -> str:
+        return os.path.join(self._directory, f"leaderboard-{game_date}.jsonl")
+
+    def board(self, game_date: str) -> DailyLeaderboard:
+        """Return the up-to-date board for game_date, building it if needed."""
+        board = self._boards.get(game_date)
+        if board is None:
+            with self._lock:
+                load_lock = self._load_locks.setdefault(game_date, threading.Lock())
+            # One table read per date; other dates don't wait for it.
+            with load_lock:
+                board = self._boards.get(game_date)
+                if board is None:
+                    board = self._build(game_date)
+        self._replay(game_date, board)
+        return board
+
+    def prewarm(self, game_date: str):
+        """
+        Build game_date's board on a background thread if this process
+        hasn't yet, so the streaming read of the table doesn't wait on (or
+        happen in) a request. Cheap to call on every request.
+        """
+        if game_date in self._boards or game_date in self._prewarming:
+            return
+        with self._lock:
+            if game_date in self._boards or game_date in self._prewarming:
+                return
+            self._prewarming.add(game_date)
+
+        def run():
+            try:
+                self.board(game_date)
+            except Exception as e:
+                print("Leaderboard prewarm error:", e)
+            finally:
+                with self._lock:
+                    self._prewarming.discard(game_date)
+
+        threading.Thread(target=run, name=f"leaderboard-{game_date}", daemon=True).start()
+
+    def record(self, row: Dict):
+        """Add a freshly inserted row locally and publish it to other workers."""
+        game_date = row.get("date")
+        if not isinstance(game_date, str) or not _DATE.match(game_date):
+            return
+        board = self._boards.get(game_date)
+        if board is not None and board.frozen:
+            return
+        line = (json.dumps(row, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            fd = os.open(self._journal_path(game_date), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print("Leaderboard journal write error:", e)
+        if board is not None:
+            board.add(row)
+
+    def freeze(self, game_date: str):
+        """
+        Stop a finished day's board from changing in this process, after
+        taking in every row other workers published before the cutoff.
+        """
+        board = self._boards.get(game_date)
+        if board is not None:
+            self._replay(game_date, board)
+            board.frozen = True
+
+    def _build(self, game_date: str) -> DailyLeaderboard:
+        # Remember where the journal ended *before* reading the table; rows
+        # written in between show up in both and are de-duplicated by add().
+        try:
+            offset = os.path.getsize(self._journal_path(game_date))
+        except OSError:
+            offset = 0
+        board = DailyLeaderboard(game_date)
+        board.extend(self._loader(game_date))
+        with self._lock:
+            self._offsets[game_date] = offset
+            self._boards[game_date] = board
+        self._rollover(game_date)
+        return board
+
+    def _replay(self, game_date: str, board: DailyLeaderboard):
+        path = self._journal_path(game_date)
+        offset = self._offsets.get(game_date, 0)
+        try:
+            if os.path.getsize(path) <= offset:
+                return
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except OSError:
+            return
+        if board.frozen:
+            return
+        # Only consume complete lines; a half-written one is read next time.
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                board.add(json.loads(line))
+            except ValueError:
+                continue
+        with self._lock:
+            self._offsets[game_date] = max(self._offsets.get(game_date, 0), offset + end)
+
+    def _rollover(self, newest_date: str):
+        """
+        Forget boards and journals for dates more than keep_days - 1 days
+        before newest_date. The cutoff depends only on the date, not on which
+        boards this process has built, so a fresh worker never deletes a
+        journal (yesterday's, say) that other workers still replay.
+        """
+        newest = datetime.strptime(newest_date, "%Y-%m-%d")
+        oldest = (newest - timedelta(days=max(self._keep_days - 1, 0))).strftime("%Y-%m-%d")
+        with self._lock:
+            for game_date in [d for d in self._boards if d < oldest]:
+                del self._boards[game_date]
+                self._offsets.pop(game_date, None)
+                self._load_locks.pop(game_date, None)
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return
+        for name in names:
+            match = _JOURNAL_NAME.match(name)
+            if match and match.group(1) < oldest:
+                try:
+                    os.remove(os.path.join(self._directory, name))
+                except OSError:
+                    pass
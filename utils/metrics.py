@@ -0,0 +1,314 @@
+import atexit
+import glob
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, g, request
+
+from utils.db import METHOD_TABLES, Backend, add_backend_wrapper
+from utils.shared_cache import CACHE_DIR
+
+# HISTORLE_METRICS=0 turns instrumentation off entirely: no request hooks,
+# no backend wrapper, and /metrics answers 404.
+METRICS_ENABLED = os.environ.get("HISTORLE_METRICS", "1") != "0"
+
+# /metrics needs this as a bearer token; with it unset the endpoint answers 404.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+# Each worker writes its numbers here at most once a second; /metrics sums them.
+SNAPSHOT_INTERVAL = 1
+
+_SNAPSHOT_FILE = re.compile(r"metrics-(\d+)\.json$")
+
+
+class Registry:
+    """Histograms and counters for this process, keyed by name and labels."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple, Dict] = {}
+        self._counters: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets),
+                                                "sum": 0.0, "count": 0}
+            for i, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+                    break
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "histograms": [[name, list(labels), dict(hist, counts=list(hist["counts"]))]
+                               for (name, labels), hist in self._histograms.items()],
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+            }
+
+
+registry = Registry()
+
+# [calls, seconds] spent in the backend by the current request. A context
+# variable, so it follows a request onto asyncio.to_thread() workers in
+# the ASGI app; calls from background threads see None and aren't tallied.
+_backend_tally: ContextVar[Optional[List]] = ContextVar("backend_tally", default=None)
+_tally_lock = threading.Lock()
+
+
+def _record_call(method: str, table: str, start: float, rows: Optional[int]):
+    elapsed = time.perf_counter() - start
+    registry.observe("historle_backend_call_seconds", elapsed, method=method, table=table)
+    if rows is not None:
+        registry.observe("historle_backend_result_rows", rows, buckets=ROW_BUCKETS, method=method, table=table)
+    tally = _backend_tally.get()
+    if tally is not None:
+        with _tally_lock:
+            tally[0] += 1
+            tally[1] += elapsed
+
+
+class InstrumentedBackend(Backend):
+    """
+    Wraps the storage backend and records, for every call, its latency and
+    how many rows it returned (per method and table) plus a per-request
+    tally used for the Server-Timing header. Rows are counted, not
+    serialised, and iter_* results are counted as they stream past.
+    """
+
+    def __init__(self, inner: Backend):
+        self.inner = inner
+
+    def __getattribute__(self, name):
+        if name.startswith("_") or name == "inner" or not hasattr(Backend, name):
+            return object.__getattribute__(self, name)
+        inner_method = getattr(object.__getattribute__(self, "inner"), name)
+        table = METHOD_TABLES.get(name, "other")
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            result = inner_method(*args, **kwargs)
+            if name.startswith("iter_"):
+                return _timed_iter(result, start, name, table)
+            _record_call(name, table, start, _row_count(result))
+            return result
+        return call
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+class InstrumentedAsyncBackend:
+    """The same per-call recording for the ASGI app's async backend."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        inner_method = getattr(self.inner, name)
+        if name.startswith("_") or name == "aclose":
+            return inner_method
+        table = METHOD_TABLES.get(name, "other")
+
+        async def call(*args, **kwargs):
+            start = time.perf_counter()
+            result = await inner_method(*args, **kwargs)
+            _record_call(name, table, start, _row_count(result))
+            return result
+        return call
+
+
+def _row_count(result):
+    if result is None:
+        return None
+    return len(result) if isinstance(result, (list, tuple)) else 1
+
+
+def _timed_iter(rows, start, method, table):
+    # Generators do their work while being consumed; time the whole read.
+    count = 0
+    for row in rows:
+        count += 1
+        yield row
+    _record_call(method, table, start, count)
+
+
+def start_request() -> float:
+    """Start timing a request and its backend calls; returns the start time for finish_request()."""
+    _backend_tally.set([0, 0.0])
+    return time.perf_counter()
+
+
+def finish_request(start: float, route: str, method: str, status: int) -> str:
+    """Record a finished request and return its Server-Timing header value."""
+    elapsed = time.perf_counter() - start
+    registry.observe("historle_request_seconds", elapsed, route=route, method=method, status=str(status))
+    calls, backend_seconds = _backend_tally.get() or (0, 0.0)
+    _backend_tally.set(None)
+    _maybe_write_snapshot()
+    return f'app;dur={elapsed * 1000:.2f}, db;dur={backend_seconds * 1000:.2f};desc="{calls} calls"'
+
+
+def _before_request():
+    g.request_start = start_request()
+
+
+def _after_request(response):
+    start = g.get("request_start")
+    if start is None:
+        return response
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    response.headers["Server-Timing"] = finish_request(start, route, request.method, response.status_code)
+    return response
+
+
+_last_snapshot = 0.0
+_snapshot_pid = None
+
+
+def _snapshot_path(pid=None) -> str:
+    return os.path.join(CACHE_DIR, f"metrics-{pid or os.getpid()}.json")
+
+
+def _remove_snapshot():
+    try:
+        os.remove(_snapshot_path())
+    except OSError:
+        pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def _maybe_write_snapshot(force: bool = False):
+    global _last_snapshot, _snapshot_pid
+    now = time.time()
+    if not force and now - _last_snapshot < SNAPSHOT_INTERVAL:
+        return
+    _last_snapshot = now
+    if _snapshot_pid != os.getpid():
+        # First snapshot in this worker: take its file away when it exits.
+        _snapshot_pid = os.getpid()
+        atexit.register(_remove_snapshot)
+    tmp_path = _snapshot_path() + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(tmp_path, _snapshot_path())
+    except OSError as e:
+        print("Metrics snapshot error:", e)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus() -> str:
+    """
+    Sum every live worker's snapshot and render it in Prometheus text
+    format. Snapshots left by workers that died without cleaning up are
+    skipped and deleted.
+    """
+    _maybe_write_snapshot(force=True)
+    histograms: Dict[Tuple, Dict] = {}
+    counters: Dict[Tuple, float] = {}
+    for path in glob.glob(os.path.join(CACHE_DIR, "metrics-*.json")):
+        match = _SNAPSHOT_FILE.search(path)
+        if not match:
+            continue
+        if not _pid_alive(int(match.group(1))):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, hist in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            total = histograms.setdefault(key, {"buckets": hist["buckets"], "counts": [0] * len(hist["buckets"]),
+                                                "sum": 0.0, "count": 0})
+            total["counts"] = [a + b for a, b in zip(total["counts"], hist["counts"])]
+            total["sum"] += hist["sum"]
+            total["count"] += hist["count"]
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+
+    lines = []
+    typed = set()
+    for (name, labels), hist in sorted(histograms.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, count in zip(hist["buckets"], hist["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    for (name, labels), value in sorted(counters.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+    """
+    Prometheus scrape endpoint. METRICS_TOKEN must be sent as a bearer
+    token; without one configured the endpoint doesn't exist.
+    """
+    if not METRICS_ENABLED or not METRICS_TOKEN:
+        return Response("Not found\n", status=404, mimetype="text/plain")
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Register /metrics and, unless disabled, the request and backend hooks."""
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+    if not METRICS_ENABLED:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    add_backend_wrapper(InstrumentedBackend)
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from utils.metrics import registry
+
+# werkzeug method string for new hashes, e.g. "scrypt:32768:8:1" or
+# "pbkdf2:sha256:600000". Stored hashes made with other parameters are
+# upgraded the next time their owner logs in.
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+
+# Hashing processes per worker; 0 hashes inline on the request thread.
+PASSWORD_HASH_PROCESSES = int(os.environ.get("PASSWORD_HASH_PROCESSES", "1"))
+# Hashes running or queued in the pool at once; further callers wait.
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "8"))
+# How long a caller waits for a pool slot before giving up.
+PASSWORD_HASH_WAIT = float(os.environ.get("PASSWORD_HASH_WAIT", "10"))
+
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+# Niceness of the hashing processes, so request threads win a busy core.
+PASSWORD_HASH_NICE = int(os.environ.get("PASSWORD_HASH_NICE", "5"))
+
+# How hashing processes are started: "forkserver" or "spawn", never "fork".
+# Workers run threads (rollover, score flusher, prewarms), and a child
+# forked while one of them holds a lock would inherit it locked for good.
+PASSWORD_HASH_START_METHOD = os.environ.get("PASSWORD_HASH_START_METHOD", "forkserver")
+
+# Imported by the fork server once, so each hashing process starts ready.
+_FORKSERVER_PRELOAD = ["werkzeug.security", "utils.passwords"]
+
+
+class HasherBusy(Exception):
+    """No hashing slot became free within the wait limit."""
+
+
+def _lower_priority():
+    try:
+        os.nice(PASSWORD_HASH_NICE)
+    except OSError:
+        pass
+
+
+def normalize_method(method: str) -> str:
+    """werkzeug's method string with its defaults filled in, as stored in hashes."""
+    name, *args = method.split(":")
+    if name == "scrypt" and not args:
+        return "scrypt:32768:8:1"
+    if name == "pbkdf2" and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+
+class PasswordHasher:
+    """
+    Password hashing and checking on a small process pool, so the
+    deliberately slow KDF neither holds the GIL of a request worker nor
+    runs more than `max_pending` at a time.
+
+    Callers block until their hash is done; those beyond the limit wait
+    for a slot (for at most `wait` seconds, then HasherBusy). The number
+    of hashes in the pool or waiting is recorded on every call as
+    historle_password_hash_queue_depth.
+    """
+
+    def __init__(self, method: str = PASSWORD_HASH_METHOD, processes: int = PASSWORD_HASH_PROCESSES,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING, wait: float = PASSWORD_HASH_WAIT):
+        self.method = normalize_method(method)
+        self.processes = processes
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._depth = 0
+        self._depth_lock = threading.Lock()
+        self._pool = None  # concurrent.futures.ProcessPoolExecutor
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        return self._run("verify", check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """Whether a stored hash was made with other parameters than ours."""
+        return stored_hash.split("$", 1)[0] != self.method
+
+    def depth(self) -> int:
+        return self._depth
+
+    def warm(self):
+        """Import the pool machinery now (e.g. before forking) without starting processes."""
+        if self.processes > 0:
+            import concurrent.futures.process  # noqa: F401
+            import multiprocessing.forkserver  # noqa: F401
+
+    def _context(self):
+        import multiprocessing
+        context = multiprocessing.get_context(PASSWORD_HASH_START_METHOD)
+        if PASSWORD_HASH_START_METHOD == "forkserver":
+            context.set_forkserver_preload(_FORKSERVER_PRELOAD)
+        return context
+
+    def _executor(self):
+        # Created on first use in each worker (after gunicorn has forked).
+        # The hashing processes come from a fork server (or are spawned),
+        # never forked from this worker: it has other threads running, and
+        # a lock one of them held at fork time would stay held in the child.
+        # Each worker starts its own server here (fork+exec, which is safe
+        # with threads); one started in the master can't be used from the
+        # forked workers.
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    # Imported here: it costs ~30ms at startup and inline
+                    # hashing (processes=0) never needs it.
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    self._pool = ProcessPoolExecutor(self.processes, mp_context=self._context(),
+                                                     initializer=_lower_priority)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _run(self, op: str, fn, *args):
+        with self._depth_lock:
+            self._depth += 1
+            depth = self._depth
+        registry.observe("historle_password_hash_queue_depth", depth, buckets=DEPTH_BUCKETS, op=op)
+        start = time.perf_counter()
+        try:
+            if self.processes <= 0:
+                return fn(*args)
+            if not self._slots.acquire(timeout=self.wait):
+                raise HasherBusy(f"password {op} waited more than {self.wait}s")
+            try:
+                return self._executor().submit(fn, *args).result()
+            finally:
+                self._slots.release()
+        finally:
+            with self._depth_lock:
+                self._depth -= 1
+            registry.observe("historle_password_hash_seconds", time.perf_counter() - start, op=op)
@@ -0,0 +1,182 @@
+import glob
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.db import parse_columns
+from utils.metrics import registry
+from utils.shared_cache import CACHE_DIR
+from utils.streaks import STAT_COLUMNS
+
+# The users columns the stats endpoints read. Never "*", and never the
+# password hash: callers that need more get it in the same query, uncached.
+PROFILE_COLUMNS = ("username", "x_id") + STAT_COLUMNS
+
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", "60"))
+
+# Each worker checks the journal at most this often (milliseconds), so a
+# profile changed by another worker can be served for up to this long.
+PROFILE_SYNC_INTERVAL_MS = float(os.environ.get("PROFILE_SYNC_INTERVAL_MS", "100"))
+
+
+class ProfileCache:
+    """
+    Per-process LRU of user profiles (PROFILE_COLUMNS), each kept for at
+    most `ttl` seconds.
+
+    Writes go through the cache: update() merges the new values into the
+    cached profile and evict() drops it. Both also append the username to
+    a shared journal, which the other workers read and evict from before a
+    lookup, so they serve a profile changed elsewhere for at most
+    `sync_interval` seconds. The check is a stat() of the journal, and the
+    file is only read when it has grown. Journals rotate every `ttl`
+    seconds; only the current and previous one matter, since anything
+    older has expired anyway.
+    """
+
+    def __init__(self, loader: Callable[[str, str], Optional[Dict]],
+                 maxsize: int = PROFILE_CACHE_SIZE, ttl: float = PROFILE_CACHE_TTL,
+                 directory: str = CACHE_DIR, sync_interval: float = PROFILE_SYNC_INTERVAL_MS / 1000):
+        self._loader = loader
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self._synced_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # (journal bucket, bytes read) of the newest journal seen.
+        self._journal = (self._bucket(), 0)
+        os.makedirs(directory, exist_ok=True)
+
+    def _bucket(self) -> int:
+        return int(time.time() // self.ttl)
+
+    def _journal_path(self, bucket: int) -> str:
+        return os.path.join(self.directory, f"profiles-{bucket}.log")
+
+    def get(self, username: str, columns: str) -> Optional[Dict]:
+        """
+        The requested columns of a user's row, or None if there is no such
+        user. Columns outside PROFILE_COLUMNS are fetched together with a
+        fresh profile and are not cached.
+        """
+        wanted = parse_columns(columns)
+        extra = [c for c in wanted if c not in PROFILE_COLUMNS]
+        self._sync()
+        if not extra:
+            with self._lock:
+                entry = self._entries.get(username)
+                if entry is not None and entry[1] > time.time():
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    registry.inc("historle_profile_cache_lookups_total", result="hit")
+                    return {c: entry[0].get(c) for c in wanted}
+        with self._lock:
+            self.misses += 1
+        registry.inc("historle_profile_cache_lookups_total", result="miss")
+
+        row = self._loader(username, ", ".join(PROFILE_COLUMNS + tuple(extra)))
+        if row is None:
+            return None
+        self._store(username, {c: row.get(c) for c in PROFILE_COLUMNS})
+        return {c: row.get(c) for c in wanted}
+
+    def update(self, username: str, fields: Dict):
+        """Write-through: merge new column values into a cached profile."""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None:
+                self._entries[username] = (dict(entry[0], **fields), time.time() + self.ttl)
+        self._publish([username])
+
+    def update_many(self, usernames: List[str], fields: Dict):
+        """update() for a batch of users with one journal write."""
+        with self._lock:
+            for username in usernames:
+                entry = self._entries.get(username)
+                if entry is not None:
+                    self._entries[username] = (dict(entry[0], **fields), time.time() + self.ttl)
+        self._publish(usernames)
+
+    def evict(self, username: str):
+        with self._lock:
+            self._entries.pop(username, None)
+        self._publish([username])
+
+    def _store(self, username: str, profile: Dict):
+        with self._lock:
+            self._entries[username] = (profile, time.time() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _publish(self, usernames: List[str]):
+        # One O_APPEND write per call, so lines from several workers don't interleave.
+        bucket = self._bucket()
+        pid = os.getpid()
+        line = "".join(f"{pid} {username}\n" for username in usernames).encode("utf-8")
+        try:
+            fd = os.open(self._journal_path(bucket), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print("Profile journal write error:", e)
+        for path in glob.glob(os.path.join(self.directory, "profiles-*.log")):
+            try:
+                if int(os.path.basename(path)[9:-4]) < bucket - 1:
+                    os.remove(path)
+            except (ValueError, OSError):
+                pass
+
+    def _sync(self):
+        """Evict every user another worker changed since the last check."""
+        checked = time.monotonic()
+        if checked - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = checked
+        bucket, offset = self._journal
+        now = self._bucket()
+        if now > bucket + 1:
+            # Missed a whole journal; nothing cached before then is trustworthy.
+            with self._lock:
+                self._entries.clear()
+            self._journal = (now, 0)
+            return
+        names = []
+        for current in range(bucket, now + 1):
+            start = offset if current == bucket else 0
+            path = self._journal_path(current)
+            try:
+                if os.stat(path).st_size > start:
+                    with open(path, "rb") as f:
+                        f.seek(start)
+                        data = f.read()
+                else:
+                    data = b""
+            except FileNotFoundError:
+                data = b""
+            # Only consume whole lines; a write may be in progress.
+            data = data[:data.rfind(b"\n") + 1]
+            names.extend(self._parse(data))
+            bucket, offset = current, start + len(data)
+        self._journal = (bucket, offset)
+        if names:
+            with self._lock:
+                for name in names:
+                    self._entries.pop(name, None)
+
+    @staticmethod
+    def _parse(data: bytes) -> Iterable[str]:
+        pid = str(os.getpid())
+        for line in data.decode("utf-8").splitlines():
+            writer, _, name = line.partition(" ")
+            if writer != pid:
+                yield name
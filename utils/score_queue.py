@@ -0,0 +1,234 @@
+import fcntl
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Local queue file, shared by every worker on the host.
+QUEUE_PATH = os.environ.get(
+    "SCORE_QUEUE_PATH",
+    os.path.join(tempfile.gettempdir(), "historle-scores.db")
+)
+FLUSH_INTERVAL = float(os.environ.get("SCORE_FLUSH_INTERVAL", "1"))
+BATCH_SIZE = int(os.environ.get("SCORE_FLUSH_BATCH", "500"))
+MAX_BACKOFF = 30
+
+# How long a user's last flushed seq is remembered; only needs to outlast
+# one enqueue_result() base-stats load.
+FLUSHED_MEMORY = 3600
+
+# enqueue_result() loads base stats outside the write lock this many
+# times before giving up and loading under it.
+LOAD_ATTEMPTS = 3
+
+_SCHEMA = """
+create table if not exists pending_scores (
+    seq integer primary key autoincrement,
+    submission_id text not null unique,
+    username text not null,
+    entry text not null,
+    stats text not null,
+    attempts integer not null default 0,
+    enqueued_at real not null
+);
+-- Newest seq flushed per user, so enqueue_result() can tell that stats it
+-- loaded before a flush are out of date.
+create table if not exists flushed_users (
+    username text primary key,
+    seq integer not null,
+    flushed_at real not null
+);
+"""
+
+
+class ScoreQueue:
+    """
+    Durable local queue for accepted scores (SQLite in WAL mode).
+
+    submit_score() enqueues the leaderboard entry together with the user's
+    already computed stats and returns. A background thread drains the
+    queue in batches through `flush(entries, stats)`, where `stats` holds
+    only the newest stats per user. Rows are deleted only after a flush
+    succeeds, so a crash means the batch is sent again. Every entry carries
+    a submission_id, so the backend can ignore the repeats.
+
+    A lock file makes sure only one process flushes at a time, which keeps
+    batches (and therefore each user's stats) applied in order.
+    """
+
+    def __init__(self, flush: Callable[[List[Dict], Dict[str, Dict]], None],
+                 path: str = QUEUE_PATH, interval: float = FLUSH_INTERVAL,
+                 batch_size: int = BATCH_SIZE):
+        self._flush = flush
+        self.path = path
+        self.interval = interval
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid = None
+        self._start_lock = threading.Lock()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def enqueue(self, entry: Dict, stats: Dict) -> str:
+        """Persist one accepted score; returns its submission_id."""
+        submission_id = entry.get("submission_id") or uuid.uuid4().hex
+        entry = dict(entry, submission_id=submission_id)
+        self._insert(self._connect(), entry, stats)
+        self._ensure_flusher()
+        return submission_id
+
+    def enqueue_result(self, entry: Dict, load_stats: Callable[[], Optional[Dict]],
+                       apply: Callable[[Dict], Dict]) -> Optional[Tuple[str, Dict]]:
+        """
+        Compute and queue a user's new stats as one read-modify-write.
+
+        The base stats are the newest pending ones if any, else
+        load_stats() (possibly a network round trip), which runs before
+        the write lock is taken. Then, in one "begin immediate"
+        transaction (the write lock is shared by every worker on the
+        host), pending stats are checked again, apply(base) computes the
+        new ones and the entry is inserted with them, so concurrent
+        submits for the same user are applied one after the other. If a
+        flush for the user landed while load_stats() ran, its result is
+        stale and is loaded again. Returns (submission_id, stats), or None
+        (nothing queued) if load_stats() finds no user.
+        """
+        submission_id = entry.get("submission_id") or uuid.uuid4().hex
+        entry = dict(entry, submission_id=submission_id)
+        username = entry["name"]
+        conn = self._connect()
+        for attempt in range(LOAD_ATTEMPTS + 1):
+            locked = attempt == LOAD_ATTEMPTS
+            loaded, loaded_at = None, self._last_seq()
+            if not locked and self.pending_stats(username) is None:
+                loaded = load_stats()
+                if loaded is None:
+                    return None
+            conn.execute("begin immediate")
+            try:
+                current = self.pending_stats(username)
+                if current is None and (loaded is None or self._flushed_since(username, loaded_at)):
+                    if not locked:
+                        conn.execute("rollback")
+                        continue
+                    current = load_stats()
+                    if current is None:
+                        conn.execute("rollback")
+                        return None
+                stats = apply(current if current is not None else loaded)
+                self._insert(conn, entry, stats)
+                conn.execute("commit")
+                break
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("rollback")
+                raise
+        self._ensure_flusher()
+        return submission_id, stats
+
+    def _last_seq(self) -> int:
+        row = self._connect().execute("select seq from sqlite_sequence where name = 'pending_scores'").fetchone()
+        return row[0] if row else 0
+
+    def _flushed_since(self, username: str, seq: int) -> bool:
+        row = self._connect().execute("select seq from flushed_users where username = ?", (username,)).fetchone()
+        return row is not None and row[0] > seq
+
+    def _insert(self, conn: sqlite3.Connection, entry: Dict, stats: Dict):
+        conn.execute(
+            "insert or ignore into pending_scores "
+            "(submission_id, username, entry, stats, enqueued_at) values (?, ?, ?, ?, ?)",
+            (entry["submission_id"], entry["name"], json.dumps(entry), json.dumps(stats), time.time())
+        )
+
+    def pending_stats(self, username: str) -> Optional[Dict]:
+        """Newest not-yet-flushed stats for a user, if any."""
+        row = self._connect().execute(
+            "select stats from pending_scores where username = ? order by seq desc limit 1",
+            (username,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def depth(self) -> int:
+        return self._connect().execute("select count(*) from pending_scores").fetchone()[0]
+
+    def flush_once(self) -> int:
+        """
+        Send one batch if no other process is flushing. Returns the number
+        of scores flushed; raises if the backend write failed.
+        """
+        with open(self.path + ".lock", "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            conn = self._connect()
+            rows = conn.execute(
+                "select seq, username, entry, stats from pending_scores order by seq limit ?",
+                (self.batch_size,)
+            ).fetchall()
+            if not rows:
+                return 0
+            entries = [json.loads(entry) for _, _, entry, _ in rows]
+            # Rows are in order, so the last stats seen per user win.
+            stats = {username: json.loads(user_stats) for _, username, _, user_stats in rows}
+            last_seq = rows[-1][0]
+            try:
+                self._flush(entries, stats)
+            except Exception:
+                conn.execute("update pending_scores set attempts = attempts + 1 where seq <= ?", (last_seq,))
+                raise
+            now = time.time()
+            conn.execute("begin immediate")
+            try:
+                conn.execute("delete from pending_scores where seq <= ?", (last_seq,))
+                conn.executemany(
+                    "insert into flushed_users (username, seq, flushed_at) values (?, ?, ?) "
+                    "on conflict (username) do update set seq = excluded.seq, flushed_at = excluded.flushed_at",
+                    [(username, seq, now) for seq, username, _, _ in rows]
+                )
+                conn.execute("delete from flushed_users where flushed_at < ?", (now - FLUSHED_MEMORY,))
+                conn.execute("commit")
+            except BaseException:
+                conn.execute("rollback")
+                raise
+            return len(rows)
+
+    def _ensure_flusher(self):
+        # Threads don't survive a fork, so start one lazily in each worker.
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="score-flusher", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        backoff = self.interval
+        while True:
+            try:
+                flushed = self.flush_once()
+                backoff = self.interval
+            except Exception as e:
+                print("Score queue flush error:", e)
+                flushed = 0
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            # A full batch means there is more waiting; go again right away.
+            if flushed < self.batch_size:
+                time.sleep(backoff)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Optional
+
+# Directory shared by every gunicorn worker on the host.
+CACHE_DIR = os.environ.get(
+    "HISTORLE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "historle-cache")
+)
+
+# Each process deletes expired entry files (and temp files left by failed
+# writes) at most this often, from set().
+SWEEP_INTERVAL = 300
+
+_ENTRY_FILE = re.compile(r"^[0-9a-f]{40}\.json$")
+_TEMP_FILE = re.compile(r"^tmp[^.]*\.tmp$")
+
+
+class SharedCache:
+    """
+    Small TTL cache for JSON-serialisable values, stored as one file per key.
+
+    Files are written atomically (temp file + os.replace), so all worker
+    processes on the machine see the same entries and an invalidation in one
+    worker takes effect in the others immediately. Expired files are
+    removed by an occasional sweep from set(), so the directory doesn't
+    grow with every key ever written.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = 10, sweep_interval: float = SWEEP_INTERVAL):
+        self.directory = directory
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._swept_at = time.time()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires", 0) <= time.time():
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        entry = {"expires": time.time() + (self.ttl if ttl is None else ttl), "value": value}
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+            tmp_path = None
+        except (OSError, TypeError, ValueError) as e:
+            print("Shared cache write error:", e)
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        if time.time() - self._swept_at >= self.sweep_interval:
+            self.sweep()
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Delete expired entries, and temp files older than a minute (a write
+        that died mid-way), from the directory. Returns how many went.
+        """
+        now = now or time.time()
+        self._swept_at = now
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if _ENTRY_FILE.match(name):
+                    with open(path, "r", encoding="utf-8") as f:
+                        expired = json.load(f).get("expires", 0) <= now
+                elif _TEMP_FILE.match(name):
+                    expired = os.path.getmtime(path) < now - 60
+                else:
+                    continue
+                if expired:
+                    os.remove(path)
+                    removed += 1
+            except (OSError, ValueError, AttributeError):
+                continue
+        return removed
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print("Shared cache delete error:", e)
@@ -0,0 +1,45 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+# Time at which this module was first imported; app.py imports it first,
+# so the first phase covers all of its imports.
+_started = time.perf_counter()
+_last = _started
+
+# Phase name -> seconds, in the order they finished.
+phases: Dict[str, float] = {}
+
+
+def mark(name: str) -> float:
+    """End a phase that began at the previous mark (or at import) and record it."""
+    global _last
+    now = time.perf_counter()
+    phases[name] = phases.get(name, 0.0) + now - _last
+    _last = now
+    return phases[name]
+
+
+@contextmanager
+def phase(name: str):
+    """Time the enclosed block as a phase of its own."""
+    global _last
+    _last = time.perf_counter()
+    try:
+        yield
+    finally:
+        mark(name)
+
+
+def total() -> float:
+    return sum(phases.values())
+
+
+def report(*names: str) -> str:
+    """Print the given phases (default: all so far) as one log line and return it."""
+    shown = names or tuple(phases)
+    parts = ", ".join(f"{name} {phases[name] * 1000:.1f}ms" for name in shown if name in phases)
+    line = f"Startup (pid {os.getpid()}): {parts}"
+    print(line, flush=True)
+    return line
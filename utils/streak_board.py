@@ -0,0 +1,68 @@
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from utils.shared_cache import SharedCache
+
+# Safety net for changes made outside the app (e.g. in the SQL console).
+STREAK_SNAPSHOT_TTL = 3600
+
+_KEY = "streaks:top"
+# Replaced on every change, so a rebuild that raced one can tell.
+_GENERATION_KEY = "streaks:generation"
+
+
+class StreakBoard:
+    """
+    The top-N streak list, precomputed once and shared by every worker.
+
+    The snapshot is only rebuilt after a change that can alter it: a
+    listed user's streak or x_id changed, someone passed the list's
+    lowest streak, or the nightly recomputation reset streaks. Reads in
+    between never touch the users table. A rebuild that overlapped any
+    change, in any worker, is returned but not stored, since it may
+    have read the rows from before it.
+    """
+
+    def __init__(self, loader: Callable[[int], List[Dict]], size: int = 5,
+                 cache: Optional[SharedCache] = None):
+        self._loader = loader
+        self.size = size
+        self._cache = cache or SharedCache(ttl=STREAK_SNAPSHOT_TTL)
+        self._lock = threading.Lock()
+
+    def top(self, limit: Optional[int] = None) -> List[Dict]:
+        """The highest `limit` (at most `size`) streaks."""
+        limit = self.size if limit is None else min(limit, self.size)
+        rows = self._cache.get(_KEY)
+        if rows is None:
+            # One rebuild per process; the others wait and reuse it.
+            with self._lock:
+                rows = self._cache.get(_KEY)
+                if rows is None:
+                    generation = self._cache.get(_GENERATION_KEY)
+                    rows = self._loader(self.size)
+                    if self._cache.get(_GENERATION_KEY) == generation:
+                        self._cache.set(_KEY, rows)
+        return [dict(row) for row in rows[:limit]]
+
+    def note_change(self, username: str, streak: Optional[int] = None):
+        """
+        Record that a user's streak (or, with streak=None, their displayed
+        profile) changed; drops the snapshot only if it could be affected.
+        """
+        self._bump()
+        rows = self._cache.get(_KEY)
+        if rows is None:
+            return
+        listed = any(row.get("username") == username for row in rows)
+        lowest = min((row.get("streak") or 0 for row in rows), default=0)
+        if listed or (streak is not None and (streak > lowest or len(rows) < self.size)):
+            self.invalidate()
+
+    def invalidate(self):
+        self._bump()
+        self._cache.delete(_KEY)
+
+    def _bump(self):
+        self._cache.set(_GENERATION_KEY, uuid.uuid4().hex)
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Columns of the users table that a finished game updates.
+STAT_COLUMNS = (
+    "streak", "days_played", "total_wins", "total_losses",
+    "longest_win_streak", "last_win_date", "last_played_date",
+)
+
+
+def apply_result(user: Dict, win: bool, game_date: str) -> Dict:
+    """
+    Reference implementation of the stats/streak update for one finished
+    game. Pure: takes the user's current row and returns the new values of
+    STAT_COLUMNS without touching the database.
+
+    The submit_score() SQL function (sql/submit_score.sql) must produce the
+    same values; keep the two in step when changing either.
+
+    Args:
+        user (dict): the user's row (only STAT_COLUMNS are read)
+        win (bool): whether the game was won
+        game_date (str): current game day, 'YYYY-MM-DD'
+    """
+    days_played = (user.get("days_played") or 0) + 1
+    total_wins = user.get("total_wins") or 0
+    total_losses = user.get("total_losses") or 0
+    streak = user.get("streak") or 0
+    longest_win_streak = user.get("longest_win_streak") or 0
+    last_win_date = user.get("last_win_date")
+
+    if win:
+        total_wins += 1
+        if last_win_date:
+            today = datetime.strptime(game_date, "%Y-%m-%d").date()
+            day_difference = (today - datetime.fromisoformat(str(last_win_date)).date()).days
+            if day_difference == 1:
+                streak += 1
+            elif day_difference > 1:
+                streak = 1
+            # day_difference == 0 means same day; no update.
+        else:
+            streak = 1
+        longest_win_streak = max(longest_win_streak, streak)
+        last_win_date = game_date
+    else:
+        total_losses += 1
+        streak = 0
+
+    return {
+        "streak": streak,
+        "days_played": days_played,
+        "total_wins": total_wins,
+        "total_losses": total_losses,
+        "longest_win_streak": longest_win_streak,
+        "last_win_date": last_win_date,
+        "last_played_date": game_date,
+    }
+
+
+def streak_is_current(last_win_date, game_date: str) -> bool:
+    """
+    Whether a streak can still continue on game_date: the player won
+    either that day or the day before it.
+    """
+    if not last_win_date:
+        return False
+    last_win = datetime.fromisoformat(str(last_win_date)).date()
+    today = datetime.strptime(game_date, "%Y-%m-%d").date()
+    return today - last_win <= timedelta(days=1)
+
+
+def recompute_streaks(rows: Iterable[Dict], reset: Callable[[List[str], str], List[str]], game_date: str,
+                      batch_size: int = 500, on_reset: Optional[Callable[[List[str]], None]] = None) -> Dict:
+    """
+    Zero every streak that is broken as of game_date: a player who hasn't
+    won since before yesterday keeps their number until their next loss
+    otherwise.
+
+    `rows` is a stream of users with a streak (id, username, streak,
+    last_win_date), e.g. Backend.iter_streaks(); broken ones are collected
+    and passed to reset(names, yesterday), e.g. Backend.reset_streaks(),
+    batch_size names at a time. reset re-checks the last win itself, since
+    a player may win between the read and the reset, and returns the
+    names it did reset, which are passed on to `on_reset`.
+    Returns {"checked": n, "reset": n}.
+    """
+    checked = 0
+    broken: List[str] = []
+    total_reset = 0
+    won_before = (datetime.strptime(game_date, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+
+    def flush():
+        nonlocal total_reset
+        if broken:
+            names = reset(list(broken), won_before)
+            if on_reset and names:
+                on_reset(names)
+            total_reset += len(names)
+            broken.clear()
+
+    for row in rows:
+        checked += 1
+        if (row.get("streak") or 0) > 0 and not streak_is_current(row.get("last_win_date"), game_date):
+            broken.append(row["username"])
+            if len(broken) >= batch_size:
+                flush()
+    flush()
+    return {"checked": checked, "reset": total_reset}
@@ -0,0 +1,212 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# better_profanity's leetspeak substitutions: each letter of a censor word
+# also matches any of these characters in its place.
+CHARS_MAPPING = {
+    "a": ("a", "@", "*", "4"),
+    "i": ("i", "*", "l", "1"),
+    "o": ("o", "*", "0", "@"),
+    "u": ("u", "*", "v"),
+    "v": ("v", "*", "u"),
+    "l": ("l", "1"),
+    "e": ("e", "*", "3"),
+    "s": ("s", "$", "5"),
+    "t": ("t", "7"),
+}
+
+NAME_PATTERN = re.compile(r"^[a-zA-Z0-9 _.\-]+$")
+X_USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_]+$")
+
+
+def _char_class(char: str) -> str:
+    options = CHARS_MAPPING.get(char)
+    if not options:
+        return re.escape(char)
+    return "[" + "".join(re.escape(option) for option in sorted(set(options))) + "]"
+
+
+def _trie_pattern(node: Dict) -> str:
+    """Regex for a trie of char-class tokens; shared prefixes are matched once."""
+    end = "" in node
+    branches = [token + _trie_pattern(child) for token, child in sorted(node.items()) if token]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 and not end else "(?:" + "|".join(branches) + ")"
+    return body + "?" if end else body
+
+
+class ProfanityFilter:
+    """
+    better_profanity's contains_profanity() with the censor list compiled
+    once into a single regex.
+
+    better_profanity compares every word (and every run of up to N
+    following words, with and without the separators between them)
+    against each censor word in turn, expanding the leetspeak variants in
+    Python as it goes. Here all variants of all censor words form one
+    trie-shaped regex, so each of those comparisons is one fullmatch in C.
+    Text in which the regex finds nothing at all, with or without its
+    separators, is clean without walking the words. The word walk itself
+    follows better_profanity step for step so the verdicts are the same.
+
+    The list (and better_profanity itself) is loaded on first use, not
+    at import.
+    """
+
+    def __init__(self, words: Optional[Iterable[str]] = None):
+        self._words = words
+        self._pattern: Optional[re.Pattern] = None
+        self._max_combinations = 1
+        self._allowed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def compile(self) -> "ProfanityFilter":
+        if self._pattern is None:
+            with self._lock:
+                if self._pattern is None:
+                    self._build()
+        return self
+
+    def _build(self):
+        from better_profanity.constants import ALLOWED_CHARACTERS
+        from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+        words = self._words
+        if words is None:
+            words = read_wordlist(get_complete_path_of_file("profanity_wordlist.txt"))
+        trie: Dict = {}
+        max_combinations = 1
+        for word in set(words):
+            word = word.lower()
+            node = trie
+            for char in word:
+                node = node.setdefault(_char_class(char), {})
+            node[""] = {}
+            # A censor phrase with N separators can span N following words.
+            max_combinations = max(max_combinations, sum(char not in ALLOWED_CHARACTERS for char in word))
+        self._max_combinations = max_combinations
+        self._allowed = ALLOWED_CHARACTERS
+        self._pattern = re.compile(_trie_pattern(trie))
+
+    def contains_profanity(self, text: str) -> bool:
+        """Return True if the text contains a censor word, as better_profanity would."""
+        self.compile()
+        lowered = text.lower()
+        joined = "".join(char for char in lowered if char in self._allowed)
+        if not self._pattern.search(lowered) and not self._pattern.search(joined):
+            return False
+        return self._censor(text) != text
+
+    # The rest mirrors better_profanity's Profanity._hide_swear_words and
+    # helpers, with the censor-list scans replaced by _is_censored().
+
+    def _is_censored(self, word: str) -> bool:
+        return self._pattern.fullmatch(word) is not None
+
+    def _censor(self, text: str) -> str:
+        censored_text = ""
+        cur_word = ""
+        skip_index = -1
+        next_words: List[Tuple[str, int]] = []
+        allowed = self._allowed
+        start = _next_word_start(text, 0, allowed)
+        if start >= len(text) - 1:
+            return text
+        if start > 0:
+            censored_text = text[:start]
+            text = text[start:]
+
+        for index, char in enumerate(text):
+            if index < skip_index:
+                continue
+            if char in allowed:
+                cur_word += char
+                continue
+            if cur_word.strip() == "":
+                censored_text += char
+                cur_word = ""
+                continue
+
+            if not next_words:
+                next_words = _next_words(text, index, self._max_combinations, allowed)
+            else:
+                del next_words[:2]
+                if next_words and next_words[-1][0] != "":
+                    next_words += _next_words(text, next_words[-1][1], 1, allowed)
+            end_index = self._forms_censored_word(cur_word, next_words)
+            if end_index is not None:
+                cur_word = "****"
+                skip_index = end_index
+                char = ""
+                next_words = []
+
+            if self._is_censored(cur_word.lower()):
+                cur_word = "****"
+            censored_text += cur_word + char
+            cur_word = ""
+
+        if cur_word != "" and skip_index < len(text) - 1:
+            if self._is_censored(cur_word.lower()):
+                cur_word = "****"
+            censored_text += cur_word
+        return censored_text
+
+    def _forms_censored_word(self, cur_word: str, next_words: List[Tuple[str, int]]) -> Optional[int]:
+        full_word = cur_word.lower()
+        full_word_with_separators = cur_word.lower()
+        for index in range(0, len(next_words), 2):
+            single_word, end_index = next_words[index]
+            word_with_separators = next_words[index + 1][0]
+            if single_word == "":
+                continue
+            full_word += single_word.lower()
+            full_word_with_separators += word_with_separators.lower()
+            if self._is_censored(full_word) or self._is_censored(full_word_with_separators):
+                return end_index
+        return None
+
+
+def _next_word_start(text: str, start: int, allowed: Set[str]) -> int:
+    for index in range(start, len(text)):
+        if text[index] in allowed:
+            return index
+    return len(text)
+
+
+def _next_words(text: str, start: int, count: int, allowed: Set[str]) -> List[Tuple[str, int]]:
+    """(word, end index) and (separators + word, end index) for the next `count` words."""
+    word_start = _next_word_start(text, start, allowed)
+    if word_start >= len(text) - 1:
+        return [("", word_start), ("", word_start)]
+    end = word_start
+    for end in range(word_start, len(text)):
+        if text[end] not in allowed:
+            break
+    word = text[word_start:end] if text[end] not in allowed else text[word_start:end + 1]
+    words = [(word, end), (text[start:word_start] + word, end)]
+    if count > 1:
+        words.extend(_next_words(text, end, count - 1, allowed))
+    return words
+
+
+profanity_filter = ProfanityFilter()
+
+
+def is_valid_name(name: str) -> bool:
+    """Name shown on leaderboard. Must be safe, short, and clean."""
+    return bool(
+        1 <= len(name) <= 20 and
+        NAME_PATTERN.match(name) and
+        not profanity_filter.contains_profanity(name)
+    )
+
+
+def is_valid_x_username(x_username: str) -> bool:
+    """Username (for X) is optional; allows only Twitter-safe handles."""
+    return bool(
+        len(x_username) <= 30 and
+        (x_username == "" or (X_USERNAME_PATTERN.match(x_username) and
+                              not profanity_filter.contains_profanity(x_username)))
+    )